@@ -0,0 +1,62 @@
+"""Benchmark decoding chDB results in each run_chdb_select_query format.
+
+Runs the same query through ``execute_chdb_query`` with the legacy JSON path
+(``rows``) and the columnar ``columns`` (JSONColumns) and ``arrow`` (ArrowStream)
+paths, and reports wall time, peak Python memory and payload size. Runs entirely
+in-process, no ClickHouse server needed.
+
+Usage:
+
+    python benchmarks/bench_chdb_formats.py --rows 1000000
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+
+os.environ.setdefault("CHDB_ENABLED", "true")
+os.environ.setdefault("CLICKHOUSE_ENABLED", "false")
+
+from mcp_clickhouse import mcp_server  # noqa: E402
+from mcp_clickhouse.result_format import RESULT_FORMATS  # noqa: E402
+
+
+def payload_size(result) -> int:
+    if isinstance(result, dict) and "arrow" in result:
+        return len(result["arrow"])
+    return len(json.dumps(result, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows to return")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per format (best is reported)")
+    args = parser.parse_args()
+
+    query = (
+        "SELECT number, toString(number) AS label, number * 0.5 AS ratio, "
+        f"toDate('2024-01-01') + number % 365 AS day FROM numbers({args.rows})"
+    )
+
+    print(f"{'format':<10}{'seconds':>10}{'peak MiB':>12}{'payload MiB':>14}")
+    for result_format in RESULT_FORMATS:
+        best = None
+        for _ in range(args.repeat):
+            tracemalloc.start()
+            started = time.perf_counter()
+            result = mcp_server.execute_chdb_query(query, result_format)
+            elapsed = time.perf_counter() - started
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if isinstance(result, dict) and "error" in result:
+                raise SystemExit(f"{result_format}: {result['error']}")
+            if best is None or elapsed < best[0]:
+                best = (elapsed, peak)
+        size = payload_size(result)
+        print(f"{result_format:<10}{best[0]:>10.3f}{best[1] / 2**20:>12.1f}{size / 2**20:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
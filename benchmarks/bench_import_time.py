@@ -0,0 +1,86 @@
+"""Measure the cold import time of the MCP server and guard it against regressions.
+
+Imports ``mcp_clickhouse.main`` in a fresh interpreter under ``python -X importtime``
+(what every stdio agent session pays before the server answers) and reports the
+modules with the largest self time. Fails if the import takes longer than ``--max-ms`` or loads
+a backend module (chDB, clickhouse_connect, pyarrow) that should only be imported when
+a tool first needs it.
+
+Usage:
+
+    python benchmarks/bench_import_time.py --max-ms 3000
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+# Backends that must not be imported at startup
+LAZY_MODULES = ("chdb", "clickhouse_connect", "pyarrow", "pandas")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def measure(module: str, env: dict):
+    """Import ``module`` in a fresh interpreter.
+
+    Returns:
+        (total µs, {module: cumulative µs}, {module: self µs})
+    """
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except subprocess.CalledProcessError as e:
+        raise SystemExit(f"importing {module} failed:\n{e.stderr}") from e
+    total = 0
+    cumulative = {}
+    own = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        cumulative[name] = int(cumulative_us)
+        own[name] = int(self_us)
+        if len(indent) == 1:
+            total += int(cumulative_us)
+    return total, cumulative, own
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="mcp_clickhouse.main", help="Module to import")
+    parser.add_argument("--max-ms", type=float, default=3000, help="Fail above this import time")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs (best is reported)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to show")
+    args = parser.parse_args()
+
+    env = dict(os.environ, CHDB_ENABLED="true", CLICKHOUSE_ENABLED="true")
+    runs = [measure(args.module, env) for _ in range(args.repeat)]
+    total, cumulative, own = min(runs, key=lambda run: run[0])
+
+    print(f"import {args.module}: {total / 1000:.0f} ms (best of {args.repeat})")
+    print("slowest modules (self time):")
+    for name, micros in sorted(own.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"  {micros / 1000:>8.1f} ms  {name}")
+
+    failures = []
+    eager = [name for name in LAZY_MODULES if name in cumulative]
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+    if total / 1000 > args.max_ms:
+        failures.append(f"{total / 1000:.0f} ms exceeds --max-ms {args.max_ms:.0f}")
+    if failures:
+        raise SystemExit("FAIL: " + "; ".join(failures))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
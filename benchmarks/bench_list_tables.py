@@ -0,0 +1,116 @@
+"""Benchmark ClickHouse round trips made by list_tables.
+
+Creates a scratch database with ``--tables`` tables, then compares the legacy
+implementation, with its full ``system.tables`` query and per-table ``system.columns``
+loop (N+1 round trips), with the batched implementation in
+``mcp_clickhouse.mcp_server.list_tables`` (at most 2).
+
+Usage (with the same CLICKHOUSE_* environment variables as the server):
+
+    python benchmarks/bench_list_tables.py --tables 200
+"""
+
+import argparse
+import time
+from dataclasses import asdict
+
+from dotenv import load_dotenv
+
+from mcp_clickhouse import mcp_server
+from mcp_clickhouse.client_pool import ClickHouseClientPool
+
+BENCH_DB = "mcp_bench_list_tables"
+
+
+class CountingClient:
+    """Proxy that counts query() and command() round trips of a real client."""
+
+    def __init__(self, client):
+        self._client = client
+        self.round_trips = 0
+
+    def query(self, *args, **kwargs):
+        self.round_trips += 1
+        return self._client.query(*args, **kwargs)
+
+    def command(self, *args, **kwargs):
+        self.round_trips += 1
+        return self._client.command(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+def legacy_list_tables(client, database: str):
+    """The pre-batching implementation, as it ran before apart from taking its client:
+    the full system.tables query, then one system.columns query per table."""
+    fmt = mcp_server.format_query_value
+    result = client.query(
+        "SELECT database, name, engine, create_table_query, dependencies_database, "
+        "dependencies_table, engine_full, sorting_key, primary_key, total_rows, total_bytes, "
+        "total_bytes_uncompressed, parts, active_parts, total_marks, comment FROM system.tables "
+        f"WHERE database = {fmt(database)} AND name LIKE 'newoms%' "
+        "AND name != 'newoms_orders_denormalized'"
+    )
+    tables = mcp_server.result_to_table(result.column_names, result.result_rows)
+    for table in tables:
+        column_result = client.query(
+            "SELECT database, table, name, type AS column_type, default_kind, default_expression, "
+            f"comment FROM system.columns WHERE database = {fmt(database)} "
+            f"AND table = {fmt(table.name)}"
+        )
+        table.columns = mcp_server.result_to_column(
+            column_result.column_names, column_result.result_rows
+        )
+    return [asdict(table) for table in tables]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, default=100, help="number of tables to create")
+    args = parser.parse_args()
+
+    load_dotenv()
+    setup = mcp_server.create_clickhouse_client()
+    setup.command(f"DROP DATABASE IF EXISTS {BENCH_DB}")
+    setup.command(f"CREATE DATABASE {BENCH_DB}")
+    for i in range(args.tables):
+        setup.command(
+            f"CREATE TABLE {BENCH_DB}.newoms_bench_{i} (id UInt64, name String, value Float64) "
+            "ENGINE = MergeTree ORDER BY id"
+        )
+
+    try:
+        counting = CountingClient(mcp_server.create_clickhouse_client())
+        start = time.perf_counter()
+        legacy_list_tables(counting, BENCH_DB)
+        legacy_elapsed = time.perf_counter() - start
+        legacy_round_trips = counting.round_trips
+
+        counting.round_trips = 0
+        mcp_server._CLIENT_POOL = ClickHouseClientPool(lambda: counting, max_size=1)
+        # Measure the uncached fetch first, then a repeat call served by the metadata cache
+        get_metadata_cache = mcp_server.get_metadata_cache
+        mcp_server.get_metadata_cache = lambda: None
+        start = time.perf_counter()
+        tables = mcp_server.list_tables(BENCH_DB)
+        batched_elapsed = time.perf_counter() - start
+        batched_round_trips = counting.round_trips
+        mcp_server.get_metadata_cache = get_metadata_cache
+
+        mcp_server.list_tables(BENCH_DB)
+        counting.round_trips = 0
+        start = time.perf_counter()
+        mcp_server.list_tables(BENCH_DB)
+        cached_elapsed = time.perf_counter() - start
+
+        print(f"tables:  {len(tables)}")
+        print(f"legacy:  {legacy_round_trips} round trips, {legacy_elapsed * 1000:.1f} ms")
+        print(f"batched: {batched_round_trips} round trips, {batched_elapsed * 1000:.1f} ms")
+        print(f"cached:  {counting.round_trips} round trips, {cached_elapsed * 1000:.3f} ms")
+    finally:
+        setup.command(f"DROP DATABASE IF EXISTS {BENCH_DB}")
+
+
+if __name__ == "__main__":
+    main()
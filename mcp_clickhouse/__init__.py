@@ -1,19 +1,9 @@
 import os
 
-from .mcp_server import (
-    create_clickhouse_client,
-    list_databases,
-    list_tables,
-    run_select_query,
-    create_chdb_client,
-    run_chdb_select_query,
-    chdb_initial_prompt,
-)
-
-
 if os.getenv("MCP_CLICKHOUSE_TRUSTSTORE_DISABLE", None) != "1":
     try:
         import truststore
+
         truststore.inject_into_ssl()
     except Exception:
         pass
@@ -23,7 +13,19 @@ __all__ = [
     "list_tables",
     "run_select_query",
     "create_clickhouse_client",
+    "get_client_pool",
+    "get_result_cache",
     "create_chdb_client",
     "run_chdb_select_query",
     "chdb_initial_prompt",
 ]
+
+
+def __getattr__(name):
+    # The server module (and the MCP framework behind it) is imported on first access,
+    # so importing a lightweight submodule such as mcp_env stays cheap
+    if name in __all__:
+        from . import mcp_server
+
+        return getattr(mcp_server, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,275 @@
+"""In-process caches used by the MCP server.
+
+TTLCache is a small thread-safe LRU map whose entries expire after a time to live and
+that can be bounded by entry count and total size. MetadataCache builds on it to serve
+repeated schema discovery calls from memory while revalidating them cheaply against a
+per-database schema fingerprint, and ResultCache to serve repeated SELECT results.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe, size-bounded LRU cache with a per-cache time to live.
+
+    Args:
+        max_entries: Maximum number of entries kept; the least recently used entry is
+            evicted when the cache is full
+        ttl: Seconds an entry stays valid after it was stored, unless ``set`` is given
+            a TTL of its own
+        clock: Monotonic time source, overridable for tests
+        max_bytes: Optional budget for the sum of the sizes passed to ``set``; least
+            recently used entries are evicted to stay within it
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry and mark it as most recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value, _ = entry
+                if expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._pop(key)
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, size: int = 0, ttl: Optional[float] = None) -> bool:
+        """Store an entry, evicting least recently used entries if the cache is full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+            size: Size of the value counted against ``max_bytes``
+            ttl: Time to live of this entry, defaults to the cache's TTL
+
+        Returns:
+            bool: False if the value alone exceeds ``max_bytes`` and was not stored
+        """
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return False
+            expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = (expires_at, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+            return True
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drop every entry whose key matches ``predicate``.
+
+        Returns:
+            int: The number of entries removed
+        """
+        with self._lock:
+            stale = [key for key in self._entries if predicate(key)]
+            for key in stale:
+                self._pop(key)
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of cache counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _pop(self, key: Hashable) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+
+class MetadataCache:
+    """Cache for schema discovery results, invalidated early on schema changes.
+
+    Every entry remembers the fingerprint of its database (for example the table count
+    and latest ``metadata_modification_time`` from ``system.tables``) at load time. A hit
+    is served straight from memory unless the database fingerprint is due for a recheck,
+    which happens at most once per ``revalidate_interval`` per database. When the
+    fingerprint changed, every entry of that database is dropped and reloaded.
+
+    Args:
+        ttl: Seconds an entry stays valid regardless of the fingerprint
+        max_entries: Maximum number of cached discovery results
+        revalidate_interval: Minimum seconds between fingerprint checks of a database
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int,
+        revalidate_interval: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.revalidate_interval = revalidate_interval
+        self._clock = clock
+        self._entries = TTLCache(max_entries, ttl, clock)
+        self._fingerprints: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.invalidations = 0
+
+    def get_or_load(
+        self,
+        key: Tuple[Hashable, ...],
+        load: Callable[[], T],
+        database: Optional[str] = None,
+        fingerprint: Optional[Callable[[], Any]] = None,
+    ) -> T:
+        """Return the cached value for ``key`` or load and cache it.
+
+        Args:
+            key: Cache key; entries for a database must use the database as first element
+            load: Loads the value on a miss
+            database: Database whose fingerprint guards the entry, if any
+            fingerprint: Computes the current fingerprint of ``database``
+        """
+        entry = self._entries.get(key, _MISSING)
+        guarded = database is not None and fingerprint is not None
+
+        if entry is not _MISSING:
+            cached_fingerprint, value = entry
+            if not guarded:
+                return value
+            if self._current_fingerprint(database, fingerprint) == cached_fingerprint:
+                return value
+            self.invalidate(database)
+
+        current = self._refresh_fingerprint(database, fingerprint) if guarded else None
+        value = load()
+        self._entries.set(key, (current, value))
+        return value
+
+    def invalidate(self, database: Optional[str] = None) -> None:
+        """Drop the entries of ``database``, or every entry when no database is given."""
+        with self._lock:
+            self.invalidations += 1
+            if database is None:
+                self._fingerprints.clear()
+            else:
+                self._fingerprints.pop(database, None)
+        if database is None:
+            self._entries.clear()
+        else:
+            self._entries.invalidate(lambda key: key[0] == database)
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of cache counters."""
+        stats = self._entries.stats()
+        stats["invalidations"] = self.invalidations
+        return stats
+
+    def _current_fingerprint(self, database: str, fingerprint: Callable[[], Any]) -> Any:
+        with self._lock:
+            checked = self._fingerprints.get(database)
+        if checked is not None and self._clock() - checked[0] < self.revalidate_interval:
+            return checked[1]
+        return self._refresh_fingerprint(database, fingerprint)
+
+    def _refresh_fingerprint(self, database: str, fingerprint: Callable[[], Any]) -> Any:
+        current = fingerprint()
+        with self._lock:
+            self._fingerprints[database] = (self._clock(), current)
+        return current
+
+
+class ResultCache:
+    """Byte-bounded cache of query results.
+
+    Callers build the key from everything that affects the result (normalized SQL,
+    database, user, readonly mode, page parameters) and decide which queries may be
+    cached at all; ``bypass`` records the calls that skipped the cache.
+
+    Args:
+        ttl: Seconds a result stays valid after it was stored
+        max_bytes: Budget for the estimated size of all cached results
+        max_entries: Maximum number of cached results
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_bytes: int,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._entries = TTLCache(max_entries, ttl, clock, max_bytes=max_bytes)
+        self._lock = threading.Lock()
+        self.bypassed = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Get a cached result, or None on a miss."""
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: Any, size: int, ttl: Optional[float] = None) -> bool:
+        """Cache a result of ``size`` estimated bytes; results over the budget are skipped.
+
+        ``ttl`` shortens the cache's TTL for this result, e.g. to when it goes stale.
+        """
+        if ttl is not None:
+            ttl = min(ttl, self._entries.ttl)
+        return self._entries.set(key, value, size=size, ttl=ttl)
+
+    def bypass(self) -> None:
+        """Count a call that was not eligible for caching."""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of cache counters."""
+        stats = self._entries.stats()
+        stats["bypassed"] = self.bypassed
+        return stats
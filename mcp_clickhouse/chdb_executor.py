@@ -0,0 +1,327 @@
+"""chDB query execution for the MCP server.
+
+chDB sessions serialize the queries sent through them, so sharing one session between
+executor threads turns parallel tool calls into a queue. ChDBSessionPool keeps several
+sessions over the same data path (they share chDB's embedded engine and its data) and
+hands each query its own session, with a bounded number of callers allowed to wait.
+
+ChDBProcessPool has the same interface but runs every query in a worker subprocess
+instead, so a timed-out query can be stopped for real by killing its worker.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("mcp-clickhouse")
+
+
+class ChDBQueueFullError(RuntimeError):
+    """Raised when a chDB query arrives while every session is busy and the queue is full."""
+
+
+class ChDBQueryError(RuntimeError):
+    """Raised when chDB reports an error for a query."""
+
+
+class _Discard(Exception):
+    """Base for errors after which a checked out resource must not be reused."""
+
+
+class _BoundedPool:
+    """Hands out up to ``size`` lazily created resources, with a bounded wait queue."""
+
+    def __init__(
+        self, factory: Callable[[], Any], size: int, max_queued: int, idle: Iterable[Any] = ()
+    ):
+        if size < 1:
+            raise ValueError("chDB pool size must be at least 1")
+        self._factory = factory
+        self.size = size
+        self.max_queued = max_queued
+        self._idle: List[Any] = [resource for resource in idle if resource is not None]
+        self._created = len(self._idle)
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._queued = 0
+        self._rejected_total = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of pool counters."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "sessions": self._created,
+                "in_use": self._in_use,
+                "queued": self._queued,
+                "rejected_total": self._rejected_total,
+            }
+
+    def close(self) -> None:
+        """Close every idle resource."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+        for resource in idle:
+            self._close(resource)
+
+    def _close(self, resource: Any) -> None:
+        try:
+            resource.close()
+        except Exception as e:
+            logger.debug("Error closing chDB session: %s", e)
+
+    @contextmanager
+    def _checkout(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Hold a resource for the duration of a ``with`` block.
+
+        Raises:
+            ChDBQueueFullError: If every resource is busy and the wait queue is full.
+            ChDBTimeoutError: If no resource became free within ``timeout`` seconds.
+        """
+        with self._cond:
+            if self._in_use >= self.size:
+                if self._queued >= self.max_queued:
+                    self._rejected_total += 1
+                    raise ChDBQueueFullError(
+                        f"chDB is busy: {self._in_use} queries running and "
+                        f"{self._queued} queued (CHDB_MAX_QUEUED_QUERIES={self.max_queued})"
+                    )
+                self._queued += 1
+                try:
+                    free = self._cond.wait_for(lambda: self._in_use < self.size, timeout)
+                finally:
+                    self._queued -= 1
+                if not free:
+                    raise ChDBTimeoutError(
+                        f"chDB query timed out after {timeout} seconds waiting for a free session"
+                    )
+            self._in_use += 1
+            resource = self._idle.pop() if self._idle else None
+            create = resource is None
+            if create:
+                self._created += 1
+        try:
+            if create:
+                resource = self._factory()
+        except BaseException:
+            self._checkin(None)
+            raise
+        try:
+            yield resource
+        except _Discard:
+            self._close(resource)
+            self._checkin(None)
+            raise
+        except BaseException:
+            self._checkin(resource)
+            raise
+        else:
+            self._checkin(resource)
+
+    def _checkin(self, resource: Optional[Any]) -> None:
+        with self._cond:
+            if resource is None:
+                self._created -= 1
+            else:
+                self._idle.append(resource)
+            self._in_use -= 1
+            self._cond.notify()
+
+
+class ChDBSessionPool(_BoundedPool):
+    """A bounded pool of chDB sessions over one data path.
+
+    At most ``size`` queries run at once, each on its own session. Up to ``max_queued``
+    further callers wait for a session; beyond that, calls fail fast with
+    ChDBQueueFullError instead of piling up on the query executor.
+
+    Args:
+        session_factory: Creates a new session; called lazily, at most ``size`` times
+        size: Maximum number of sessions, i.e. of concurrently running queries
+        max_queued: Maximum number of callers waiting for a session
+        sessions: Already open sessions to adopt, counted against ``size``
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        size: int = 4,
+        max_queued: int = 16,
+        sessions: Iterable[Any] = (),
+    ):
+        super().__init__(session_factory, size, max_queued, sessions)
+
+    def query(
+        self,
+        sql: str,
+        fmt: str,
+        decode: Callable[[memoryview], Any],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run ``sql`` on a free session and decode its output while the session is held.
+
+        Args:
+            sql: The SQL query to run
+            fmt: chDB output format
+            decode: Turns the raw output buffer into the value to return; the buffer is
+                only valid during this call
+            timeout: Seconds to wait for a free session; once running, an in-process
+                chDB query cannot be interrupted
+
+        Raises:
+            ChDBQueueFullError: If the wait queue is full.
+            ChDBTimeoutError: If no session became free within ``timeout``.
+            ChDBQueryError: If chDB reports an error for the query.
+        """
+        with self._checkout(timeout) as session:
+            res = session.query(sql, fmt)
+            if res.has_error():
+                raise ChDBQueryError(res.error_message())
+            buffer = res.get_memview().view() if res.size() else memoryview(b"")
+            return decode(buffer)
+
+
+class ChDBWorkerError(_Discard, RuntimeError):
+    """Raised when a chDB worker process dies while running a query."""
+
+
+class ChDBTimeoutError(_Discard, TimeoutError):
+    """Raised when a chDB query exceeds its timeout, in a worker or waiting for one."""
+
+
+class ChDBWorker:
+    """A subprocess with its own chDB session, running one query at a time.
+
+    Queries are sent over a pipe; the worker replies with chDB's raw output bytes
+    (for example an Arrow IPC stream), so no result objects are pickled.
+    """
+
+    def __init__(self, data_path: str):
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main, args=(child_conn, data_path), name="chdb-worker", daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def query(self, sql: str, fmt: str, timeout: Optional[float]) -> bytes:
+        """Run a query in the worker and return its raw output.
+
+        Raises:
+            ChDBTimeoutError: If no reply arrived within ``timeout``; the worker must then
+                be closed, which kills it.
+            ChDBWorkerError: If the worker died.
+            ChDBQueryError: If chDB reports an error for the query.
+        """
+        try:
+            self._conn.send((sql, fmt))
+            ready = self._conn.poll(timeout)
+            if ready:
+                status = self._conn.recv()
+                if status == "ok":
+                    return self._conn.recv_bytes()
+        except (EOFError, ConnectionError):
+            self.process.join(_WORKER_KILL_GRACE)
+            raise ChDBWorkerError(
+                f"chDB worker exited unexpectedly (exit code {self.process.exitcode})"
+            ) from None
+        if not ready:
+            # The pool discards, and thereby kills, the worker
+            raise ChDBTimeoutError(f"chDB query timed out after {timeout} seconds")
+        raise ChDBQueryError(status[1])
+
+    def close(self) -> None:
+        """Stop the worker, killing it if it does not exit promptly."""
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(_WORKER_KILL_GRACE)
+            if self.process.is_alive():
+                self.process.kill()
+        self.process.join()
+        self._conn.close()
+
+
+_WORKER_KILL_GRACE = 1.0
+
+
+def _worker_main(conn, data_path: str) -> None:
+    # The server may speak MCP over stdout; keep anything chDB prints off it
+    os.dup2(2, 1)
+    # Ctrl+C is handled by the server, which stops its workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    import chdb.session as chs
+
+    session = chs.Session(path=data_path)
+    while True:
+        try:
+            sql, fmt = conn.recv()
+        except EOFError:
+            return
+        try:
+            res = session.query(sql, fmt)
+            if res.has_error():
+                conn.send(("error", res.error_message()))
+                continue
+            conn.send("ok")
+            conn.send_bytes(res.get_memview().view() if res.size() else b"")
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class ChDBProcessPool(_BoundedPool):
+    """A bounded pool of chDB worker processes.
+
+    Each query runs in a worker subprocess, so a query that times out is stopped by
+    killing its worker, and a crashing or runaway query cannot take the server down.
+    Workers are started lazily and replaced after they are killed.
+
+    chDB locks a persistent data directory to one process, so with a path other than
+    ``:memory:`` the pool runs a single worker. In-memory workers do not share tables.
+
+    Args:
+        data_path: CHDB_DATA_PATH opened by every worker
+        size: Maximum number of worker processes, i.e. of concurrently running queries
+        max_queued: Maximum number of callers waiting for a worker
+    """
+
+    def __init__(self, data_path: str, size: int = 4, max_queued: int = 16):
+        if data_path != ":memory:" and size > 1:
+            logger.warning("chDB persistent data paths support a single worker process")
+            size = 1
+        super().__init__(lambda: ChDBWorker(data_path), size, max_queued)
+
+    def query(
+        self,
+        sql: str,
+        fmt: str,
+        decode: Callable[[memoryview], Any],
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run ``sql`` in a worker process and decode its output.
+
+        Args:
+            sql: The SQL query to run
+            fmt: chDB output format
+            decode: Turns the raw output buffer into the value to return; the buffer
+                holds a copy of the output received from the worker
+            timeout: Seconds, including the wait for a free worker, after which the
+                worker running the query is killed
+
+        Raises:
+            ChDBQueueFullError: If the wait queue is full.
+            ChDBQueryError: If chDB reports an error for the query.
+            ChDBTimeoutError: If the query timed out.
+            ChDBWorkerError: If the worker died while running the query.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._checkout(timeout) as worker:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+            output = worker.query(sql, fmt, remaining)
+        return decode(memoryview(output))
@@ -0,0 +1,340 @@
+"""Pooled, long-lived ClickHouse clients for the MCP server.
+
+Creating a ``clickhouse_connect`` client costs a TLS handshake plus a ``server_version``
+round trip, so tool calls borrow clients from a bounded pool instead of building a new
+one every time. Idle clients are evicted and liveness-checked by a background thread, so
+the request path never pays for a ping.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, TypeVar
+
+logger = logging.getLogger("mcp-clickhouse")
+
+T = TypeVar("T")
+
+
+class PoolTimeoutError(TimeoutError):
+    """Raised when no pooled client becomes available within the acquire timeout."""
+
+
+class PooledClient:
+    """A ClickHouse client owned by a ClickHouseClientPool.
+
+    Attributes:
+        client: The underlying clickhouse_connect client
+        session_settings: Per-connection values computed once when the client connected
+            (for example the effective readonly setting), reused by every query
+        created_at: Monotonic timestamp of when the client was created
+        last_used: Monotonic timestamp of when the client was last returned to the pool
+        last_checked: Monotonic timestamp of the last successful liveness check
+    """
+
+    __slots__ = ("client", "session_settings", "created_at", "last_used", "last_checked")
+
+    def __init__(self, client: Any, session_settings: Optional[Dict[str, Any]] = None):
+        now = time.monotonic()
+        self.client = client
+        self.session_settings = session_settings or {}
+        self.created_at = now
+        self.last_used = now
+        self.last_checked = now
+
+
+def is_connection_error(err: BaseException) -> bool:
+    """Return True if the error means the client's connection can no longer be trusted."""
+    # Imported here so the pool does not load clickhouse_connect before a client exists
+    from clickhouse_connect.driver.exceptions import OperationalError
+
+    return isinstance(err, (OperationalError, ConnectionError))
+
+
+def is_unsent_request_error(err: BaseException) -> bool:
+    """Return True if the error shows that the request never reached the server.
+
+    Only such requests are safe to repeat: after a read timeout or a connection that
+    broke while waiting for the response, the server may still be running the query.
+    """
+    from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+    seen = set()
+    while isinstance(err, BaseException) and id(err) not in seen:
+        seen.add(id(err))
+        if isinstance(err, (NewConnectionError, ConnectTimeoutError, ConnectionRefusedError)):
+            return True
+        # urllib3's MaxRetryError keeps the underlying error in ``reason``
+        err = err.__cause__ or err.__context__ or getattr(err, "reason", None)
+    return False
+
+
+def is_retryable_error(err: BaseException, request_started: bool) -> bool:
+    """Return True if a call that failed with ``err`` can be repeated on a new connection.
+
+    Args:
+        err: The error the call failed with
+        request_started: Whether the call got a client and may have sent its request
+    """
+    if not is_connection_error(err):
+        return False
+    return not request_started or is_unsent_request_error(err)
+
+
+class ClickHouseClientPool:
+    """A bounded pool of reusable ClickHouse clients.
+
+    At most ``max_size`` clients are checked out at once; callers beyond that block for up
+    to ``acquire_timeout`` seconds. Clients that raise connection errors are discarded so
+    the next checkout reconnects, and a daemon thread closes clients idle for longer than
+    ``idle_timeout`` and pings the rest every ``health_check_interval`` seconds.
+
+    ``session_settings_factory`` is called once per new client; its result is kept on the
+    PooledClient until the client is discarded, so a reconnect refreshes it.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Any],
+        max_size: int = 10,
+        idle_timeout: float = 300.0,
+        health_check_interval: float = 30.0,
+        acquire_timeout: float = 30.0,
+        session_settings_factory: Optional[Callable[[Any], Dict[str, Any]]] = None,
+    ):
+        if max_size < 1:
+            raise ValueError("Client pool size must be at least 1")
+        self._client_factory = client_factory
+        self._session_settings_factory = session_settings_factory
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: Deque[PooledClient] = deque()
+        self._live: Set[PooledClient] = set()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        self._in_use = 0
+        self._created_total = 0
+        self._discarded_total = 0
+        self._evicted_total = 0
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[PooledClient]:
+        """Check out a client for the duration of a ``with`` block.
+
+        The client is returned to the pool on exit, or discarded if the block raised a
+        connection error.
+
+        Args:
+            timeout: Seconds to wait for a free client, the acquire timeout if None;
+                0 fails right away when every client is checked out
+
+        Raises:
+            PoolTimeoutError: If no client becomes available in time.
+        """
+        pooled = self._checkout(self.acquire_timeout if timeout is None else timeout)
+        try:
+            yield pooled
+        except BaseException as err:
+            if is_connection_error(err):
+                self._discard(pooled)
+            else:
+                self._release(pooled)
+            raise
+        else:
+            self._release(pooled)
+
+    def run(self, fn: Callable[[PooledClient], T], retries: int = 1) -> T:
+        """Run ``fn`` with a pooled client, reconnecting and retrying on connection errors.
+
+        The call is only repeated if it cannot have reached the server: connecting
+        failed, or ``fn``'s request failed before it was sent (see
+        is_unsent_request_error). A query whose response was lost, e.g. to a read
+        timeout, is not repeated, since the server may still be running it under the
+        same query_id.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                with self.connection() as pooled:
+                    started = True
+                    return fn(pooled)
+            except Exception as err:
+                if attempt >= retries or not is_retryable_error(err, started):
+                    raise
+                attempt += 1
+                logger.warning(
+                    "ClickHouse connection failed, reconnecting (attempt %d): %s", attempt, err
+                )
+
+    def run_dedicated(self, fn: Callable[[PooledClient], T]) -> T:
+        """Run ``fn`` on a new client of its own, outside the pool's size limit.
+
+        For control statements such as KILL QUERY, which must get through when every
+        pooled client is busy with the queries they are meant to stop. The client is
+        closed afterwards and not counted in the pool's stats.
+        """
+        client = self._client_factory()
+        try:
+            return fn(PooledClient(client))
+        finally:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug("Error closing ClickHouse client: %s", e)
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of pool counters."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "created_total": self._created_total,
+                "discarded_total": self._discarded_total,
+                "evicted_total": self._evicted_total,
+            }
+
+    def close(self) -> None:
+        """Stop background maintenance and close every idle client."""
+        self._stop.set()
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._close_client(pooled)
+
+    def _checkout(self, timeout: float) -> PooledClient:
+        if self._closed:
+            raise RuntimeError("ClickHouse client pool is closed")
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeoutError(
+                f"No ClickHouse client available after {timeout} seconds "
+                f"(pool size {self.max_size})"
+            )
+        try:
+            self._ensure_maintenance_thread()
+            with self._lock:
+                pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                pooled = self._connect()
+            with self._lock:
+                self._in_use += 1
+            return pooled
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _connect(self) -> PooledClient:
+        client = self._client_factory()
+        session_settings = {}
+        if self._session_settings_factory is not None:
+            try:
+                session_settings = self._session_settings_factory(client)
+            except BaseException:
+                client.close()
+                raise
+            logger.info("Pooled ClickHouse connection session settings: %s", session_settings)
+        pooled = PooledClient(client, session_settings)
+        with self._lock:
+            self._created_total += 1
+            self._live.add(pooled)
+        return pooled
+
+    def session_settings(self) -> List[Dict[str, Any]]:
+        """Get the session settings of every open pooled connection."""
+        with self._lock:
+            return [dict(pooled.session_settings) for pooled in self._live]
+
+    def _release(self, pooled: PooledClient) -> None:
+        pooled.last_used = time.monotonic()
+        with self._lock:
+            self._in_use -= 1
+            keep = not self._closed and len(self._idle) < self.max_size
+            if keep:
+                self._idle.append(pooled)
+        self._slots.release()
+        if not keep:
+            self._close_client(pooled)
+
+    def _discard(self, pooled: PooledClient) -> None:
+        with self._lock:
+            self._in_use -= 1
+            self._discarded_total += 1
+        self._slots.release()
+        self._close_client(pooled)
+
+    def _ensure_maintenance_thread(self) -> None:
+        if self._maintenance_thread is not None:
+            return
+        with self._lock:
+            if self._maintenance_thread is None:
+                self._maintenance_thread = threading.Thread(
+                    target=self._maintenance_loop, name="clickhouse-pool-maintenance", daemon=True
+                )
+                self._maintenance_thread.start()
+
+    def _maintenance_loop(self) -> None:
+        interval = max(min(self.health_check_interval, self.idle_timeout), 0.01)
+        while not self._stop.wait(interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                logger.error("ClickHouse client pool maintenance failed: %s", e)
+
+    def maintain(self) -> None:
+        """Evict idle clients and ping the ones that are due for a liveness check.
+
+        Called periodically by the background thread; exposed for tests and manual use.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [p for p in self._idle if now - p.last_used >= self.idle_timeout]
+            for pooled in expired:
+                self._idle.remove(pooled)
+            self._evicted_total += len(expired)
+            due = [p for p in self._idle if now - p.last_checked >= self.health_check_interval]
+            for pooled in due:
+                self._idle.remove(pooled)
+
+        for pooled in expired:
+            self._close_client(pooled)
+
+        for pooled in due:
+            if self._ping(pooled):
+                pooled.last_checked = time.monotonic()
+                with self._lock:
+                    if not self._closed and len(self._idle) < self.max_size:
+                        # Re-insert at the cold end so recently used clients are reused first
+                        self._idle.appendleft(pooled)
+                        continue
+            else:
+                with self._lock:
+                    self._discarded_total += 1
+            self._close_client(pooled)
+
+    @staticmethod
+    def _ping(pooled: PooledClient) -> bool:
+        try:
+            return bool(pooled.client.ping())
+        except Exception as e:
+            logger.warning("Pooled ClickHouse client failed liveness check: %s", e)
+            return False
+
+    def _close_client(self, pooled: PooledClient) -> None:
+        with self._lock:
+            self._live.discard(pooled)
+        try:
+            pooled.client.close()
+        except Exception as e:
+            logger.debug("Error closing ClickHouse client: %s", e)
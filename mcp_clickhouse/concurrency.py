@@ -0,0 +1,316 @@
+"""Concurrency control for the async tool path.
+
+Async tools wait on the event loop for a FairScheduler slot before handing blocking
+work to the query executor. The scheduler hands out no more slots than the executor
+has workers, in weighted fair order across clients, so one busy client cannot occupy
+every worker or push other clients' calls to the back of a shared queue, and waiting
+calls never block the loop or a thread. Concurrent identical calls are collapsed by
+SingleFlight so they share one execution.
+"""
+
+import asyncio
+import functools
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+DEFAULT_TENANT = "default"
+
+
+def current_tenant() -> str:
+    """Identify the MCP client making the current tool call.
+
+    Uses the client of the request's access token (i.e. the API key) when the server
+    authenticates requests, otherwise the client_id the client sent with the request,
+    falling back to its session id. Calls made outside of an MCP request share the
+    ``default`` tenant.
+    """
+    try:
+        from fastmcp.server.dependencies import get_access_token, get_context
+
+        ctx = get_context()
+    except (ImportError, RuntimeError):
+        return DEFAULT_TENANT
+    try:
+        token = get_access_token()
+    except Exception:
+        token = None
+    if token is not None and getattr(token, "client_id", None):
+        return str(token.client_id)
+    for attr in ("client_id", "session_id"):
+        try:
+            value = getattr(ctx, attr, None)
+        except Exception:
+            value = None
+        if value:
+            return str(value)
+    return DEFAULT_TENANT
+
+
+class SchedulerFull(RuntimeError):
+    """Raised when a call is rejected because the scheduler's queue is full."""
+
+
+class _Waiter:
+    __slots__ = ("future", "resource", "resource_limit")
+
+    def __init__(self, future: "asyncio.Future", resource: Optional[Hashable], resource_limit: int):
+        self.future = future
+        self.resource = resource
+        self.resource_limit = resource_limit
+
+
+class _TenantQueue:
+    __slots__ = ("waiters", "running", "pass_")
+
+    def __init__(self, pass_: float):
+        self.waiters: Deque[_Waiter] = deque()
+        self.running = 0
+        self.pass_ = pass_
+
+
+class FairScheduler:
+    """Admits calls to a fixed number of execution slots in weighted fair order.
+
+    Each tenant has its own queue. When a slot frees up, the tenant that has received
+    the least service relative to its weight runs next (stride scheduling, a weighted
+    fair queuing discipline with one unit of cost per call), so a tenant submitting
+    many calls only delays its own. A tenant that becomes active starts at the current
+    virtual time and cannot bank credit while idle. Tenants are dropped once they have
+    no running or waiting calls, so short-lived sessions do not accumulate.
+
+    A call may also name a resource, such as the ClickHouse connection it uses, with a
+    limit on calls running against it; a tenant whose next call's resource is
+    saturated is passed over until that resource frees up.
+
+    All methods must be called from the event loop.
+
+    Args:
+        capacity: Calls running at once over all tenants
+        max_per_tenant: Calls one tenant may run at once
+        max_queued: Calls waiting over all tenants before new calls are rejected
+        max_queued_per_tenant: Calls one tenant may have waiting before its new calls are
+            rejected
+        weights: Share of the capacity of each tenant relative to the others; tenants
+            not listed have weight 1
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        max_per_tenant: int,
+        max_queued: int = 100,
+        max_queued_per_tenant: int = 16,
+        weights: Optional[Dict[str, float]] = None,
+    ):
+        if capacity < 1 or max_per_tenant < 1:
+            raise ValueError(
+                "Scheduler capacity and per-client concurrency limit must be at least 1"
+            )
+        self.capacity = capacity
+        self.max_per_tenant = max_per_tenant
+        self.max_queued = max_queued
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.weights = dict(weights or {})
+        self._tenants: Dict[str, _TenantQueue] = {}
+        self._resources: Dict[Hashable, int] = {}
+        self._running = 0
+        self._queued = 0
+        self._virtual_time = 0.0
+        self.admitted = 0
+        self.rejected = 0
+
+    @asynccontextmanager
+    async def slot(
+        self, tenant: str, resource: Optional[Hashable] = None, resource_limit: int = 0
+    ) -> AsyncIterator[None]:
+        """Hold one execution slot for ``tenant`` for the duration of an ``async with`` block.
+
+        Args:
+            tenant: Identifies the client the call is made for
+            resource: Resource the call uses, if its concurrency is limited
+            resource_limit: Calls allowed to run against ``resource`` at once, 0 for no limit
+
+        Raises:
+            SchedulerFull: If the call would have to wait and the queue is full.
+        """
+        release = await self.acquire(tenant, resource, resource_limit)
+        try:
+            yield
+        finally:
+            release()
+
+    async def acquire(
+        self, tenant: str, resource: Optional[Hashable] = None, resource_limit: int = 0
+    ) -> Callable[[], None]:
+        """Wait for an execution slot for ``tenant`` and return the function releasing it.
+
+        Unlike slot(), this lets the slot outlive the awaiting coroutine, e.g. until a
+        worker thread finishes. The returned function must be called exactly once, from
+        the event loop. Arguments and errors are those of slot().
+        """
+        queue = self._tenants.get(tenant)
+        if queue is None:
+            queue = self._tenants[tenant] = _TenantQueue(self._virtual_time)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), resource, resource_limit)
+        queue.waiters.append(waiter)
+        self._queued += 1
+        self._dispatch()
+
+        if not waiter.future.done():
+            if len(queue.waiters) > self.max_queued_per_tenant or self._queued > self.max_queued:
+                self._remove_waiter(tenant, queue, waiter)
+                self.rejected += 1
+                raise SchedulerFull(
+                    f"Too many queued calls ({len(queue.waiters)} for this client, "
+                    f"{self._queued} in total), retry later"
+                )
+            try:
+                await waiter.future
+            except BaseException:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Admitted just as the caller gave up: hand the slot on
+                    self._release(tenant, queue, waiter)
+                else:
+                    self._remove_waiter(tenant, queue, waiter)
+                raise
+        return functools.partial(self._release, tenant, queue, waiter)
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of running and queued calls and lifetime counters."""
+        return {
+            "capacity": self.capacity,
+            "running": self._running,
+            "queued": self._queued,
+            "tenants": len(self._tenants),
+            "admitted_total": self.admitted,
+            "rejected_total": self.rejected,
+        }
+
+    def tenant_stats(self) -> Dict[str, Tuple[int, int]]:
+        """Get the (running, queued) calls of every active tenant."""
+        return {name: (queue.running, len(queue.waiters)) for name, queue in self._tenants.items()}
+
+    def _dispatch(self) -> None:
+        while self._running < self.capacity:
+            best_name, best = None, None
+            for name, queue in self._tenants.items():
+                if not queue.waiters or queue.running >= self.max_per_tenant:
+                    continue
+                head = queue.waiters[0]
+                if (
+                    head.resource_limit
+                    and self._resources.get(head.resource, 0) >= head.resource_limit
+                ):
+                    continue
+                if best is None or queue.pass_ < best.pass_:
+                    best_name, best = name, queue
+            if best is None:
+                return
+            waiter = best.waiters.popleft()
+            self._queued -= 1
+            best.running += 1
+            self._running += 1
+            self._resources[waiter.resource] = self._resources.get(waiter.resource, 0) + 1
+            self._virtual_time = best.pass_
+            best.pass_ += 1 / self.weights.get(best_name, 1)
+            self.admitted += 1
+            waiter.future.set_result(None)
+
+    def _release(self, tenant: str, queue: _TenantQueue, waiter: _Waiter) -> None:
+        queue.running -= 1
+        self._running -= 1
+        self._resources[waiter.resource] -= 1
+        if not self._resources[waiter.resource]:
+            del self._resources[waiter.resource]
+        self._drop_if_idle(tenant, queue)
+        self._dispatch()
+
+    def _remove_waiter(self, tenant: str, queue: _TenantQueue, waiter: _Waiter) -> None:
+        queue.waiters.remove(waiter)
+        self._queued -= 1
+        self._drop_if_idle(tenant, queue)
+
+    def _drop_if_idle(self, tenant: str, queue: _TenantQueue) -> None:
+        if not queue.running and not queue.waiters and self._tenants.get(tenant) is queue:
+            del self._tenants[tenant]
+
+
+class _Flight:
+    __slots__ = ("task", "waiters", "on_abandon")
+
+    def __init__(self, task: "asyncio.Future", on_abandon: Optional[Callable[[], None]]):
+        self.task = task
+        self.waiters = 0
+        self.on_abandon = on_abandon
+
+
+class SingleFlight:
+    """Shares one in-flight execution between concurrent calls with the same key.
+
+    The first caller for a key starts the execution; callers arriving while it runs
+    wait for the same result (or exception) instead of starting their own. Each caller
+    keeps its own timeout. The execution is cancelled, and its ``on_abandon`` callback
+    run, only once every caller waiting for it has given up.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.shared = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[], Awaitable[T]],
+        timeout: Optional[float] = None,
+        on_abandon: Optional[Callable[[], None]] = None,
+    ) -> T:
+        """Run ``fn()``, or join the execution already in flight for ``key``.
+
+        Args:
+            key: Identifies equivalent calls
+            fn: Starts the execution; only called if no call for ``key`` is in flight
+            timeout: Seconds this caller waits for the result
+            on_abandon: Called if this caller started the execution and every waiting
+                caller gave up before it finished, e.g. to cancel a server-side query
+
+        Raises:
+            asyncio.TimeoutError: If the result is not ready within ``timeout``.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()), on_abandon)
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            self.shared += 1
+        flight.waiters += 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.task), timeout)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+                if flight.on_abandon is not None:
+                    flight.on_abandon()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the number of executions in flight and of calls that joined one."""
+        return {"in_flight": len(self._flights), "shared": self.shared}
+
+    def _forget(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
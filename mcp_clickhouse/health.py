@@ -0,0 +1,103 @@
+"""Background-refreshed health status for the MCP server's probe endpoints.
+
+Probes read the last result of a periodic check instead of connecting to ClickHouse
+themselves, so frequent liveness and readiness probes across replicas cost nothing on
+the ClickHouse side beyond one cheap check per interval and server.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+logger = logging.getLogger("mcp-clickhouse")
+
+
+class HealthStatus(NamedTuple):
+    """Outcome of the most recent health check."""
+
+    healthy: bool
+    message: str
+    checked_at: float
+
+
+class HealthMonitor:
+    """Runs ``check`` every ``interval`` seconds on a daemon thread and caches the outcome.
+
+    ``check`` returns a status message when the dependency is healthy and raises
+    otherwise. A status that has not been refreshed for ``3 * interval`` seconds (for
+    example because a check hangs) is reported as unhealthy.
+
+    Args:
+        check: Probes the dependency; returns a message or raises
+        interval: Seconds between checks
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(
+        self,
+        check: Callable[[], str],
+        interval: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._check = check
+        self.interval = interval
+        self._clock = clock
+        self._status: Optional[HealthStatus] = None
+        self._first_check = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the background checks if they are not running yet."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="mcp-health-check", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background checks."""
+        self._stop.set()
+
+    def wait_for_first_check(self, timeout: Optional[float] = None) -> bool:
+        """Block until the first check finished; returns False on timeout."""
+        return self._first_check.wait(timeout)
+
+    def refresh(self) -> HealthStatus:
+        """Run the check now and cache its outcome."""
+        try:
+            status = HealthStatus(True, self._check(), self._clock())
+        except Exception as e:
+            status = HealthStatus(False, str(e), self._clock())
+            logger.warning("Health check failed: %s", e)
+        self._status = status
+        self._first_check.set()
+        return status
+
+    def status(self) -> Optional[HealthStatus]:
+        """Get the cached status, or None before the first check finished.
+
+        A status older than three intervals is returned as unhealthy.
+        """
+        status = self._status
+        if status is None:
+            return None
+        age = self._clock() - status.checked_at
+        if age > 3 * self.interval:
+            return HealthStatus(
+                False, f"Health status is stale ({age:.0f}s since last check)", status.checked_at
+            )
+        return status
+
+    def is_alive(self) -> bool:
+        """Whether the background checks are running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while True:
+            self.refresh()
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,157 @@
+"""Logging setup for the MCP server.
+
+``configure_logging`` installs the server's log handler: plain text or one JSON object
+per line, optionally behind a ``QueueHandler`` so tool calls only enqueue records and a
+background thread formats and writes them.
+
+Hot-path log calls pass their arguments lazily (``%s`` placeholders, ``query_text``) so
+nothing is formatted for records that are filtered out, and mark routine success
+records with ``extra=sampled(...)`` so CLICKHOUSE_MCP_LOG_SAMPLE_RATE can thin them out.
+Warnings and errors are never sampled.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+from typing import Any, Callable, Dict, Optional
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FORMATS = ("text", "json")
+
+# Query text longer than this is cut in log records; 0 keeps it whole
+_query_max_chars = 500
+
+
+class _Lazy:
+    """Renders ``fn(*args)`` only when the log record is formatted."""
+
+    __slots__ = ("_fn", "_args")
+
+    def __init__(self, fn: Callable[..., str], *args: Any):
+        self._fn = fn
+        self._args = args
+
+    def __str__(self) -> str:
+        return self._fn(*self._args)
+
+
+def _hash_query(query: str) -> str:
+    return hashlib.sha256(query.encode()).hexdigest()[:16]
+
+
+def _truncate_query(query: str) -> str:
+    if not _query_max_chars or len(query) <= _query_max_chars:
+        return query
+    return f"{query[:_query_max_chars]}... [{len(query)} chars, query_hash={_hash_query(query)}]"
+
+
+def query_text(query: str) -> _Lazy:
+    """Log argument for query text, cut to CLICKHOUSE_MCP_LOG_QUERY_MAX_CHARS when rendered."""
+    return _Lazy(_truncate_query, query)
+
+
+def query_hash(query: str) -> _Lazy:
+    """Log argument for a short, stable hash of the query text."""
+    return _Lazy(_hash_query, query)
+
+
+def fields(**values: Any) -> Dict[str, Any]:
+    """Build ``extra`` for a record with structured fields, emitted in JSON mode."""
+    return {"mcp_fields": values}
+
+
+def sampled(**values: Any) -> Dict[str, Any]:
+    """Build ``extra`` for a routine success record that is subject to sampling."""
+    return {"mcp_fields": values, "mcp_sampled": True}
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a ``rate`` fraction of records marked with ``sampled``, below WARNING."""
+
+    def __init__(self, rate: float, rand: Callable[[], float] = random.random):
+        super().__init__()
+        self.rate = rate
+        self._rand = rand
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not getattr(record, "mcp_sampled", False):
+            return True
+        return self.rate >= 1 or self._rand() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line, including its structured fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "mcp_fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues records unformatted, so formatting happens on the listener thread.
+
+    The stock QueueHandler formats each record before queueing it so it can be
+    pickled; records here never leave the process.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(
+    log_format: str = "text",
+    level: str = "INFO",
+    sample_rate: float = 1.0,
+    query_max_chars: int = 500,
+    use_queue: bool = True,
+) -> None:
+    """Install the server's log handler on the root logger.
+
+    Like ``logging.basicConfig``, nothing is installed if the root logger already has
+    handlers, e.g. when an application embedding the server configured logging.
+
+    Args:
+        log_format: "text" or "json"
+        level: Root log level name
+        sample_rate: Fraction of ``sampled`` records to keep
+        query_max_chars: Length at which ``query_text`` cuts queries, 0 for no limit
+        use_queue: Format and write records on a background thread
+    """
+    global _listener, _query_max_chars
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Invalid log format '{log_format}', use 'text' or 'json'")
+    _query_max_chars = query_max_chars
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(
+        JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT)
+    )
+    if use_queue:
+        queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+        _listener = logging.handlers.QueueListener(queue_handler.queue, handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+        handler = queue_handler
+    # Sampled-out records are dropped before they are queued or formatted
+    handler.addFilter(SamplingFilter(sample_rate))
+    root.addHandler(handler)
+    root.setLevel(level.upper())
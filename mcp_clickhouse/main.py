@@ -1,10 +1,51 @@
-from .mcp_server import mcp
+import logging
+import signal
+import threading
+
+from .mcp_server import mcp, reload_server_config, start_health_monitor
 from .mcp_env import get_mcp_config, TransportType
+from .tracing import configure_tracing
+
+logger = logging.getLogger("mcp-clickhouse")
+
+
+_reload_requested = threading.Event()
+
+
+def _reload_on_signal(signum, frame):
+    # Reloading reads files, takes locks and logs, none of which is safe inside
+    # a signal handler; only flag the request for the reload thread
+    _reload_requested.set()
+
+
+def _reload_loop(requested: threading.Event):
+    while True:
+        requested.wait()
+        requested.clear()
+        try:
+            reload_server_config()
+        except ValueError as e:
+            logger.error("Configuration reload failed, keeping the current configuration: %s", e)
+        except Exception:
+            logger.exception("Configuration reload failed")
+
+
+def start_config_reloader() -> None:
+    """Reload the configuration on SIGHUP, outside the signal handler."""
+    threading.Thread(
+        target=_reload_loop, args=(_reload_requested,), name="mcp-config-reload", daemon=True
+    ).start()
+    signal.signal(signal.SIGHUP, _reload_on_signal)
 
 
 def main():
     mcp_config = get_mcp_config()
     transport = mcp_config.server_transport
+    configure_tracing(mcp_config.tracing_exporter)
+    if hasattr(signal, "SIGHUP"):
+        start_config_reloader()
+    # Check ClickHouse from startup on, so the first probe finds a status
+    start_health_monitor()
 
     # For HTTP and SSE transports, we need to specify host and port
     http_transports = [TransportType.HTTP.value, TransportType.SSE.value]
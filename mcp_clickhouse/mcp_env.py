@@ -2,10 +2,16 @@
 
 This module handles all environment variable configuration with sensible defaults
 and type conversion.
+
+Each config object is a read-only snapshot: the environment is read, parsed and
+validated once when it is created, so tool calls never parse environment variables.
+``reload_config`` replaces all snapshots at once to apply configuration changes.
 """
 
-from dataclasses import dataclass
 import os
+import re
+import threading
+from functools import cached_property
 from typing import Optional
 from enum import Enum
 
@@ -23,15 +29,42 @@ class TransportType(str, Enum):
         return [transport.value for transport in cls]
 
 
-@dataclass
-class ClickHouseConfig:
+class _Snapshot:
+    """Base for config classes whose settings are read once, when the object is created.
+
+    Settings are ``cached_property`` values that ``_load`` evaluates eagerly, which also
+    validates them; afterwards the object cannot be modified.
+    """
+
+    def _load(self, required: bool = True) -> None:
+        for cls in type(self).__mro__:
+            for name, attr in vars(cls).items():
+                if not isinstance(attr, cached_property):
+                    continue
+                try:
+                    getattr(self, name)
+                except KeyError:
+                    # Required variables of a disabled backend may be missing
+                    if required:
+                        raise
+
+    def _settings(self) -> dict:
+        return {name: value for name, value in vars(self).items() if not name.startswith("_")}
+
+    def __setattr__(self, name, value):
+        raise AttributeError(
+            f"{type(self).__name__} is read-only; change the environment and call reload_config()"
+        )
+
+
+class ClickHouseConfig(_Snapshot):
     """Configuration for ClickHouse connection settings.
 
     This class handles all environment variable configuration with sensible defaults
     and type conversion. It provides typed methods for accessing each configuration value.
 
     Required environment variables (only when CLICKHOUSE_ENABLED=true):
-        CLICKHOUSE_HOST: The hostname of the ClickHouse server
+        CLICKHOUSE_HOST: The hostname of the ClickHouse server (not required if CLICKHOUSE_HOSTS is set)
         CLICKHOUSE_USER: The username for authentication
         CLICKHOUSE_PASSWORD: The password for authentication
 
@@ -44,94 +77,234 @@ class ClickHouseConfig:
         CLICKHOUSE_DATABASE: Default database to use (default: None)
         CLICKHOUSE_PROXY_PATH: Path to be added to the host URL. For instance, for servers behind an HTTP proxy (default: None)
         CLICKHOUSE_ENABLED: Enable ClickHouse server (default: true)
+        CLICKHOUSE_POOL_SIZE: Maximum number of pooled client connections (default: 10)
+        CLICKHOUSE_POOL_IDLE_TIMEOUT: Seconds before an idle pooled client is closed (default: 300)
+        CLICKHOUSE_POOL_HEALTH_CHECK_INTERVAL: Seconds between background liveness checks of idle clients (default: 30)
+        CLICKHOUSE_HOSTS: Comma-separated replicas to spread queries over, each "host[:port][=weight]" (default: None)
+        CLICKHOUSE_LOAD_BALANCING: Replica selection: "round_robin", "least_in_flight" or "latency" (default: round_robin)
+        CLICKHOUSE_REPLICA_EJECT_SECONDS: Seconds a failed replica is taken out of rotation before it is probed again (default: 30)
+
+    A named connection (see MCPServerConfig.connections) reads the same settings from
+    CLICKHOUSE_<NAME>_HOST, CLICKHOUSE_<NAME>_USER, and so on. Settings other than the
+    host, credentials, database and proxy path default to the unprefixed variable.
     """
 
-    def __init__(self):
-        """Initialize the configuration from environment variables."""
+    # Settings that identify the server and account, which named connections never inherit
+    _OWN_SETTINGS = ("HOST", "HOSTS", "USER", "PASSWORD", "DATABASE", "PROXY_PATH")
+
+    def __init__(self, connection: Optional[str] = None):
+        """Initialize the configuration from environment variables.
+
+        Args:
+            connection: Name of a connection listed in CLICKHOUSE_CONNECTIONS, whose
+                settings are read from CLICKHOUSE_<NAME>_* variables; None for the
+                default connection
+        """
+        object.__setattr__(self, "connection", connection)
         if self.enabled:
             self._validate_required_vars()
-
-    @property
+        self._load(required=self.enabled)
+
+    def _var(self, setting: str) -> str:
+        """Get the name of the environment variable holding ``setting`` for this connection."""
+        if self.connection is None:
+            return f"CLICKHOUSE_{setting}"
+        return f"CLICKHOUSE_{self.connection.upper()}_{setting}"
+
+    def _getenv(self, setting: str, default: Optional[str] = None) -> Optional[str]:
+        value = os.getenv(self._var(setting))
+        if value is None and self.connection is not None and setting not in self._OWN_SETTINGS:
+            # Named connections fall back to the default connection's tuning settings
+            value = os.getenv(f"CLICKHOUSE_{setting}")
+        return default if value is None else value
+
+    @cached_property
     def enabled(self) -> bool:
         """Get whether ClickHouse server is enabled.
 
         Default: True
         """
-        return os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true"
+        if self.connection is not None:
+            return True
+        return self._getenv("ENABLED", "true").lower() == "true"
 
-    @property
+    @cached_property
     def host(self) -> str:
-        """Get the ClickHouse host."""
-        return os.environ["CLICKHOUSE_HOST"]
+        """Get the ClickHouse host, or the first replica's if only CLICKHOUSE_HOSTS is set."""
+        if self._var("HOST") not in os.environ and self._getenv("HOSTS"):
+            return self.replicas[0][0]
+        return os.environ[self._var("HOST")]
 
-    @property
+    @cached_property
     def port(self) -> int:
         """Get the ClickHouse port.
 
         Defaults to 8443 if secure=True, 8123 if secure=False.
         Can be overridden by CLICKHOUSE_PORT environment variable.
         """
-        if "CLICKHOUSE_PORT" in os.environ:
-            return int(os.environ["CLICKHOUSE_PORT"])
+        port = self._getenv("PORT")
+        if port is not None:
+            return int(port)
         return 8443 if self.secure else 8123
 
-    @property
+    @cached_property
     def username(self) -> str:
         """Get the ClickHouse username."""
-        return os.environ["CLICKHOUSE_USER"]
+        return os.environ[self._var("USER")]
 
-    @property
+    @cached_property
     def password(self) -> str:
         """Get the ClickHouse password."""
-        return os.environ["CLICKHOUSE_PASSWORD"]
+        return os.environ[self._var("PASSWORD")]
 
-    @property
+    @cached_property
     def database(self) -> Optional[str]:
         """Get the default database name if set."""
-        return os.getenv("CLICKHOUSE_DATABASE")
+        return self._getenv("DATABASE")
 
-    @property
+    @cached_property
     def secure(self) -> bool:
         """Get whether HTTPS is enabled.
 
         Default: True
         """
-        return os.getenv("CLICKHOUSE_SECURE", "true").lower() == "true"
+        return self._getenv("SECURE", "true").lower() == "true"
 
-    @property
+    @cached_property
     def verify(self) -> bool:
         """Get whether SSL certificate verification is enabled.
 
         Default: True
         """
-        return os.getenv("CLICKHOUSE_VERIFY", "true").lower() == "true"
+        return self._getenv("VERIFY", "true").lower() == "true"
 
-    @property
+    @cached_property
     def connect_timeout(self) -> int:
         """Get the connection timeout in seconds.
 
         Default: 30
         """
-        return int(os.getenv("CLICKHOUSE_CONNECT_TIMEOUT", "30"))
+        return int(self._getenv("CONNECT_TIMEOUT", "30"))
 
-    @property
+    @cached_property
     def send_receive_timeout(self) -> int:
         """Get the send/receive timeout in seconds.
 
         Default: 300 (ClickHouse default)
         """
-        return int(os.getenv("CLICKHOUSE_SEND_RECEIVE_TIMEOUT", "300"))
+        return int(self._getenv("SEND_RECEIVE_TIMEOUT", "300"))
 
-    @property
+    @cached_property
     def proxy_path(self) -> str:
-        return os.getenv("CLICKHOUSE_PROXY_PATH")
+        return self._getenv("PROXY_PATH")
 
-    def get_client_config(self) -> dict:
+    @cached_property
+    def pool_size(self) -> int:
+        """Get the maximum number of pooled client connections.
+
+        Default: 10
+        """
+        return int(self._getenv("POOL_SIZE", "10"))
+
+    @cached_property
+    def pool_idle_timeout(self) -> int:
+        """Get the number of seconds after which an idle pooled client is closed.
+
+        Default: 300
+        """
+        return int(self._getenv("POOL_IDLE_TIMEOUT", "300"))
+
+    @cached_property
+    def pool_health_check_interval(self) -> int:
+        """Get the number of seconds between background liveness checks of idle clients.
+
+        Default: 30
+        """
+        return int(self._getenv("POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+    @cached_property
+    def replicas(self) -> list[tuple[str, int, int]]:
+        """Get the (host, port, weight) of every replica queries are spread over.
+
+        Parsed from CLICKHOUSE_HOSTS, where the port defaults to CLICKHOUSE_PORT's
+        default and the weight to 1. Without CLICKHOUSE_HOSTS, this is CLICKHOUSE_HOST.
+        """
+        hosts = self._getenv("HOSTS", "")
+        if not hosts.strip():
+            return [(self.host, self.port, 1)]
+        replicas = []
+        for entry in hosts.split(","):
+            entry = entry.strip()
+            if not entry:
+                continue
+            address, _, weight = entry.partition("=")
+            host, _, port = address.partition(":")
+            try:
+                replica = (host, int(port) if port else self.port, int(weight) if weight else 1)
+            except ValueError:
+                raise ValueError(
+                    f"Invalid {self._var('HOSTS')} entry '{entry}', use host[:port][=weight]"
+                )
+            if not host or replica[2] < 1:
+                raise ValueError(
+                    f"Invalid {self._var('HOSTS')} entry '{entry}', use host[:port][=weight]"
+                )
+            replicas.append(replica)
+        return replicas
+
+    @cached_property
+    def load_balancing(self) -> str:
+        """Get how queries are spread over replicas.
+
+        Default: round_robin
+        """
+        policy = self._getenv("LOAD_BALANCING", "round_robin").lower()
+        if policy not in ("round_robin", "least_in_flight", "latency"):
+            raise ValueError(
+                f"Invalid {self._var('LOAD_BALANCING')} '{policy}', "
+                "use 'round_robin', 'least_in_flight' or 'latency'"
+            )
+        return policy
+
+    @cached_property
+    def replica_eject_seconds(self) -> int:
+        """Get the number of seconds a failed replica is ejected before it is probed again.
+
+        Default: 30
+        """
+        return int(self._getenv("REPLICA_EJECT_SECONDS", "30"))
+
+    def get_pool_config(self) -> dict:
+        """Get the configuration dictionary for the ClickHouse client pool.
+
+        Returns:
+            dict: Configuration ready to be passed to ClickHouseClientPool()
+        """
+        return {
+            "max_size": self.pool_size,
+            "idle_timeout": self.pool_idle_timeout,
+            "health_check_interval": self.pool_health_check_interval,
+            "acquire_timeout": self.connect_timeout,
+        }
+
+    def get_client_config(self, host: Optional[str] = None, port: Optional[int] = None) -> dict:
         """Get the configuration dictionary for clickhouse_connect client.
 
+        Args:
+            host: Connect to this replica instead of CLICKHOUSE_HOST
+            port: Port of ``host``
+
         Returns:
             dict: Configuration ready to be passed to clickhouse_connect.get_client()
         """
+        config = dict(self._client_config)
+        if host is not None:
+            config["host"] = host
+            config["port"] = port if port is not None else self.port
+        return config
+
+    @cached_property
+    def _client_config(self) -> dict:
         config = {
             "host": self.host,
             "port": self.port,
@@ -161,7 +334,10 @@ class ClickHouseConfig:
             ValueError: If any required environment variable is missing.
         """
         missing_vars = []
-        for var in ["CLICKHOUSE_HOST", "CLICKHOUSE_USER", "CLICKHOUSE_PASSWORD"]:
+        for setting in ["HOST", "USER", "PASSWORD"]:
+            if setting == "HOST" and self._getenv("HOSTS"):
+                continue
+            var = self._var(setting)
             if var not in os.environ:
                 missing_vars.append(var)
 
@@ -169,8 +345,7 @@ class ClickHouseConfig:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
 
 
-@dataclass
-class ChDBConfig:
+class ChDBConfig(_Snapshot):
     """Configuration for chDB connection settings.
 
     This class handles all environment variable configuration with sensible defaults
@@ -178,14 +353,20 @@ class ChDBConfig:
 
     Required environment variables:
         CHDB_DATA_PATH: The path to the chDB data directory (only required if CHDB_ENABLED=true)
+
+    Optional environment variables (with defaults):
+        CHDB_POOL_SIZE: Maximum number of chDB sessions, i.e. of concurrently running chDB queries (default: 4)
+        CHDB_MAX_QUEUED_QUERIES: chDB queries allowed to wait for a session before new ones are rejected (default: 16)
+        CHDB_EXECUTION_MODE: "thread" runs chDB in the server process, "process" in killable worker subprocesses (default: thread)
     """
 
     def __init__(self):
         """Initialize the configuration from environment variables."""
         if self.enabled:
             self._validate_required_vars()
+        self._load(required=self.enabled)
 
-    @property
+    @cached_property
     def enabled(self) -> bool:
         """Get whether chDB is enabled.
 
@@ -193,11 +374,38 @@ class ChDBConfig:
         """
         return os.getenv("CHDB_ENABLED", "false").lower() == "true"
 
-    @property
+    @cached_property
     def data_path(self) -> str:
         """Get the chDB data path."""
         return os.getenv("CHDB_DATA_PATH", ":memory:")
 
+    @cached_property
+    def pool_size(self) -> int:
+        """Get the maximum number of chDB sessions.
+
+        Default: 4
+        """
+        return int(os.getenv("CHDB_POOL_SIZE", "4"))
+
+    @cached_property
+    def max_queued_queries(self) -> int:
+        """Get the number of chDB queries allowed to wait for a free session.
+
+        Default: 16
+        """
+        return int(os.getenv("CHDB_MAX_QUEUED_QUERIES", "16"))
+
+    @cached_property
+    def execution_mode(self) -> str:
+        """Get where chDB queries run: "thread" (in-process) or "process" (worker subprocesses).
+
+        Default: thread
+        """
+        mode = os.getenv("CHDB_EXECUTION_MODE", "thread").lower()
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Invalid CHDB_EXECUTION_MODE '{mode}', use 'thread' or 'process'")
+        return mode
+
     def get_client_config(self) -> dict:
         """Get the configuration dictionary for chDB client.
 
@@ -220,14 +428,47 @@ class ChDBConfig:
 # Global instance placeholders for the singleton pattern
 _CONFIG_INSTANCE = None
 _CHDB_CONFIG_INSTANCE = None
+# ClickHouseConfig of each named connection that has been used, by name
+_CONNECTION_CONFIGS: dict = {}
+
+DEFAULT_CONNECTION = "default"
+
+
+def resolve_connection(connection: Optional[str] = None) -> Optional[str]:
+    """Get the canonical name of a connection: None for the default one.
+
+    Args:
+        connection: A name from CLICKHOUSE_CONNECTIONS, "default", or None for the
+            default connection
+
+    Raises:
+        ValueError: If there is no connection with that name.
+    """
+    mcp_config = get_mcp_config()
+    if connection is None or connection.lower() == DEFAULT_CONNECTION:
+        return mcp_config.default_connection
+    name = connection.lower()
+    if name not in mcp_config.connections:
+        available = ", ".join(mcp_config.connection_names)
+        raise ValueError(f"Unknown connection '{connection}', available connections: {available}")
+    return name
 
 
-def get_config():
+def get_config(connection: Optional[str] = None) -> ClickHouseConfig:
     """
-    Gets the singleton instance of ClickHouseConfig.
+    Gets the singleton instance of ClickHouseConfig for a connection.
     Instantiates it on the first call.
+
+    Args:
+        connection: Connection name, see resolve_connection; None for the default one
     """
     global _CONFIG_INSTANCE
+    name = resolve_connection(connection)
+    if name is not None:
+        config = _CONNECTION_CONFIGS.get(name)
+        if config is None:
+            config = _CONNECTION_CONFIGS.setdefault(name, ClickHouseConfig(name))
+        return config
     if _CONFIG_INSTANCE is None:
         # Instantiate the config object here, ensuring load_dotenv() has likely run
         _CONFIG_INSTANCE = ClickHouseConfig()
@@ -248,8 +489,7 @@ def get_chdb_config() -> ChDBConfig:
     return _CHDB_CONFIG_INSTANCE
 
 
-@dataclass
-class MCPServerConfig:
+class MCPServerConfig(_Snapshot):
     """Configuration for MCP server-level settings.
 
     These settings control the server transport and tool behavior and are
@@ -260,9 +500,40 @@ class MCPServerConfig:
         CLICKHOUSE_MCP_BIND_HOST: Bind host for HTTP/SSE (default: 127.0.0.1)
         CLICKHOUSE_MCP_BIND_PORT: Bind port for HTTP/SSE (default: 8000)
         CLICKHOUSE_MCP_QUERY_TIMEOUT: SELECT tool timeout in seconds (default: 30)
+        CLICKHOUSE_MCP_MAX_RESULT_ROWS: Maximum rows returned per run_select_query page (default: 10000)
+        CLICKHOUSE_MCP_MAX_RESULT_BYTES: Approximate maximum bytes returned per run_select_query page (default: 16777216)
+        CLICKHOUSE_MCP_AUTO_LIMIT: Append a LIMIT to top-level SELECTs without one (default: false)
+        CLICKHOUSE_MCP_QUERY_WORKERS: Threads executing blocking tool work (default: 10)
+        CLICKHOUSE_MCP_MAX_CONCURRENT_QUERIES_PER_CLIENT: In-flight tool calls allowed per MCP client (default: 4)
+        CLICKHOUSE_MCP_MAX_QUEUED_CALLS: Tool calls waiting for a worker before new calls are rejected (default: 100)
+        CLICKHOUSE_MCP_MAX_QUEUED_CALLS_PER_CLIENT: Tool calls one client may have waiting before its new calls are rejected (default: 16)
+        CLICKHOUSE_MCP_CLIENT_WEIGHTS: Comma-separated "client=weight" shares of the workers; other clients have weight 1 (default: None)
+        CLICKHOUSE_MCP_METADATA_CACHE_TTL: Seconds list_databases/list_tables results are cached, 0 disables (default: 60)
+        CLICKHOUSE_MCP_METADATA_CACHE_SIZE: Maximum number of cached discovery results (default: 256)
+        CLICKHOUSE_MCP_METADATA_CACHE_REVALIDATE_INTERVAL: Minimum seconds between schema change checks per database (default: 5)
+        CLICKHOUSE_MCP_RESULT_CACHE_TTL: Seconds run_select_query results are cached, 0 disables (default: 0)
+        CLICKHOUSE_MCP_RESULT_CACHE_MAX_BYTES: Approximate total size of cached query results (default: 67108864)
+        CLICKHOUSE_MCP_HEALTH_CHECK_INTERVAL: Seconds between background ClickHouse health checks (default: 10)
+        CLICKHOUSE_MCP_TRACING_EXPORTER: OpenTelemetry span exporter to install, "none" or "console" (default: none)
+        CLICKHOUSE_MCP_COST_PREFLIGHT: Check queries with EXPLAIN ESTIMATE first: "off", "warn" or "reject" (default: off)
+        CLICKHOUSE_MCP_MAX_ESTIMATED_ROWS: Estimated rows a query may read, 0 for no limit (default: 0)
+        CLICKHOUSE_MCP_MAX_ESTIMATED_PARTS: Estimated parts a query may read, 0 for no limit (default: 0)
+        CLICKHOUSE_MCP_MAX_ESTIMATED_MARKS: Estimated marks a query may read, 0 for no limit (default: 0)
+        CLICKHOUSE_MCP_COST_PREFLIGHT_FAIL_OPEN: In reject mode, run queries whose cost cannot be estimated (default: false)
+        CLICKHOUSE_MCP_COST_ESTIMATE_CACHE_TTL: Seconds a query's cost estimate is reused (default: 300)
+        CLICKHOUSE_MCP_LOG_FORMAT: "text" or "json" (one object per line) (default: text)
+        CLICKHOUSE_MCP_LOG_LEVEL: Log level (default: INFO)
+        CLICKHOUSE_MCP_LOG_SAMPLE_RATE: Fraction of routine success log records kept (default: 1.0)
+        CLICKHOUSE_MCP_LOG_QUERY_MAX_CHARS: Query text longer than this is cut in logs, 0 keeps it whole (default: 500)
+        CLICKHOUSE_MCP_LOG_QUEUE: Format and write logs on a background thread (default: true)
+        CLICKHOUSE_CONNECTIONS: Comma-separated names of additional ClickHouse connections, see ClickHouseConfig (default: None)
     """
 
-    @property
+    def __init__(self):
+        """Initialize the configuration from environment variables."""
+        self._load()
+
+    @cached_property
     def server_transport(self) -> str:
         transport = os.getenv("CLICKHOUSE_MCP_SERVER_TRANSPORT", TransportType.STDIO.value).lower()
         if transport not in TransportType.values():
@@ -270,18 +541,176 @@ class MCPServerConfig:
             raise ValueError(f"Invalid transport '{transport}'. Valid options: {valid_options}")
         return transport
 
-    @property
+    @cached_property
     def bind_host(self) -> str:
         return os.getenv("CLICKHOUSE_MCP_BIND_HOST", "127.0.0.1")
 
-    @property
+    @cached_property
     def bind_port(self) -> int:
         return int(os.getenv("CLICKHOUSE_MCP_BIND_PORT", "8000"))
 
-    @property
+    @cached_property
     def query_timeout(self) -> int:
         return int(os.getenv("CLICKHOUSE_MCP_QUERY_TIMEOUT", "30"))
 
+    @cached_property
+    def max_result_rows(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_RESULT_ROWS", "10000"))
+
+    @cached_property
+    def max_result_bytes(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_RESULT_BYTES", str(16 * 1024 * 1024)))
+
+    @cached_property
+    def auto_limit(self) -> bool:
+        return os.getenv("CLICKHOUSE_MCP_AUTO_LIMIT", "false").lower() == "true"
+
+    @cached_property
+    def query_workers(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_QUERY_WORKERS", "10"))
+
+    @cached_property
+    def max_concurrent_queries_per_client(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_CONCURRENT_QUERIES_PER_CLIENT", "4"))
+
+    @cached_property
+    def max_queued_calls(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_QUEUED_CALLS", "100"))
+
+    @cached_property
+    def max_queued_calls_per_client(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_QUEUED_CALLS_PER_CLIENT", "16"))
+
+    @cached_property
+    def client_weights(self) -> dict[str, float]:
+        weights = {}
+        for entry in os.getenv("CLICKHOUSE_MCP_CLIENT_WEIGHTS", "").split(","):
+            if not entry.strip():
+                continue
+            client, _, weight = entry.strip().rpartition("=")
+            try:
+                value = float(weight)
+            except ValueError:
+                value = 0.0
+            if not client.strip() or value <= 0:
+                raise ValueError(
+                    f"Invalid CLICKHOUSE_MCP_CLIENT_WEIGHTS entry '{entry.strip()}', use client=weight"
+                )
+            weights[client.strip()] = value
+        return weights
+
+    @cached_property
+    def metadata_cache_ttl(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_METADATA_CACHE_TTL", "60"))
+
+    @cached_property
+    def metadata_cache_size(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_METADATA_CACHE_SIZE", "256"))
+
+    @cached_property
+    def metadata_cache_revalidate_interval(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_METADATA_CACHE_REVALIDATE_INTERVAL", "5"))
+
+    @cached_property
+    def result_cache_ttl(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_RESULT_CACHE_TTL", "0"))
+
+    @cached_property
+    def result_cache_max_bytes(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+    @cached_property
+    def health_check_interval(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_HEALTH_CHECK_INTERVAL", "10"))
+
+    @cached_property
+    def tracing_exporter(self) -> str:
+        return os.getenv("CLICKHOUSE_MCP_TRACING_EXPORTER", "none").lower()
+
+    @cached_property
+    def cost_preflight(self) -> str:
+        mode = os.getenv("CLICKHOUSE_MCP_COST_PREFLIGHT", "off").lower()
+        if mode not in ("off", "warn", "reject"):
+            raise ValueError(
+                f"Invalid CLICKHOUSE_MCP_COST_PREFLIGHT '{mode}', use 'off', 'warn' or 'reject'"
+            )
+        return mode
+
+    @cached_property
+    def cost_preflight_fail_open(self) -> bool:
+        return os.getenv("CLICKHOUSE_MCP_COST_PREFLIGHT_FAIL_OPEN", "false").lower() == "true"
+
+    @cached_property
+    def max_estimated_rows(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_ESTIMATED_ROWS", "0"))
+
+    @cached_property
+    def max_estimated_parts(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_ESTIMATED_PARTS", "0"))
+
+    @cached_property
+    def max_estimated_marks(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_MAX_ESTIMATED_MARKS", "0"))
+
+    @cached_property
+    def cost_estimate_cache_ttl(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_COST_ESTIMATE_CACHE_TTL", "300"))
+
+    @cached_property
+    def log_format(self) -> str:
+        return os.getenv("CLICKHOUSE_MCP_LOG_FORMAT", "text").lower()
+
+    @cached_property
+    def log_level(self) -> str:
+        return os.getenv("CLICKHOUSE_MCP_LOG_LEVEL", "INFO").upper()
+
+    @cached_property
+    def log_sample_rate(self) -> float:
+        return float(os.getenv("CLICKHOUSE_MCP_LOG_SAMPLE_RATE", "1.0"))
+
+    @cached_property
+    def log_query_max_chars(self) -> int:
+        return int(os.getenv("CLICKHOUSE_MCP_LOG_QUERY_MAX_CHARS", "500"))
+
+    @cached_property
+    def log_queue(self) -> bool:
+        return os.getenv("CLICKHOUSE_MCP_LOG_QUEUE", "true").lower() == "true"
+
+    @cached_property
+    def connections(self) -> list[str]:
+        """Get the lowercased names of the named ClickHouse connections."""
+        names = []
+        for name in os.getenv("CLICKHOUSE_CONNECTIONS", "").split(","):
+            name = name.strip().lower()
+            if not name:
+                continue
+            if not re.fullmatch(r"[a-z][a-z0-9_]*", name) or name == DEFAULT_CONNECTION:
+                raise ValueError(
+                    f"Invalid connection name '{name}' in CLICKHOUSE_CONNECTIONS, use letters, "
+                    f"digits and underscores, and not '{DEFAULT_CONNECTION}'"
+                )
+            if name not in names:
+                names.append(name)
+        return names
+
+    @cached_property
+    def default_connection(self) -> Optional[str]:
+        """Get the connection used when a tool call names none.
+
+        The unprefixed CLICKHOUSE_HOST connection (None) if it is configured, otherwise the
+        first named connection.
+        """
+        if self.connections and not (os.getenv("CLICKHOUSE_HOST") or os.getenv("CLICKHOUSE_HOSTS")):
+            return self.connections[0]
+        return None
+
+    @cached_property
+    def connection_names(self) -> list[str]:
+        """Get the names tool calls may pass as their connection."""
+        if self.default_connection is None:
+            return [DEFAULT_CONNECTION] + self.connections
+        return list(self.connections)
+
 
 _MCP_CONFIG_INSTANCE = None
 
@@ -292,3 +721,54 @@ def get_mcp_config() -> MCPServerConfig:
     if _MCP_CONFIG_INSTANCE is None:
         _MCP_CONFIG_INSTANCE = MCPServerConfig()
     return _MCP_CONFIG_INSTANCE
+
+
+_RELOAD_LOCK = threading.Lock()
+
+
+def reload_config() -> list[str]:
+    """Re-read all configuration from the environment and swap it in at once.
+
+    The new snapshots are built and validated before any is installed, so an invalid
+    environment raises and leaves the current configuration in place. A ClickHouse
+    configuration is only rebuilt if it was loaded before. Settings are read when
+    they are used, so e.g. pooled connections keep the settings they were created with.
+
+    Returns:
+        list[str]: Names of the settings that changed
+
+    Raises:
+        ValueError: If the new configuration is invalid.
+    """
+    global _CONFIG_INSTANCE, _CHDB_CONFIG_INSTANCE, _MCP_CONFIG_INSTANCE, _CONNECTION_CONFIGS
+    with _RELOAD_LOCK:
+        old = (_CONFIG_INSTANCE, _CHDB_CONFIG_INSTANCE, _MCP_CONFIG_INSTANCE)
+        new = (
+            ClickHouseConfig() if _CONFIG_INSTANCE is not None else None,
+            ChDBConfig(),
+            MCPServerConfig(),
+        )
+        # Connections that are no longer listed are dropped
+        old_connections = _CONNECTION_CONFIGS
+        new_connections = {
+            name: ClickHouseConfig(name) for name in old_connections if name in new[2].connections
+        }
+        _CONFIG_INSTANCE, _CHDB_CONFIG_INSTANCE, _MCP_CONFIG_INSTANCE = new
+        _CONNECTION_CONFIGS = new_connections
+
+    changed = []
+    pairs = list(zip(("clickhouse", "chdb", "mcp"), old, new))
+    pairs.extend(
+        (f"clickhouse.{name}", config, new_connections.get(name))
+        for name, config in old_connections.items()
+    )
+    for prefix, before, after in pairs:
+        if before is None or after is None:
+            continue
+        before, after = before._settings(), after._settings()
+        changed.extend(
+            f"{prefix}.{name}"
+            for name in sorted(before.keys() | after.keys())
+            if before.get(name) != after.get(name)
+        )
+    return changed
@@ -1,24 +1,61 @@
 import logging
 import json
-from typing import Optional, List, Any
+from typing import Optional, Dict, List, Any, Union
+import asyncio
+import base64
 import concurrent.futures
+import contextvars
+import functools
+import hashlib
+import inspect
 import atexit
 import os
+import threading
+import time
+import uuid
 
-import clickhouse_connect
-import chdb.session as chs
-from clickhouse_connect.driver.binding import format_query_value
-from dotenv import load_dotenv
+from dotenv import dotenv_values, find_dotenv, load_dotenv
 from fastmcp import FastMCP
 from fastmcp.tools import Tool
 from fastmcp.prompts import Prompt
 from fastmcp.exceptions import ToolError
 from dataclasses import dataclass, field, asdict, is_dataclass
+from datetime import datetime, time as dt_time, timedelta
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse
 
-from mcp_clickhouse.mcp_env import get_config, get_chdb_config, get_mcp_config
+from mcp_clickhouse import metrics, tracing
+from mcp_clickhouse.mcp_env import (
+    DEFAULT_CONNECTION,
+    get_config,
+    get_chdb_config,
+    get_mcp_config,
+    reload_config,
+    resolve_connection,
+)
 from mcp_clickhouse.chdb_prompt import CHDB_PROMPT
+from mcp_clickhouse.chdb_executor import ChDBProcessPool, ChDBSessionPool
+from mcp_clickhouse.client_pool import ClickHouseClientPool, PoolTimeoutError
+from mcp_clickhouse.cache import MetadataCache, ResultCache
+from mcp_clickhouse.health import HealthMonitor
+from mcp_clickhouse.log import configure_logging, fields, query_hash, query_text, sampled
+from mcp_clickhouse.preflight import OFF, CostLimits, CostPreflight, estimate_cost
+from mcp_clickhouse.router import ReplicaRouter
+from mcp_clickhouse.concurrency import FairScheduler, SchedulerFull, SingleFlight, current_tenant
+from mcp_clickhouse.sql import (
+    apply_auto_limit,
+    is_deterministic,
+    normalize_query,
+    reads_current_date,
+)
+from mcp_clickhouse.result_format import (
+    CHDB_OUTPUT_FORMATS,
+    ROWS,
+    decode_chdb_result,
+    estimate_result_bytes,
+    read_page,
+    validate_format,
+)
 
 
 @dataclass
@@ -55,50 +92,275 @@ class Table:
 
 MCP_SERVER_NAME = "mcp-clickhouse"
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(MCP_SERVER_NAME)
 
-QUERY_EXECUTOR = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+# Variables set by the process environment take precedence over .env on reload too
+_INITIAL_ENV_KEYS = frozenset(os.environ)
+_DOTENV_PATH = find_dotenv()
+load_dotenv(_DOTENV_PATH)
+
+_log_config = get_mcp_config()
+configure_logging(
+    log_format=_log_config.log_format,
+    level=_log_config.log_level,
+    sample_rate=_log_config.log_sample_rate,
+    query_max_chars=_log_config.log_query_max_chars,
+    use_queue=_log_config.log_queue,
+)
+
+
+def reload_server_config() -> List[str]:
+    """Re-read .env and the environment and apply the new configuration.
+
+    Tool calls pick up the new settings as they start; in-flight calls finish with
+    the settings they started with. The client pool of a connection whose ClickHouse
+    settings changed is replaced, see reset_client_pools. Sizes of worker threads and
+    caches, as well as logging and transport settings, are fixed at startup.
+
+    Returns:
+        List[str]: Names of the settings that changed
+
+    Raises:
+        ValueError: If the new configuration is invalid; the current one stays in place.
+    """
+    if _DOTENV_PATH:
+        for key, value in dotenv_values(_DOTENV_PATH).items():
+            if key not in _INITIAL_ENV_KEYS and value is not None:
+                os.environ[key] = value
+    changed = reload_config()
+    reset_client_pools(changed)
+    logger.info("Configuration reloaded, changed settings: %s", ", ".join(changed) or "none")
+    return changed
+
+
+QUERY_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=get_mcp_config().query_workers, thread_name_prefix="mcp-query"
+)
 atexit.register(lambda: QUERY_EXECUTOR.shutdown(wait=True))
 
-load_dotenv()
+# Admits async tool calls to the executor's workers in weighted fair order per client,
+# with per-client and per-connection caps and a bounded queue
+_scheduler_config = get_mcp_config()
+SCHEDULER = FairScheduler(
+    capacity=_scheduler_config.query_workers,
+    max_per_tenant=_scheduler_config.max_concurrent_queries_per_client,
+    max_queued=_scheduler_config.max_queued_calls,
+    max_queued_per_tenant=_scheduler_config.max_queued_calls_per_client,
+    weights=_scheduler_config.client_weights,
+)
+# Shares one execution between concurrent identical async tool calls
+QUERY_FLIGHTS = SingleFlight()
 
 mcp = FastMCP(name=MCP_SERVER_NAME)
 
 
+_HEALTH_MONITOR: Optional[HealthMonitor] = None
+_HEALTH_MONITOR_LOCK = threading.Lock()
+
+
+def get_health_monitor() -> HealthMonitor:
+    """Get the ClickHouse health monitor, starting its background checks on first use.
+
+    The server calls start_health_monitor() at startup, so probes find a status ready.
+    """
+    global _HEALTH_MONITOR
+    if _HEALTH_MONITOR is None:
+        with _HEALTH_MONITOR_LOCK:
+            if _HEALTH_MONITOR is None:
+                _HEALTH_MONITOR = HealthMonitor(
+                    _check_clickhouse, interval=get_mcp_config().health_check_interval
+                )
+                _HEALTH_MONITOR.start()
+                atexit.register(_HEALTH_MONITOR.stop)
+    return _HEALTH_MONITOR
+
+
+def start_health_monitor() -> None:
+    """Start the background ClickHouse health checks, if ClickHouse is enabled."""
+    if os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true":
+        get_health_monitor()
+
+
+def _check_clickhouse() -> str:
+    # A pooled connection and SELECT 1 instead of a new client per check. The checkout
+    # does not wait: when every connection is running a query, ClickHouse is busy, not
+    # down, and the check must not time out behind those queries
+    pool = get_client_pool()
+    try:
+        with pool.connection(timeout=0) as pooled:
+            pooled.client.command("SELECT 1")
+            message = f"Connected to ClickHouse {pooled.client.server_version}"
+    except PoolTimeoutError:
+        message = "ClickHouse is busy: every pooled connection is running a query"
+    if isinstance(pool, ReplicaRouter):
+        message += f" ({len(pool.healthy_replicas())}/{len(pool.replicas)} replicas healthy)"
+    return message
+
+
+async def _readiness():
+    """Get (ready, message) from the cached health status."""
+    # Check if ClickHouse is enabled by trying to create config
+    # If ClickHouse is disabled, this will succeed but connection will fail
+    clickhouse_enabled = os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true"
+
+    if not clickhouse_enabled:
+        # If ClickHouse is disabled, check chDB status
+        if get_chdb_config().enabled:
+            return True, "MCP server running with chDB enabled"
+        # Both ClickHouse and chDB are disabled - this is an error
+        return False, "Both ClickHouse and chDB are disabled. At least one must be enabled."
+
+    status = get_health_monitor().status()
+    if status is None:
+        return False, "Cannot connect to ClickHouse: health check has not completed yet"
+    if not status.healthy:
+        return False, f"Cannot connect to ClickHouse: {status.message}"
+    return True, status.message
+
+
 @mcp.custom_route("/health", methods=["GET"])
 async def health_check(request: Request) -> PlainTextResponse:
     """Health check endpoint for monitoring server status.
 
-    Returns OK if the server is running and can connect to ClickHouse.
+    Returns OK if the server is running and can connect to ClickHouse. The answer comes
+    from a background-refreshed status, so probes never open ClickHouse connections.
     """
     try:
-        # Check if ClickHouse is enabled by trying to create config
-        # If ClickHouse is disabled, this will succeed but connection will fail
-        clickhouse_enabled = os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true"
-
-        if not clickhouse_enabled:
-            # If ClickHouse is disabled, check chDB status
-            chdb_config = get_chdb_config()
-            if chdb_config.enabled:
-                return PlainTextResponse("OK - MCP server running with chDB enabled")
-            else:
-                # Both ClickHouse and chDB are disabled - this is an error
-                return PlainTextResponse(
-                    "ERROR - Both ClickHouse and chDB are disabled. At least one must be enabled.",
-                    status_code=503,
-                )
-
-        # Try to create a client connection to verify ClickHouse connectivity
-        client = create_clickhouse_client()
-        version = client.server_version
-        return PlainTextResponse(f"OK - Connected to ClickHouse {version}")
+        ready, message = await _readiness()
     except Exception as e:
-        # Return 503 Service Unavailable if we can't connect to ClickHouse
-        return PlainTextResponse(f"ERROR - Cannot connect to ClickHouse: {str(e)}", status_code=503)
+        ready, message = False, f"Cannot connect to ClickHouse: {str(e)}"
+    if ready:
+        return PlainTextResponse(f"OK - {message}")
+    # Return 503 Service Unavailable if we can't connect to ClickHouse
+    return PlainTextResponse(f"ERROR - {message}", status_code=503)
+
+
+@mcp.custom_route("/health/ready", methods=["GET"])
+async def readiness_check(request: Request) -> PlainTextResponse:
+    """Readiness probe: OK while the cached ClickHouse health status is good."""
+    return await health_check(request)
+
+
+@mcp.custom_route("/health/live", methods=["GET"])
+async def liveness_check(request: Request) -> PlainTextResponse:
+    """Liveness probe: OK while the server answers requests, regardless of ClickHouse."""
+    return PlainTextResponse("OK - MCP server is running")
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Expose server metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(
+        metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def _stats_samples(component) -> dict:
+    # Components are created lazily; report nothing until they exist
+    if component is None:
+        return {}
+    return {(stat,): value for stat, value in component.stats().items()}
+
+
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_executor_queue_depth",
+    "Tasks waiting for a query executor thread",
+    (),
+    lambda: {(): QUERY_EXECUTOR._work_queue.qsize()},
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_executor_max_workers",
+    "Size of the query executor thread pool",
+    (),
+    lambda: {(): QUERY_EXECUTOR._max_workers},
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_scheduler",
+    "Tool call scheduler state and lifetime counters",
+    ("stat",),
+    lambda: _stats_samples(SCHEDULER),
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_client_pool",
+    "ClickHouse client pool state and lifetime counters",
+    ("stat",),
+    lambda: _stats_samples(_CLIENT_POOL),
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_replica",
+    "Routing state of each ClickHouse replica",
+    ("replica", "stat"),
+    lambda: {
+        (replica, stat): value
+        for pool in [_CLIENT_POOL, *list(_CONNECTION_POOLS.values())]
+        if isinstance(pool, ReplicaRouter)
+        for replica, stats in pool.replica_stats().items()
+        for stat, value in stats.items()
+    },
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_connection_pool",
+    "Client pool state and lifetime counters of each named ClickHouse connection",
+    ("connection", "stat"),
+    lambda: {
+        (name,) + key: value
+        for name, pool in list(_CONNECTION_POOLS.items())
+        for key, value in _stats_samples(pool).items()
+    },
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_session_settings",
+    "Open pooled ClickHouse connections by the value of each per-connection session setting",
+    ("connection", "setting", "value"),
+    lambda: _session_setting_samples(),
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_chdb_executor",
+    "chDB session/worker pool state and lifetime counters",
+    ("stat",),
+    lambda: _stats_samples(_CHDB_EXECUTOR),
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_cache",
+    "Metadata, result and cost estimate cache state and lifetime counters",
+    ("cache", "stat"),
+    lambda: {
+        (name,) + key: value
+        for name, cache in (
+            ("metadata", _METADATA_CACHE),
+            ("result", _RESULT_CACHE),
+            ("cost_estimate", _COST_PREFLIGHT),
+        )
+        for key, value in _stats_samples(cache).items()
+    },
+)
+metrics.REGISTRY.callback_gauge(
+    "mcp_clickhouse_single_flight",
+    "Executions in flight and calls that joined one",
+    ("stat",),
+    lambda: _stats_samples(QUERY_FLIGHTS),
+)
+
+
+def _session_setting_samples() -> dict:
+    pools = [(DEFAULT_CONNECTION, _CLIENT_POOL), *list(_CONNECTION_POOLS.items())]
+    samples: Dict[tuple, int] = {}
+    for name, pool in pools:
+        if pool is None:
+            continue
+        for settings in pool.session_settings():
+            for setting, value in settings.items():
+                key = (name, setting, str(value))
+                samples[key] = samples.get(key, 0) + 1
+    return samples
+
+
+def format_query_value(value: Any) -> str:
+    """Render a Python value as a ClickHouse SQL literal."""
+    # clickhouse_connect is imported on first use, keeping it out of server startup
+    from clickhouse_connect.driver.binding import format_query_value as format_value
+
+    return format_value(value)
 
 
 def result_to_table(query_columns, result) -> List[Table]:
@@ -119,11 +381,17 @@ def to_json(obj: Any) -> str:
     return obj
 
 
-def list_databases():
+def list_databases(connection: Optional[str] = None):
     """List available ClickHouse databases"""
-    logger.info("Listing all databases")
-    client = create_clickhouse_client()
-    result = client.command("SHOW DATABASES")
+    connection = resolve_connection(connection)
+    logger.info("Listing all databases", extra=sampled(tool="list_databases"))
+    return _cached_metadata(
+        (_metadata_scope(connection, None), "databases"), lambda: _fetch_databases(connection)
+    )
+
+
+def _fetch_databases(connection: Optional[str] = None):
+    result = get_client_pool(connection).run(lambda pooled: pooled.client.command("SHOW DATABASES"))
 
     # Convert newline-separated string to list and trim whitespace
     if isinstance(result, str):
@@ -131,15 +399,85 @@ def list_databases():
     else:
         databases = [result]
 
-    logger.info(f"Found {len(databases)} databases")
+    logger.info("Found %d databases", len(databases), extra=sampled(databases=len(databases)))
     return json.dumps(databases)
 
 
-def list_tables(database: str, like: Optional[str] = None, not_like: Optional[str] = None):
+def list_tables(
+    database: str,
+    like: Optional[str] = None,
+    not_like: Optional[str] = None,
+    connection: Optional[str] = None,
+):
     """List available ClickHouse tables in a database, including schema, comment,
     row count, and column count. Returns tables starting with 'newoms' excluding 'newoms_orders_denormalized'."""
-    logger.info(f"Listing tables in database '{database}'")
-    client = create_clickhouse_client()
+    connection = resolve_connection(connection)
+    logger.info(
+        "Listing tables in database '%s'",
+        database,
+        extra=sampled(tool="list_tables", database=database),
+    )
+    return _cached_metadata(
+        (_metadata_scope(connection, database), "tables", like, not_like),
+        lambda: get_client_pool(connection).run(
+            lambda pooled: _fetch_tables(pooled.client, database, like, not_like)
+        ),
+        database=database,
+        connection=connection,
+    )
+
+
+_METADATA_CACHE: Optional[MetadataCache] = None
+
+
+def get_metadata_cache() -> Optional[MetadataCache]:
+    """Get the schema metadata cache, or None if CLICKHOUSE_MCP_METADATA_CACHE_TTL is 0."""
+    global _METADATA_CACHE
+    mcp_config = get_mcp_config()
+    if _METADATA_CACHE is None and mcp_config.metadata_cache_ttl > 0:
+        _METADATA_CACHE = MetadataCache(
+            ttl=mcp_config.metadata_cache_ttl,
+            max_entries=mcp_config.metadata_cache_size,
+            revalidate_interval=mcp_config.metadata_cache_revalidate_interval,
+        )
+    return _METADATA_CACHE
+
+
+def _metadata_scope(connection: Optional[str], database: Optional[str]):
+    """Get the metadata cache's database key; databases of named connections are separate."""
+    return database if connection is None else (connection, database)
+
+
+def _cached_metadata(key, load, database: Optional[str] = None, connection: Optional[str] = None):
+    cache = get_metadata_cache()
+    if cache is None:
+        return load()
+    if database is None:
+        return cache.get_or_load(key, load)
+
+    def fingerprint():
+        return get_client_pool(connection).run(
+            lambda pooled: _schema_fingerprint(pooled.client, database)
+        )
+
+    return cache.get_or_load(
+        key, load, database=_metadata_scope(connection, database), fingerprint=fingerprint
+    )
+
+
+def _schema_fingerprint(client, database: str):
+    """Get a cheap fingerprint of a database's schema.
+
+    The table count catches dropped tables; the latest metadata_modification_time
+    catches created, renamed and altered ones.
+    """
+    result = client.query(
+        f"SELECT count(), max(metadata_modification_time) FROM system.tables WHERE database = {format_query_value(database)}"
+    )
+    return tuple(result.result_rows[0]) if result.result_rows else None
+
+
+def _fetch_tables(client, database: str, like: Optional[str], not_like: Optional[str]):
     query = f"SELECT database, name, engine, create_table_query, dependencies_database, dependencies_table, engine_full, sorting_key, primary_key, total_rows, total_bytes, total_bytes_uncompressed, parts, active_parts, total_marks, comment FROM system.tables WHERE database = {format_query_value(database)} AND name LIKE 'newoms%' AND name != 'newoms_orders_denormalized'"
     if like:
         query += f" AND name LIKE {format_query_value(like)}"
@@ -151,45 +489,407 @@ def list_tables(database: str, like: Optional[str] = None, not_like: Optional[st
 
     # Deserialize result as Table dataclass instances
     tables = result_to_table(result.column_names, result.result_rows)
-
-    for table in tables:
-        column_data_query = f"SELECT database, table, name, type AS column_type, default_kind, default_expression, comment FROM system.columns WHERE database = {format_query_value(database)} AND table = {format_query_value(table.name)}"
-        column_data_query_result = client.query(column_data_query)
-        table.columns = [
-            c
-            for c in result_to_column(
-                column_data_query_result.column_names,
-                column_data_query_result.result_rows,
-            )
-        ]
-
-    logger.info(f"Found {len(tables)} tables")
+    if not tables:
+        logger.info("Found 0 tables", extra=sampled(tables=0))
+        return []
+
+    # Fetch the columns of every matched table in a single round trip
+    table_names = ", ".join(format_query_value(table.name) for table in tables)
+    column_data_query = f"SELECT database, table, name, type AS column_type, default_kind, default_expression, comment FROM system.columns WHERE database = {format_query_value(database)} AND table IN ({table_names}) ORDER BY table, position"
+    column_data_query_result = client.query(column_data_query)
+
+    tables_by_name = {table.name: table for table in tables}
+    for column in result_to_column(
+        column_data_query_result.column_names,
+        column_data_query_result.result_rows,
+    ):
+        table = tables_by_name.get(column.table)
+        if table is not None:
+            table.columns.append(column)
+
+    logger.info("Found %d tables", len(tables), extra=sampled(tables=len(tables)))
     return [asdict(table) for table in tables]
 
 
-def execute_query(query: str):
-    client = create_clickhouse_client()
+def execute_query(
+    query: str,
+    query_id: Optional[str] = None,
+    max_rows: Optional[int] = None,
+    cursor: Optional[str] = None,
+    result_format: str = ROWS,
+    include_stats: bool = False,
+    connection: Optional[str] = None,
+):
+    """Execute a read-only query on a pooled client, streaming at most one page of rows.
+
+    Args:
+        query: The SQL query to run
+        query_id: ClickHouse query_id to tag the query with, so it can be killed later
+        max_rows: Row budget for this page, capped at CLICKHOUSE_MCP_MAX_RESULT_ROWS
+        cursor: Continuation cursor returned by a previous, truncated page of the same query
+        result_format: "rows", "columns" or "arrow"; see mcp_clickhouse.result_format
+        include_stats: Add the query's "stats" (see query_stats) to the result
+        connection: Named ClickHouse connection to run the query on, None for the default
+    """
     try:
-        read_only = get_readonly_setting(client)
-        res = client.query(query, settings={"readonly": read_only})
-        logger.info(f"Query returned {len(res.result_rows)} rows")
-        return {"columns": res.column_names, "rows": res.result_rows}
+        connection = resolve_connection(connection)
+        result_format = validate_format(result_format)
+        offset = decode_cursor(query, cursor) if cursor else 0
+        mcp_config = get_mcp_config()
+        row_budget = mcp_config.max_result_rows
+        if max_rows is not None:
+            if max_rows < 1:
+                raise ValueError("max_rows must be at least 1")
+            row_budget = min(max_rows, row_budget)
+        checkout_started = time.perf_counter()
+
+        def run(pooled):
+            metrics.observe_stage(
+                "connect", time.perf_counter() - checkout_started, checkout_started
+            )
+            return _cached_query_page(
+                pooled,
+                query,
+                query_id,
+                offset,
+                row_budget,
+                mcp_config.max_result_bytes,
+                result_format,
+                connection,
+            )
+
+        result = get_client_pool(connection).run(run)
+        stats = result.pop("stats", None)
+        if include_stats and stats is not None:
+            result["stats"] = stats
+        row_count = result.get("row_count", len(result.get("rows", ())))
+        metrics.record_result(row_count, estimate_result_bytes(result))
+        return result
     except Exception as err:
-        logger.error(f"Error executing query: {err}")
+        logger.error("Error executing query: %s", err, extra=fields(query_id=query_id))
         raise ToolError(f"Query execution failed: {str(err)}")
 
 
-def run_select_query(query: str):
-    """Run a SELECT query in a ClickHouse database"""
-    logger.info(f"Executing SELECT query: {query}")
+_RESULT_CACHE: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the query result cache, or None if CLICKHOUSE_MCP_RESULT_CACHE_TTL is 0."""
+    global _RESULT_CACHE
+    mcp_config = get_mcp_config()
+    if _RESULT_CACHE is None and mcp_config.result_cache_ttl > 0:
+        _RESULT_CACHE = ResultCache(
+            ttl=mcp_config.result_cache_ttl,
+            max_bytes=mcp_config.result_cache_max_bytes,
+        )
+    return _RESULT_CACHE
+
+
+def _cached_query_page(
+    pooled,
+    query: str,
+    query_id: Optional[str],
+    offset: int,
+    row_budget: int,
+    byte_budget: int,
+    result_format: str,
+    connection: Optional[str] = None,
+):
+    args = (pooled, query, query_id, offset, row_budget, byte_budget, result_format, connection)
+    cache = get_result_cache()
+    if cache is None:
+        return _query_page(*args)
+    if not is_deterministic(query):
+        cache.bypass()
+        return _query_page(*args)
+
+    config = get_config(connection)
+    # The readonly mode comes from the pooled connection, so the lookup happens here
+    key = (
+        normalize_query(query),
+        config.host,
+        config.port,
+        config.username,
+        config.database,
+        pooled.session_settings.get("readonly"),
+        offset,
+        row_budget,
+        byte_budget,
+        result_format,
+        get_mcp_config().auto_limit,
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        logger.info("Serving query result from the result cache", extra=sampled(cached=True))
+        return {**cached, "cached": True}
+    result = _query_page(*args)
+    # Stats describe one execution, so cache hits go without them
+    cacheable = {name: value for name, value in result.items() if name != "stats"}
+    ttl = None
+    if reads_current_date(query):
+        # today() and yesterday() move on at midnight in the server's time zone
+        ttl = seconds_until_midnight(getattr(pooled.client, "server_tz", None))
+    cache.set(key, cacheable, estimate_result_bytes(cacheable), ttl=ttl)
+    return result
+
+
+def seconds_until_midnight(tz=None) -> float:
+    """Get the seconds until the next midnight in time zone ``tz``, local time if None."""
+    now = datetime.now(tz)
+    midnight = datetime.combine(now.date() + timedelta(days=1), dt_time(), tzinfo=now.tzinfo)
+    # Compare timestamps, so a DST change before midnight is accounted for
+    return max(midnight.timestamp() - now.timestamp(), 0.0)
+
+
+_COST_PREFLIGHT: Optional[CostPreflight] = None
+
+
+def get_cost_preflight() -> Optional[CostPreflight]:
+    """Get the query cost preflight, or None if CLICKHOUSE_MCP_COST_PREFLIGHT is off."""
+    global _COST_PREFLIGHT
+    mcp_config = get_mcp_config()
+    if _COST_PREFLIGHT is None and mcp_config.cost_preflight != OFF:
+        _COST_PREFLIGHT = CostPreflight(
+            mcp_config.cost_preflight,
+            CostLimits(
+                max_rows=mcp_config.max_estimated_rows,
+                max_parts=mcp_config.max_estimated_parts,
+                max_marks=mcp_config.max_estimated_marks,
+            ),
+            fail_open=mcp_config.cost_preflight_fail_open,
+            cache_ttl=mcp_config.cost_estimate_cache_ttl,
+        )
+    return _COST_PREFLIGHT
+
+
+def _check_query_cost(
+    client, query: str, settings: dict, connection: Optional[str] = None
+) -> Optional[str]:
+    preflight = get_cost_preflight()
+    if preflight is None:
+        return None
+    config = get_config(connection)
+    key = (normalize_query(query), config.host, config.port, config.username, config.database)
+    with metrics.stage("preflight"):
+        return preflight.check(key, lambda: estimate_cost(client, query, settings))
+
+
+def _query_page(
+    pooled,
+    query: str,
+    query_id: Optional[str],
+    offset: int,
+    row_budget: int,
+    byte_budget: int,
+    result_format: str,
+    connection: Optional[str] = None,
+):
+    client = pooled.client
+    session = pooled.session_settings
+    original_query = query
+    mcp_config = get_mcp_config()
+    settings = {"readonly": session["readonly"]}
+    if not session["settings_locked"]:
+        settings.update(
+            {
+                # Let ClickHouse abort the query itself once the tool would have timed out
+                "max_execution_time": mcp_config.query_timeout,
+                # Cut oversized results off inside ClickHouse instead of on the wire. One row
+                # over the budget tells us the page is truncated; the byte cap is a backstop
+                # with headroom for the difference between our estimate and ClickHouse's
+                "max_result_rows": row_budget + 1,
+                "max_result_bytes": byte_budget * 2,
+                "result_overflow_mode": "break",
+            }
+        )
+    if query_id:
+        settings["query_id"] = query_id
+
+    # Runs before anything else is sent, so a rejected query never reaches the cluster
+    cost_warning = _check_query_cost(client, query, {"readonly": session["readonly"]}, connection)
+
+    limit_added = False
+    if mcp_config.auto_limit:
+        # The added LIMIT also skips the rows of previous pages
+        limited_query = apply_auto_limit(query, row_budget + 1, offset)
+        if limited_query is not None:
+            query = limited_query
+            limit_added = True
+    if offset and not limit_added:
+        if session["settings_locked"]:
+            raise ValueError(
+                "Cursors need a ClickHouse user that may change settings (readonly != 1)"
+            )
+        # Skip the rows already returned by previous pages on the server side
+        settings["offset"] = offset
+
+    with metrics.stage("execute"):
+        page = read_page(client, query, settings, result_format, row_budget, byte_budget)
+        tracing.set_query_attributes(query_id, page.summary)
+        tracing.set_attributes(
+            **{
+                "clickhouse.result_format": result_format,
+                "clickhouse.page_rows": page.row_count,
+                "clickhouse.truncated": page.truncated,
+                # The session settings computed when the pooled connection was opened
+                **{f"clickhouse.session.{name}": value for name, value in session.items()},
+            }
+        )
+
+    stats = query_stats(query_id, page)
+    logger.info(
+        "Query returned %d rows (format=%s, truncated=%s), stats: %s",
+        page.row_count,
+        result_format,
+        page.truncated,
+        stats,
+        extra=sampled(format=result_format, truncated=page.truncated, **stats),
+    )
+    metrics.record_read(stats.get("read_rows", 0), stats.get("read_bytes", 0))
+    with metrics.stage("serialize"):
+        result = {"columns": page.columns, **page.encode_payload(), "truncated": page.truncated}
+    if result_format != ROWS:
+        result["row_count"] = page.row_count
+    if limit_added:
+        result["limit_added"] = True
+    if cost_warning:
+        result["cost_warning"] = cost_warning
+    if page.truncated:
+        if limit_added or not session["settings_locked"]:
+            result["cursor"] = encode_cursor(original_query, offset + page.row_count)
+        else:
+            # The next page would need the offset setting, which the server refuses
+            result["cursor_unavailable"] = (
+                "The ClickHouse user cannot change settings (readonly=1), so there is no "
+                "cursor for the next page; page with ORDER BY ... LIMIT n OFFSET m instead"
+            )
+    result["stats"] = stats
+    return result
+
+
+def query_stats(query_id: Optional[str], page) -> dict:
+    """Build the stats block of a query from the server's X-ClickHouse-Summary counters.
+
+    Counters the server did not report (e.g. for the arrow format) are left out.
+    """
+    summary = page.summary or {}
+    stats = {}
+    if query_id:
+        stats["query_id"] = query_id
+    for name in ("read_rows", "read_bytes"):
+        if summary.get(name) is not None:
+            stats[name] = int(summary[name])
+    if summary.get("elapsed_ns") is not None:
+        stats["elapsed_ms"] = round(int(summary["elapsed_ns"]) / 1e6, 3)
+    stats["rows_returned"] = page.row_count
+    return stats
+
+
+def encode_cursor(query: str, offset: int) -> str:
+    """Build the opaque continuation cursor for the page of ``query`` starting at ``offset``."""
+    payload = {"q": _query_digest(query), "offset": offset}
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+
+def decode_cursor(query: str, cursor: str) -> int:
+    """Get the row offset encoded in a continuation cursor of ``query``.
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for a different query.
+    """
     try:
-        future = QUERY_EXECUTOR.submit(execute_query, query)
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        offset = int(payload["offset"])
+        digest = payload["q"]
+    except Exception:
+        raise ValueError("Invalid cursor") from None
+    if digest != _query_digest(query) or offset < 0:
+        raise ValueError("Cursor does not belong to this query")
+    return offset
+
+
+def _query_digest(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode()).hexdigest()[:16]
+
+
+def kill_query(query_id: str, connection: Optional[str] = None) -> None:
+    """Ask ClickHouse to cancel a running query by its query_id.
+
+    The KILL goes over a connection of its own: queries time out when the pool is
+    busy, and every pooled connection may be held by a query that should be killed.
+    """
+    pool = get_client_pool(connection)
+
+    def kill(pooled):
+        return pooled.client.command(
+            f"KILL QUERY WHERE query_id = {format_query_value(query_id)} ASYNC"
+        )
+
+    try:
+        if isinstance(pool, ReplicaRouter):
+            # The query may run on any replica; KILL QUERY is a no-op where it does not
+            pool.run_all(kill, dedicated=True)
+        else:
+            pool.run_dedicated(kill)
+        logger.info("Sent KILL QUERY for query_id %s", query_id, extra=fields(query_id=query_id))
+    except Exception as e:
+        logger.warning("Failed to kill query %s: %s", query_id, e, extra=fields(query_id=query_id))
+
+
+def kill_query_in_background(query_id: str, connection: Optional[str] = None) -> None:
+    """Kill a query server-side without making the caller wait for the KILL round trip.
+
+    The worker running the query stays blocked on the server until the query stops.
+    """
+    threading.Thread(
+        target=kill_query, args=(query_id, connection), name="clickhouse-kill-query", daemon=True
+    ).start()
+
+
+def _log_query_start(tool: str, query: str, query_id: Optional[str] = None) -> None:
+    label = "chDB SELECT query" if tool == "run_chdb_select_query" else "SELECT query"
+    extra = {"tool": tool, "query_hash": query_hash(query)}
+    if query_id:
+        extra["query_id"] = query_id
+    logger.info("Executing %s: %s", label, query_text(query), extra=sampled(**extra))
+
+
+def run_select_query(
+    query: str,
+    max_rows: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: str = ROWS,
+    include_stats: bool = False,
+    connection: Optional[str] = None,
+):
+    """Run a SELECT query in a ClickHouse database.
+
+    Results are returned one page at a time. If the page was cut short by the row or
+    byte budget, the result has "truncated": true and a "cursor"; pass that cursor
+    with the same query to fetch the next page. Use ORDER BY for stable pages. If
+    the server cannot page the query, "cursor_unavailable" says why instead.
+
+    format selects the page layout: "rows" (default) returns a list of rows,
+    "columns" returns {"data": {column: [values]}}, and "arrow" returns a base64
+    Arrow IPC stream. The columnar formats are much cheaper for large results.
+
+    With include_stats, the result has a "stats" block with the rows and bytes
+    ClickHouse read and its elapsed time; use it to find and avoid expensive scans.
+
+    connection selects a named ClickHouse connection; omit it for the default one.
+    """
+    query_id = str(uuid.uuid4())
+    _log_query_start("run_select_query", query, query_id)
+    try:
+        future = QUERY_EXECUTOR.submit(
+            execute_query, query, query_id, max_rows, cursor, format, include_stats, connection
+        )
         try:
             timeout_secs = get_mcp_config().query_timeout
             result = future.result(timeout=timeout_secs)
             # Check if we received an error structure from execute_query
             if isinstance(result, dict) and "error" in result:
-                logger.warning(f"Query failed: {result['error']}")
+                logger.warning("Query failed: %s", result["error"])
                 # MCP requires structured responses; string error messages can cause
                 # serialization issues leading to BrokenResourceError
                 return {
@@ -198,37 +898,137 @@ def run_select_query(query: str):
                 }
             return result
         except concurrent.futures.TimeoutError:
-            logger.warning(f"Query timed out after {timeout_secs} seconds: {query}")
+            logger.warning(
+                "Query %s timed out after %s seconds, cancelling it: %s",
+                query_id,
+                timeout_secs,
+                query_text(query),
+                extra=fields(query_id=query_id, query_hash=query_hash(query)),
+            )
             future.cancel()
+            kill_query_in_background(query_id, connection)
             raise ToolError(f"Query timed out after {timeout_secs} seconds")
     except ToolError:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in run_select_query: {str(e)}")
+        logger.error("Unexpected error in run_select_query: %s", e)
         raise RuntimeError(f"Unexpected error during query execution: {str(e)}")
 
 
-def create_clickhouse_client():
-    client_config = get_config().get_client_config()
-    logger.info(
-        f"Creating ClickHouse client connection to {client_config['host']}:{client_config['port']} "
-        f"as {client_config['username']} "
-        f"(secure={client_config['secure']}, verify={client_config['verify']}, "
-        f"connect_timeout={client_config['connect_timeout']}s, "
-        f"send_receive_timeout={client_config['send_receive_timeout']}s)"
+def create_clickhouse_client(
+    host: Optional[str] = None, port: Optional[int] = None, connection: Optional[str] = None
+):
+    client_config = get_config(connection).get_client_config(host, port)
+    # Pooled connections are created on demand, so the banner is debug-level
+    logger.debug(
+        "Creating ClickHouse client connection to %s:%s as %s "
+        "(secure=%s, verify=%s, connect_timeout=%ss, send_receive_timeout=%ss)",
+        client_config["host"],
+        client_config["port"],
+        client_config["username"],
+        client_config["secure"],
+        client_config["verify"],
+        client_config["connect_timeout"],
+        client_config["send_receive_timeout"],
     )
 
     try:
+        import clickhouse_connect
+
         client = clickhouse_connect.get_client(**client_config)
         # Test the connection
         version = client.server_version
-        logger.info(f"Successfully connected to ClickHouse server version {version}")
+        logger.debug("Successfully connected to ClickHouse server version %s", version)
         return client
     except Exception as e:
-        logger.error(f"Failed to connect to ClickHouse: {str(e)}")
+        logger.error("Failed to connect to ClickHouse: %s", e)
         raise
 
 
+_CLIENT_POOL: Optional[Union[ClickHouseClientPool, ReplicaRouter]] = None
+# Pools of the named connections, by connection name
+_CONNECTION_POOLS: Dict[str, Union[ClickHouseClientPool, ReplicaRouter]] = {}
+_CLIENT_POOL_LOCK = threading.Lock()
+
+
+def get_client_pool(connection: Optional[str] = None) -> Union[ClickHouseClientPool, ReplicaRouter]:
+    """Get the shared ClickHouse client pool of a connection, creating it on first use.
+
+    The pool is sized and tuned from ClickHouseConfig.get_pool_config() and builds its
+    clients with create_clickhouse_client(). With several replicas in CLICKHOUSE_HOSTS,
+    this is a ReplicaRouter over one such pool per replica. Every named connection has
+    a pool of its own.
+    """
+    global _CLIENT_POOL
+    name = resolve_connection(connection)
+    if name is not None:
+        pool = _CONNECTION_POOLS.get(name)
+        if pool is None:
+            with _CLIENT_POOL_LOCK:
+                pool = _CONNECTION_POOLS.get(name)
+                if pool is None:
+                    pool = _CONNECTION_POOLS[name] = _create_client_pool(name)
+        return pool
+    if _CLIENT_POOL is None:
+        with _CLIENT_POOL_LOCK:
+            if _CLIENT_POOL is None:
+                _CLIENT_POOL = _create_client_pool(None)
+    return _CLIENT_POOL
+
+
+def _create_client_pool(connection: Optional[str]) -> Union[ClickHouseClientPool, ReplicaRouter]:
+    config = get_config(connection)
+    pools = [
+        (
+            f"{host}:{port}",
+            ClickHouseClientPool(
+                functools.partial(create_clickhouse_client, host, port, connection),
+                session_settings_factory=get_session_settings,
+                **config.get_pool_config(),
+            ),
+            weight,
+        )
+        for host, port, weight in config.replicas
+    ]
+    if len(pools) == 1:
+        pool = pools[0][1]
+    else:
+        pool = ReplicaRouter(
+            pools,
+            policy=config.load_balancing,
+            eject_seconds=config.replica_eject_seconds,
+        )
+    atexit.register(pool.close)
+    return pool
+
+
+def reset_client_pools(changed: List[str]) -> None:
+    """Drop the client pools that no longer match the configuration.
+
+    A connection's pool connects to the hosts and with the credentials it was created
+    with, so it is closed when any of the connection's ClickHouse settings changed, or
+    the connection was removed. The next call creates a new pool; calls in flight finish
+    on the old one, which closes their clients as they are returned.
+
+    Args:
+        changed: Setting names as returned by reload_config()
+    """
+    global _CLIENT_POOL
+    connections = get_mcp_config().connections
+    stale = []
+    with _CLIENT_POOL_LOCK:
+        if _CLIENT_POOL is not None and any(
+            name.startswith("clickhouse.") and name.count(".") == 1 for name in changed
+        ):
+            stale.append(_CLIENT_POOL)
+            _CLIENT_POOL = None
+        for name in list(_CONNECTION_POOLS):
+            if name not in connections or any(c.startswith(f"clickhouse.{name}.") for c in changed):
+                stale.append(_CONNECTION_POOLS.pop(name))
+    for pool in stale:
+        pool.close()
+
+
 def get_readonly_setting(client) -> str:
     """Get the appropriate readonly setting value to use for queries.
 
@@ -249,65 +1049,160 @@ def get_readonly_setting(client) -> str:
     Returns:
         String value of readonly setting to use
     """
-    read_only = client.server_settings.get("readonly")
+    read_only = _server_setting_value(client, "readonly")
     if read_only:
         if read_only == "0":
             return "1"  # Force read-only mode if server has it disabled
         else:
-            return read_only.value  # Respect server's readonly setting (likely 2)
+            return read_only  # Respect server's readonly setting (likely 2)
     else:
         return "1"  # Default to basic read-only mode if setting isn't present
 
 
+def _server_setting_value(client, name: str) -> Optional[str]:
+    # server_settings maps names to SettingDef objects; compare their values, not the objects
+    setting = client.server_settings.get(name)
+    if setting is None:
+        return None
+    return str(getattr(setting, "value", setting))
+
+
+def get_session_settings(client) -> dict:
+    """Compute the per-connection session settings once, when a pooled client connects.
+
+    Returns:
+        dict with the effective ``readonly`` value to send with queries and
+        ``settings_locked``, which is True when the server enforces readonly=1 and
+        therefore rejects any per-query setting changes.
+    """
+    return {
+        "readonly": get_readonly_setting(client),
+        "settings_locked": _server_setting_value(client, "readonly") == "1",
+    }
+
+
+_chdb_client = None
+_chdb_client_initialized = False
+_CHDB_CLIENT_LOCK = threading.Lock()
+
+
 def create_chdb_client():
-    """Create a chDB client connection."""
+    """Create a chDB client connection.
+
+    The session is opened on first use, so chDB's large native library is only loaded
+    once a chDB tool is actually called.
+    """
+    global _chdb_client, _chdb_client_initialized
     if not get_chdb_config().enabled:
         raise ValueError("chDB is not enabled. Set CHDB_ENABLED=true to enable it.")
+    if not _chdb_client_initialized:
+        with _CHDB_CLIENT_LOCK:
+            if not _chdb_client_initialized:
+                _chdb_client = _init_chdb_client()
+                if _chdb_client:
+                    atexit.register(_chdb_client.close)
+                _chdb_client_initialized = True
     return _chdb_client
 
 
-def execute_chdb_query(query: str):
-    """Execute a query using chDB client."""
-    client = create_chdb_client()
-    try:
-        res = client.query(query, "JSON")
-        if res.has_error():
-            error_msg = res.error_message()
-            logger.error(f"Error executing chDB query: {error_msg}")
-            return {"error": error_msg}
+def _chdb_session(data_path: str):
+    import chdb.session as chs
+
+    return chs.Session(path=data_path)
 
-        result_data = res.data()
-        if not result_data:
-            return []
 
-        result_json = json.loads(result_data)
+_CHDB_EXECUTOR: Optional[Union[ChDBSessionPool, ChDBProcessPool]] = None
+_CHDB_EXECUTOR_LOCK = threading.Lock()
 
-        return result_json.get("data", [])
 
+def get_chdb_executor() -> Union[ChDBSessionPool, ChDBProcessPool]:
+    """Get the shared chDB executor for CHDB_EXECUTION_MODE, creating it on first use."""
+    global _CHDB_EXECUTOR
+    if _CHDB_EXECUTOR is None:
+        with _CHDB_EXECUTOR_LOCK:
+            if _CHDB_EXECUTOR is None:
+                chdb_config = get_chdb_config()
+                data_path = chdb_config.data_path
+                if chdb_config.execution_mode == "process":
+                    _CHDB_EXECUTOR = ChDBProcessPool(
+                        data_path,
+                        size=chdb_config.pool_size,
+                        max_queued=chdb_config.max_queued_queries,
+                    )
+                else:
+                    _CHDB_EXECUTOR = ChDBSessionPool(
+                        lambda: _chdb_session(data_path),
+                        size=chdb_config.pool_size,
+                        max_queued=chdb_config.max_queued_queries,
+                        sessions=[create_chdb_client()],
+                    )
+                atexit.register(_CHDB_EXECUTOR.close)
+    return _CHDB_EXECUTOR
+
+
+def execute_chdb_query(query: str, result_format: str = ROWS, deadline: Optional[float] = None):
+    """Execute a query with the chDB executor.
+
+    Args:
+        query: The SQL query to run
+        result_format: "rows", "columns" or "arrow"; see decode_chdb_result
+        deadline: time.monotonic() by which the tool call times out, covering the wait
+            for a chDB session or worker; CLICKHOUSE_MCP_QUERY_TIMEOUT from now if None
+    """
+    try:
+        result_format = validate_format(result_format)
+        timeout = get_mcp_config().query_timeout
+        if deadline is not None:
+            timeout = max(deadline - time.monotonic(), 0.0)
+        serialize_seconds = 0.0
+
+        decode_started = None
+
+        def decode(buffer):
+            nonlocal serialize_seconds, decode_started
+            decode_started = time.perf_counter()
+            result = decode_chdb_result(buffer, result_format)
+            serialize_seconds = time.perf_counter() - decode_started
+            row_count = len(result) if isinstance(result, list) else result["row_count"]
+            metrics.record_result(row_count, len(buffer))
+            return result
+
+        started = time.perf_counter()
+        result = get_chdb_executor().query(
+            query,
+            CHDB_OUTPUT_FORMATS[result_format],
+            decode,
+            timeout=timeout,
+        )
+        metrics.observe_stage("execute", time.perf_counter() - started - serialize_seconds, started)
+        metrics.observe_stage("serialize", serialize_seconds, decode_started)
+        return result
     except Exception as err:
-        logger.error(f"Error executing chDB query: {err}")
+        logger.error("Error executing chDB query: %s", err)
         return {"error": str(err)}
 
 
-def run_chdb_select_query(query: str):
-    """Run SQL in chDB, an in-process ClickHouse engine"""
-    logger.info(f"Executing chDB SELECT query: {query}")
+def run_chdb_select_query(query: str, format: str = ROWS):
+    """Run SQL in chDB, an in-process ClickHouse engine
+
+    format selects the result layout: "rows" (default) returns a list of row objects,
+    "columns" returns {"data": {column: [values]}}, and "arrow" returns a base64
+    Arrow IPC stream. The columnar formats are much cheaper for large scans.
+    """
+    _log_query_start("run_chdb_select_query", query)
     try:
-        future = QUERY_EXECUTOR.submit(execute_chdb_query, query)
+        timeout_secs = get_mcp_config().query_timeout
+        future = QUERY_EXECUTOR.submit(
+            execute_chdb_query, query, format, time.monotonic() + timeout_secs
+        )
         try:
-            timeout_secs = get_mcp_config().query_timeout
-            result = future.result(timeout=timeout_secs)
-            # Check if we received an error structure from execute_chdb_query
-            if isinstance(result, dict) and "error" in result:
-                logger.warning(f"chDB query failed: {result['error']}")
-                return {
-                    "status": "error",
-                    "message": f"chDB query failed: {result['error']}",
-                }
-            return result
+            return _chdb_tool_result(future.result(timeout=timeout_secs))
         except concurrent.futures.TimeoutError:
             logger.warning(
-                f"chDB query timed out after {timeout_secs} seconds: {query}"
+                "chDB query timed out after %s seconds: %s",
+                timeout_secs,
+                query_text(query),
+                extra=fields(query_hash=query_hash(query)),
             )
             future.cancel()
             return {
@@ -315,10 +1210,228 @@ def run_chdb_select_query(query: str):
                 "message": f"chDB query timed out after {timeout_secs} seconds",
             }
     except Exception as e:
-        logger.error(f"Unexpected error in run_chdb_select_query: {e}")
+        logger.error("Unexpected error in run_chdb_select_query: %s", e)
         return {"status": "error", "message": f"Unexpected error: {e}"}
 
 
+def _chdb_tool_result(result):
+    # Check if we received an error structure from execute_chdb_query
+    if isinstance(result, dict) and "error" in result:
+        logger.warning("chDB query failed: %s", result["error"])
+        return {
+            "status": "error",
+            "message": f"chDB query failed: {result['error']}",
+        }
+    return result
+
+
+async def _run_blocking(
+    fn, *args, timeout: Optional[float] = None, connection: Union[str, None, bool] = False
+):
+    """Run a blocking call on QUERY_EXECUTOR without blocking the event loop.
+
+    The call first waits, on the event loop, for a SCHEDULER slot of the calling client.
+    Unless ``connection`` is False, the call uses that ClickHouse connection and is also
+    limited to its pool capacity, so calls for a busy connection wait on the loop
+    instead of holding workers. ``timeout`` covers both the wait and the execution;
+    the slot stays taken until the worker has finished, even after a timeout.
+    The caller's context (e.g. the tool being measured) is carried into the worker.
+
+    Raises:
+        ToolError: If the scheduler's queue is full.
+    """
+    tenant = current_tenant()
+    queued_at = time.perf_counter()
+    context = contextvars.copy_context()
+    resource, resource_limit = None, 0
+    if connection is not False:
+        resource = connection or DEFAULT_CONNECTION
+        resource_limit = get_client_pool(connection).max_size
+
+    async def run():
+        release = await SCHEDULER.acquire(tenant, resource, resource_limit)
+        loop = asyncio.get_running_loop()
+        try:
+            future = QUERY_EXECUTOR.submit(
+                context.run, _executor_task, queued_at, functools.partial(fn, *args)
+            )
+        except BaseException:
+            release()
+            raise
+        # A timeout or cancellation cannot stop a running worker, so the slot is only
+        # given back once the worker is done; otherwise it would be handed to another
+        # call while every worker is still busy
+        future.add_done_callback(lambda _: _call_soon_threadsafe(loop, release))
+        return await asyncio.wrap_future(future)
+
+    try:
+        return await asyncio.wait_for(run(), timeout)
+    except SchedulerFull as e:
+        logger.warning("Rejected tool call of client %s: %s", tenant, e)
+        raise ToolError(f"Server busy (429 Too Many Requests): {e}")
+
+
+def _call_soon_threadsafe(loop: asyncio.AbstractEventLoop, callback) -> None:
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        # The loop has been closed, and the scheduler with it
+        pass
+
+
+def _resolve_tool_connection(connection: Optional[str]) -> Optional[str]:
+    try:
+        return resolve_connection(connection)
+    except ValueError as e:
+        raise ToolError(str(e))
+
+
+def _executor_task(queued_at: float, call):
+    metrics.observe_stage("queue", time.perf_counter() - queued_at, queued_at)
+    metrics.EXECUTOR_ACTIVE.inc()
+    try:
+        return call()
+    finally:
+        metrics.EXECUTOR_ACTIVE.dec()
+
+
+async def list_databases_async(connection: Optional[str] = None):
+    """List available ClickHouse databases"""
+    with metrics.tool_call("list_databases"):
+        connection = _resolve_tool_connection(connection)
+        return await QUERY_FLIGHTS.do(
+            ("list_databases", connection),
+            lambda: _run_blocking(list_databases, connection, connection=connection),
+        )
+
+
+async def list_tables_async(
+    database: str,
+    like: Optional[str] = None,
+    not_like: Optional[str] = None,
+    connection: Optional[str] = None,
+):
+    """List available ClickHouse tables in a database, including schema, comment,
+    row count, and column count. Returns tables starting with 'newoms' excluding 'newoms_orders_denormalized'."""
+    with metrics.tool_call("list_tables"):
+        connection = _resolve_tool_connection(connection)
+        return await QUERY_FLIGHTS.do(
+            ("list_tables", database, like, not_like, connection),
+            lambda: _run_blocking(
+                list_tables, database, like, not_like, connection, connection=connection
+            ),
+        )
+
+
+async def run_select_query_async(
+    query: str,
+    max_rows: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: str = ROWS,
+    include_stats: bool = False,
+    connection: Optional[str] = None,
+):
+    """Run a SELECT query in a ClickHouse database.
+
+    Results are returned one page at a time. If the page was cut short by the row or
+    byte budget, the result has "truncated": true and a "cursor"; pass that cursor
+    with the same query to fetch the next page. Use ORDER BY for stable pages. If
+    the server cannot page the query, "cursor_unavailable" says why instead.
+
+    format selects the page layout: "rows" (default) returns a list of rows,
+    "columns" returns {"data": {column: [values]}}, and "arrow" returns a base64
+    Arrow IPC stream. The columnar formats are much cheaper for large results.
+
+    With include_stats, the result has a "stats" block with the rows and bytes
+    ClickHouse read and its elapsed time; use it to find and avoid expensive scans.
+
+    connection selects a named ClickHouse connection; omit it for the default one.
+    """
+    query_id = str(uuid.uuid4())
+    _log_query_start("run_select_query", query, query_id)
+    timeout_secs = get_mcp_config().query_timeout
+    with metrics.tool_call("run_select_query") as call:
+        connection = _resolve_tool_connection(connection)
+        # Identical concurrent calls share one execution; the query is only killed once
+        # every caller waiting for it has timed out
+        try:
+            return await QUERY_FLIGHTS.do(
+                (
+                    "run_select_query",
+                    normalize_query(query),
+                    max_rows,
+                    cursor,
+                    format,
+                    include_stats,
+                    connection,
+                ),
+                lambda: _run_blocking(
+                    execute_query,
+                    query,
+                    query_id,
+                    max_rows,
+                    cursor,
+                    format,
+                    include_stats,
+                    connection,
+                    connection=connection,
+                ),
+                timeout=timeout_secs,
+                on_abandon=lambda: kill_query_in_background(query_id, connection),
+            )
+        except asyncio.TimeoutError:
+            call.status = "timeout"
+            logger.warning(
+                "Query timed out after %s seconds: %s",
+                timeout_secs,
+                query_text(query),
+                extra=fields(query_id=query_id, query_hash=query_hash(query)),
+            )
+            raise ToolError(f"Query timed out after {timeout_secs} seconds")
+        except ToolError:
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in run_select_query: %s", e)
+            raise RuntimeError(f"Unexpected error during query execution: {str(e)}")
+
+
+async def run_chdb_select_query_async(query: str, format: str = ROWS):
+    """Run SQL in chDB, an in-process ClickHouse engine
+
+    format selects the result layout: "rows" (default) returns a list of row objects,
+    "columns" returns {"data": {column: [values]}}, and "arrow" returns a base64
+    Arrow IPC stream. The columnar formats are much cheaper for large scans.
+    """
+    _log_query_start("run_chdb_select_query", query)
+    timeout_secs = get_mcp_config().query_timeout
+    deadline = time.monotonic() + timeout_secs
+    with metrics.tool_call("run_chdb_select_query") as call:
+        try:
+            result = await _run_blocking(
+                execute_chdb_query, query, format, deadline, timeout=timeout_secs
+            )
+            result = _chdb_tool_result(result)
+        except asyncio.TimeoutError:
+            call.status = "timeout"
+            logger.warning(
+                "chDB query timed out after %s seconds: %s",
+                timeout_secs,
+                query_text(query),
+                extra=fields(query_hash=query_hash(query)),
+            )
+            return {
+                "status": "error",
+                "message": f"chDB query timed out after {timeout_secs} seconds",
+            }
+        except Exception as e:
+            call.status = "error"
+            logger.error("Unexpected error in run_chdb_select_query: %s", e)
+            return {"status": "error", "message": f"Unexpected error: {e}"}
+        if isinstance(result, dict) and result.get("status") == "error":
+            call.status = "timeout" if "timed out" in result["message"] else "error"
+        return result
+
+
 def chdb_initial_prompt() -> str:
     """This prompt helps users understand how to interact and perform common operations in chDB"""
     return CHDB_PROMPT
@@ -326,33 +1439,33 @@ def chdb_initial_prompt() -> str:
 
 def get_query_rules() -> str:
     """Get ClickHouse query rules and best practices for the analytics database.
-    
+
     Returns important considerations and formulas to follow when writing queries.
     """
     rules = {
         "engine_considerations": [
             "Always use FINAL keyword in queries - the table uses ReplacingMergeTree engine which may have duplicate rows",
-            "FINAL ensures you get the latest version of each row"
+            "FINAL ensures you get the latest version of each row",
         ],
         "sales_calculation": [
             "Sales value formula: quantity * sale_price",
             "Do NOT use order_total_amount directly for item-level sales calculations",
-            "For delivered items: delivered_quantity * sale_price"
+            "For delivered items: delivered_quantity * sale_price",
         ],
         "data_deduplication": [
             "The newoms_orders_denormalized table is denormalized and contains duplicate rows for each item in an order",
             "Always use DISTINCT on order_id when counting unique orders",
-            "Use DISTINCT on customer_id when counting unique customers"
+            "Use DISTINCT on customer_id when counting unique customers",
         ],
         "filtering_best_practices": [
             "Always filter _peerdb_is_deleted = 0 to exclude deleted records",
             "Use toDate(order_created_at) = today() for today's data",
-            "Exclude test facilities: KORAMANGALA_STORE, ROZANA_TEST_WH1"
+            "Exclude test facilities: KORAMANGALA_STORE, ROZANA_TEST_WH1",
         ],
         "query_structure_template": [
             "SELECT SUM(quantity * sale_price) as total_sales FROM analytics.newoms_orders_denormalized FINAL",
             "WHERE toDate(order_created_at) = today() AND _peerdb_is_deleted = 0",
-            "AND facility_name NOT IN ('KORAMANGALA_STORE', 'ROZANA_TEST_WH1')"
+            "AND facility_name NOT IN ('KORAMANGALA_STORE', 'ROZANA_TEST_WH1')",
         ],
         "key_columns": {
             "order_id": "Unique order identifier",
@@ -362,8 +1475,8 @@ def get_query_rules() -> str:
             "delivered_quantity": "Quantity actually delivered",
             "order_total_amount": "Total order amount (use only for order-level aggregations)",
             "facility_name": "Warehouse/facility name",
-            "_peerdb_is_deleted": "Deletion flag (0 = active, 1 = deleted)"
-        }
+            "_peerdb_is_deleted": "Deletion flag (0 = active, 1 = deleted)",
+        },
     }
     return json.dumps(rules, indent=2)
 
@@ -374,23 +1487,41 @@ def _init_chdb_client():
         if not get_chdb_config().enabled:
             logger.info("chDB is disabled, skipping client initialization")
             return None
+        if get_chdb_config().execution_mode == "process":
+            # The data path belongs to the worker processes, which chDB locks it to
+            logger.info("chDB runs in worker processes, skipping in-process client initialization")
+            return None
 
         client_config = get_chdb_config().get_client_config()
         data_path = client_config["data_path"]
-        logger.info(f"Creating chDB client with data_path={data_path}")
-        client = chs.Session(path=data_path)
-        logger.info(f"Successfully connected to chDB with data_path={data_path}")
+        logger.info("Creating chDB client with data_path=%s", data_path)
+        client = _chdb_session(data_path)
+        logger.info("Successfully connected to chDB with data_path=%s", data_path)
         return client
     except Exception as e:
-        logger.error(f"Failed to initialize chDB client: {e}")
+        logger.error("Failed to initialize chDB client: %s", e)
         return None
 
 
+def _clickhouse_tool(fn, name: str) -> Tool:
+    """Build a ClickHouse tool whose description lists the connections it can select."""
+    mcp_config = get_mcp_config()
+    description = None
+    if mcp_config.connections:
+        default = mcp_config.default_connection or DEFAULT_CONNECTION
+        description = (
+            f"{inspect.cleandoc(fn.__doc__)}\n\nAvailable connections: "
+            f"{', '.join(mcp_config.connection_names)} (default: {default})."
+        )
+    return Tool.from_function(fn, name=name, description=description)
+
+
 # Register tools based on configuration
 if os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true":
-    mcp.add_tool(Tool.from_function(list_databases))
-    mcp.add_tool(Tool.from_function(list_tables))
-    mcp.add_tool(Tool.from_function(run_select_query))
+    # Register the async variants so tool calls never block the event loop
+    mcp.add_tool(_clickhouse_tool(list_databases_async, "list_databases"))
+    mcp.add_tool(_clickhouse_tool(list_tables_async, "list_tables"))
+    mcp.add_tool(_clickhouse_tool(run_select_query_async, "run_select_query"))
     mcp.add_tool(Tool.from_function(get_query_rules))
 
     # Add query rules as a prompt so it's always available during tool discovery
@@ -404,11 +1535,7 @@ if os.getenv("CLICKHOUSE_ENABLED", "true").lower() == "true":
 
 
 if os.getenv("CHDB_ENABLED", "false").lower() == "true":
-    _chdb_client = _init_chdb_client()
-    if _chdb_client:
-        atexit.register(lambda: _chdb_client.close())
-
-    mcp.add_tool(Tool.from_function(run_chdb_select_query))
+    mcp.add_tool(Tool.from_function(run_chdb_select_query_async, name="run_chdb_select_query"))
     chdb_prompt = Prompt.from_function(
         chdb_initial_prompt,
         name="chdb_initial_prompt",
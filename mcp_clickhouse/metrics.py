@@ -0,0 +1,361 @@
+"""Prometheus-style metrics for the MCP server.
+
+A small self-contained registry rendered in the Prometheus text exposition format by
+the ``/metrics`` route, so no client library is needed. Tool calls record their outcome
+and duration, and the stages of their execution (queue wait, connect, execute,
+serialize) as histograms labelled with the tool that is running.
+
+The running tool is tracked in a context variable: ``tool_call`` sets it on the event
+loop, and ``_run_blocking`` copies the context into the executor thread, so code deep in
+the query path can call ``stage`` without knowing which tool it serves. Tool calls and
+stages are also traced as spans when OpenTelemetry is available (see tracing).
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from mcp_clickhouse import tracing
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGES = ("queue", "connect", "execute", "serialize")
+
+_current_tool: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "mcp_clickhouse_tool", default="none"
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A monotonically increasing value per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A value that can go up and down per label combination."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class CallbackGauge(_Metric):
+    """A gauge whose samples are read from a callback at scrape time.
+
+    The callback returns a mapping of label value tuples (in ``labelnames`` order) to
+    values; returning an empty mapping omits the metric's samples.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Dict[LabelValues, float]],
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._callback = callback
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(self._callback().items())
+        ]
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts, sum and count of observations per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+                    break
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total[0])) for key, (counts, total) in self._values.items()
+            )
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(bucket_labels, key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics in registration order and renders them for scraping."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def callback_gauge(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str],
+        callback: Callable[[], Dict[LabelValues, float]],
+    ) -> CallbackGauge:
+        return self.register(CallbackGauge(name, documentation, labelnames, callback))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                lines.append(f"# {metric.name} unavailable: {_escape(e)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+TOOL_CALLS = REGISTRY.counter(
+    "mcp_clickhouse_tool_calls_total",
+    "Tool calls by outcome (ok, error, timeout)",
+    ("tool", "status"),
+)
+TOOL_DURATION = REGISTRY.histogram(
+    "mcp_clickhouse_tool_duration_seconds", "End-to-end tool call latency", ("tool",)
+)
+STAGE_DURATION = REGISTRY.histogram(
+    "mcp_clickhouse_tool_stage_duration_seconds",
+    "Tool call latency by stage (queue, connect, execute, serialize)",
+    ("tool", "stage"),
+)
+RESULT_ROWS = REGISTRY.counter(
+    "mcp_clickhouse_result_rows_total", "Rows returned by query tools", ("tool",)
+)
+RESULT_BYTES = REGISTRY.counter(
+    "mcp_clickhouse_result_bytes_total", "Approximate bytes returned by query tools", ("tool",)
+)
+READ_ROWS = REGISTRY.counter(
+    "mcp_clickhouse_read_rows_total", "Rows ClickHouse read to answer query tools", ("tool",)
+)
+READ_BYTES = REGISTRY.counter(
+    "mcp_clickhouse_read_bytes_total", "Bytes ClickHouse read to answer query tools", ("tool",)
+)
+EXECUTOR_ACTIVE = REGISTRY.gauge(
+    "mcp_clickhouse_executor_active_workers", "Query executor threads running a task"
+)
+
+
+def current_tool() -> str:
+    """Get the name of the tool the current code runs for, or "none"."""
+    return _current_tool.get()
+
+
+class ToolCall:
+    """Outcome of one tool call; set ``status`` to "timeout" or "error" before it ends."""
+
+    __slots__ = ("tool", "status")
+
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.status = "ok"
+
+
+@contextmanager
+def tool_call(tool: str) -> Iterator[ToolCall]:
+    """Count and time a tool call, and label the stages recorded inside it with ``tool``.
+
+    An exception escaping the block marks the call as an error unless a status was set.
+    """
+    call = ToolCall(tool)
+    token = _current_tool.set(tool)
+    started = time.perf_counter()
+    with tracing.span(tool, **{"mcp.tool": tool}):
+        try:
+            yield call
+        except BaseException:
+            if call.status == "ok":
+                call.status = "error"
+            raise
+        finally:
+            _current_tool.reset(token)
+            tracing.set_attributes(**{"mcp.tool.status": call.status})
+            TOOL_DURATION.observe(time.perf_counter() - started, tool=tool)
+            TOOL_CALLS.inc(tool=tool, status=call.status)
+
+
+def observe_stage(stage: str, seconds: float, started: Optional[float] = None) -> None:
+    """Record ``seconds`` spent in ``stage`` for the current tool.
+
+    ``started`` is the ``time.perf_counter()`` value the stage began at; it defaults to
+    ``seconds`` ago and places the stage's span in the trace.
+    """
+    STAGE_DURATION.observe(seconds, tool=current_tool(), stage=stage)
+    if started is None:
+        started = time.perf_counter() - seconds
+    tracing.record_span(stage, started, started + seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as stage ``name`` of the current tool, inside a span of that name."""
+    started = time.perf_counter()
+    with tracing.span(name):
+        try:
+            yield
+        finally:
+            STAGE_DURATION.observe(time.perf_counter() - started, tool=current_tool(), stage=name)
+
+
+def record_result(rows: int, nbytes: int, tool: Optional[str] = None) -> None:
+    """Count the rows and approximate bytes a query tool returned."""
+    tool = tool or current_tool()
+    RESULT_ROWS.inc(rows, tool=tool)
+    RESULT_BYTES.inc(nbytes, tool=tool)
+
+
+def record_read(rows: int, nbytes: int, tool: Optional[str] = None) -> None:
+    """Count the rows and bytes ClickHouse read for a query tool."""
+    tool = tool or current_tool()
+    READ_ROWS.inc(rows, tool=tool)
+    READ_BYTES.inc(nbytes, tool=tool)
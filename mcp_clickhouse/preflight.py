@@ -0,0 +1,163 @@
+"""Cost pre-flight for SELECT queries based on ``EXPLAIN ESTIMATE``.
+
+Before a query runs, ClickHouse is asked how many rows, parts and marks it would read
+from MergeTree tables. Estimates above the configured budgets either reject the query,
+so it never reaches the cluster, or come back as a warning next to the result.
+``EXPLAIN ESTIMATE`` only consults part metadata and the primary index, so the check is
+cheap; its estimates are still cached per normalized query, since agents tend to
+repeat and page through the same queries.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional
+
+from mcp_clickhouse.cache import TTLCache
+
+logger = logging.getLogger("mcp-clickhouse")
+
+OFF = "off"
+WARN = "warn"
+REJECT = "reject"
+PREFLIGHT_MODES = (OFF, WARN, REJECT)
+
+
+class QueryCostRejected(ValueError):
+    """Raised when a query's estimated cost exceeds a budget in reject mode."""
+
+
+class CostEstimate(NamedTuple):
+    """Rows, parts and marks a query would read, summed over the tables it reads."""
+
+    rows: int
+    parts: int
+    marks: int
+
+
+class CostLimits(NamedTuple):
+    """Budgets for a query's estimated cost; 0 disables a budget."""
+
+    max_rows: int = 0
+    max_parts: int = 0
+    max_marks: int = 0
+
+    def violations(self, estimate: CostEstimate) -> List[str]:
+        """Describe every budget ``estimate`` exceeds."""
+        exceeded = []
+        for name, value, limit in (
+            ("rows", estimate.rows, self.max_rows),
+            ("parts", estimate.parts, self.max_parts),
+            ("marks", estimate.marks, self.max_marks),
+        ):
+            if limit and value > limit:
+                exceeded.append(f"{value} {name} (limit {limit})")
+        return exceeded
+
+
+def estimate_cost(client, query: str, settings: Optional[dict] = None) -> CostEstimate:
+    """Ask ClickHouse for the cost of ``query`` with ``EXPLAIN ESTIMATE``."""
+    # A trailing line comment would swallow anything after the query, so end the line
+    stripped = query.strip().rstrip(";").rstrip()
+    result = client.query(f"EXPLAIN ESTIMATE {stripped}\n", settings=settings)
+    columns = list(result.column_names)
+    totals = {"rows": 0, "parts": 0, "marks": 0}
+    for row in result.result_rows:
+        values = dict(zip(columns, row))
+        for name in totals:
+            totals[name] += int(values.get(name) or 0)
+    return CostEstimate(**totals)
+
+
+class CostPreflight:
+    """Checks queries against cost budgets before they run.
+
+    Args:
+        mode: "warn" returns a warning for expensive queries, "reject" refuses them
+        limits: Row, part and mark budgets
+        fail_open: In reject mode, run queries whose cost cannot be estimated instead of
+            refusing them
+        cache_ttl: Seconds an estimate is reused for the same query key
+        max_entries: Maximum number of cached estimates
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        limits: CostLimits,
+        fail_open: bool = False,
+        cache_ttl: float = 300,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if mode not in (WARN, REJECT):
+            raise ValueError(f"Cost preflight mode must be {WARN} or {REJECT}, not '{mode}'")
+        self.mode = mode
+        self.limits = limits
+        self.fail_open = fail_open
+        self._estimates = TTLCache(max_entries, cache_ttl, clock)
+        self._lock = threading.Lock()
+        self.warned = 0
+        self.rejected = 0
+        self.failed = 0
+
+    def check(self, key: Hashable, estimate: Callable[[], CostEstimate]) -> Optional[str]:
+        """Check the cost of a query, estimating it only on a cache miss.
+
+        Args:
+            key: Identifies the query and everything its estimate depends on, such as
+                the normalized SQL and the connection
+            estimate: Computes the estimate, e.g. with estimate_cost
+
+        Returns:
+            A warning for an over-budget query in warn mode, otherwise None. In warn
+            mode, and in reject mode with ``fail_open``, queries that cannot be
+            estimated pass; running them reports any error.
+
+        Raises:
+            QueryCostRejected: If the query is over budget in reject mode, or its cost
+                cannot be estimated and ``fail_open`` is off.
+        """
+        cost = self._estimates.get(key)
+        if cost is None:
+            try:
+                cost = estimate()
+            except Exception as e:
+                reject = self.mode == REJECT and not self.fail_open
+                with self._lock:
+                    self.failed += 1
+                    if reject:
+                        self.rejected += 1
+                if reject:
+                    raise QueryCostRejected(
+                        f"Query rejected by cost preflight: its cost could not be estimated "
+                        f"(EXPLAIN ESTIMATE failed: {e})"
+                    ) from e
+                logger.info("Skipping cost preflight, EXPLAIN ESTIMATE failed: %s", e)
+                return None
+            self._estimates.set(key, cost)
+
+        exceeded = self.limits.violations(cost)
+        if not exceeded:
+            return None
+        message = (
+            f"Query would read {', '.join(exceeded)}. Filter on the table's primary key "
+            f"or partition key, or aggregate less data, to reduce the cost"
+        )
+        with self._lock:
+            if self.mode == REJECT:
+                self.rejected += 1
+            else:
+                self.warned += 1
+        if self.mode == REJECT:
+            raise QueryCostRejected(f"Query rejected by cost preflight: {message}")
+        logger.warning("Expensive query: %s", message)
+        return message
+
+    def stats(self) -> Dict[str, int]:
+        """Get a snapshot of estimate cache and outcome counters."""
+        stats = self._estimates.stats()
+        with self._lock:
+            stats.update(warned=self.warned, rejected=self.rejected, failed=self.failed)
+        return stats
@@ -0,0 +1,249 @@
+"""Readers that turn a streamed ClickHouse result into one budgeted page.
+
+``run_select_query`` can return a page in one of three shapes:
+
+* ``rows``: ``{"columns": [...], "rows": [[...], ...]}``, one tuple per row (default)
+* ``columns``: ``{"columns": [...], "data": {"col": [...]}}``, one list per column,
+  read with ``query_column_block_stream`` so no per-row tuples are built
+* ``arrow``: ``{"columns": [...], "arrow": "<base64>"}``, a base64 Arrow IPC stream read
+  with ``query_arrow_stream`` (requires the optional ``pyarrow`` dependency)
+
+Every reader stops at the first block that exhausts the row or byte budget, keeps at
+least one row, and reports whether the page was truncated.
+
+chDB results use the same format names, but are decoded straight from the output
+buffer chDB produced (``decode_chdb_result``) instead of being streamed.
+"""
+
+import array
+import base64
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+ROWS = "rows"
+COLUMNS = "columns"
+ARROW = "arrow"
+RESULT_FORMATS = (ROWS, COLUMNS, ARROW)
+
+
+class Page(NamedTuple):
+    """One page of a result set in the requested format.
+
+    Formats that need a separate encoding step (Arrow IPC) leave ``payload`` empty and
+    provide ``encode`` instead, so callers can time reading and serializing apart.
+    ``summary`` holds the server's X-ClickHouse-Summary counters when the stream
+    exposes them (the Arrow stream does not).
+    """
+
+    columns: List[str]
+    payload: Dict[str, Any]
+    row_count: int
+    truncated: bool
+    encode: Optional[Callable[[], Dict[str, Any]]] = None
+    summary: Optional[Dict[str, Any]] = None
+
+    def encode_payload(self) -> Dict[str, Any]:
+        """Get the serialized payload of the page."""
+        return self.encode() if self.encode is not None else self.payload
+
+
+def validate_format(result_format: str) -> str:
+    """Normalize a result format name.
+
+    Raises:
+        ValueError: If the format is not one of RESULT_FORMATS.
+    """
+    normalized = (result_format or ROWS).lower()
+    if normalized not in RESULT_FORMATS:
+        raise ValueError(
+            f"Unsupported result format '{result_format}'; use one of {', '.join(RESULT_FORMATS)}"
+        )
+    return normalized
+
+
+def estimate_value_bytes(value: Any) -> int:
+    """Cheaply estimate the serialized size of a single value."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, (list, tuple, dict)):
+        return len(str(value))
+    return 8
+
+
+def estimate_row_bytes(row: Sequence[Any]) -> int:
+    """Cheaply estimate the serialized size of a result row."""
+    return sum(estimate_value_bytes(value) for value in row)
+
+
+def _estimate_column_bytes(column: Sequence[Any]) -> int:
+    if isinstance(column, array.array):
+        return column.itemsize * len(column)
+    return sum(estimate_value_bytes(value) for value in column)
+
+
+def estimate_result_bytes(payload: Dict[str, Any]) -> int:
+    """Estimate the size of a page payload produced by ``read_page``."""
+    if "arrow" in payload:
+        return len(payload["arrow"])
+    if "data" in payload:
+        return sum(_estimate_column_bytes(column) for column in payload["data"].values())
+    return sum(estimate_row_bytes(row) for row in payload.get("rows", ()))
+
+
+def read_page(
+    client, query: str, settings: dict, result_format: str, row_budget: int, byte_budget: int
+) -> Page:
+    """Stream ``query`` and read at most one page of it in ``result_format``."""
+    if result_format == ARROW:
+        return _read_arrow(client, query, settings, row_budget, byte_budget)
+    if result_format == COLUMNS:
+        return _read_columns(client, query, settings, row_budget, byte_budget)
+    return _read_rows(client, query, settings, row_budget, byte_budget)
+
+
+def _read_rows(client, query: str, settings: dict, row_budget: int, byte_budget: int) -> Page:
+    rows = []
+    result_bytes = 0
+    truncated = False
+    # Stream blocks and stop reading as soon as a budget is exhausted; leaving the
+    # stream context closes the response so ClickHouse stops sending the rest
+    with client.query_row_block_stream(query, settings=settings) as stream:
+        column_names = stream.source.column_names
+        for block in stream:
+            for row in block:
+                row_bytes = estimate_row_bytes(row)
+                if len(rows) >= row_budget or (rows and result_bytes + row_bytes > byte_budget):
+                    truncated = True
+                    break
+                rows.append(row)
+                result_bytes += row_bytes
+            if truncated:
+                break
+    return Page(list(column_names), {"rows": rows}, len(rows), truncated, summary=_summary(stream))
+
+
+def _read_columns(client, query: str, settings: dict, row_budget: int, byte_budget: int) -> Page:
+    data: Optional[List[list]] = None
+    row_count = 0
+    result_bytes = 0
+    truncated = False
+    with client.query_column_block_stream(query, settings=settings) as stream:
+        column_names = list(stream.source.column_names)
+        data = [[] for _ in column_names]
+        for block in stream:
+            block_rows = len(block[0]) if block else 0
+            take = min(block_rows, row_budget - row_count)
+            block_bytes = sum(_estimate_column_bytes(column) for column in block)
+            if result_bytes + block_bytes > byte_budget:
+                # Only the block that crosses the byte budget is sized row by row
+                take = min(
+                    take, _rows_within(block, byte_budget - result_bytes, keep_one=not row_count)
+                )
+            if take < block_rows:
+                truncated = True
+            for values, column in zip(data, block):
+                values.extend(column[:take] if take < block_rows else column)
+            row_count += take
+            result_bytes += block_bytes
+            if truncated or row_count >= row_budget:
+                # A full page may still be followed by more rows
+                truncated = truncated or next(iter(stream), None) is not None
+                break
+    payload = {"data": dict(zip(column_names, data))}
+    return Page(column_names, payload, row_count, truncated, summary=_summary(stream))
+
+
+def _rows_within(block: Sequence[Sequence[Any]], byte_budget: int, keep_one: bool) -> int:
+    used = 0
+    for index in range(len(block[0])):
+        used += sum(estimate_value_bytes(column[index]) for column in block)
+        if used > byte_budget:
+            return max(index, 1 if keep_one else 0)
+    return len(block[0])
+
+
+def _read_arrow(client, query: str, settings: dict, row_budget: int, byte_budget: int) -> Page:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ValueError(
+            "The arrow result format requires pyarrow; install mcp-clickhouse[arrow]"
+        ) from None
+
+    batches = []
+    row_count = 0
+    result_bytes = 0
+    truncated = False
+    with client.query_arrow_stream(query, settings=settings) as stream:
+        for batch in stream:
+            take = min(batch.num_rows, row_budget - row_count)
+            if batch.num_rows and result_bytes + batch.nbytes > byte_budget:
+                # Arrow batches are dense, so slice the crossing batch by average row width
+                row_width = max(batch.nbytes // batch.num_rows, 1)
+                fits = max(byte_budget - result_bytes, 0) // row_width
+                take = min(take, max(fits, 0 if row_count else 1))
+            if take < batch.num_rows:
+                truncated = True
+                batch = batch.slice(0, take)
+            batches.append(batch)
+            row_count += take
+            result_bytes += batch.nbytes
+            if truncated or row_count >= row_budget:
+                truncated = truncated or next(iter(stream), None) is not None
+                break
+
+    schema = batches[0].schema if batches else pa.schema([])
+
+    def encode() -> Dict[str, Any]:
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+        return {"arrow": base64.b64encode(sink.getvalue().to_pybytes()).decode()}
+
+    return Page(list(schema.names), {}, row_count, truncated, encode, _summary(stream))
+
+
+def _summary(stream) -> Optional[Dict[str, Any]]:
+    # Row and column streams come from a QueryResult carrying the summary header
+    summary = getattr(stream.source, "summary", None)
+    return summary if isinstance(summary, dict) else None
+
+
+# chDB output format requested for each result format
+CHDB_OUTPUT_FORMATS = {ROWS: "JSON", COLUMNS: "JSONColumns", ARROW: "ArrowStream"}
+
+
+def decode_chdb_result(buffer, result_format: str):
+    """Decode chDB output produced in ``CHDB_OUTPUT_FORMATS[result_format]``.
+
+    ``buffer`` is a memoryview of the output. With in-process chDB it points into
+    chDB's memory, and Arrow output is base64 encoded from there without a copy. The
+    JSON formats are copied to bytes once for json.loads. In process mode, the output
+    has already been copied over the worker's pipe.
+
+    Returns:
+        For ``rows``, a list of dicts, one per row. For ``columns``, ``{"columns",
+        "data", "row_count"}`` with one list per column. For ``arrow``, ``{"columns",
+        "arrow", "row_count"}`` with a base64 Arrow IPC stream.
+    """
+    if result_format == ARROW:
+        if not buffer:
+            return {"columns": [], "arrow": "", "row_count": 0}
+        import pyarrow as pa  # chdb depends on pyarrow
+
+        # Only the schema and batch headers are parsed; the payload is encoded as-is
+        reader = pa.ipc.open_stream(pa.py_buffer(buffer))
+        row_count = sum(batch.num_rows for batch in reader)
+        return {
+            "columns": list(reader.schema.names),
+            "arrow": base64.b64encode(buffer).decode(),
+            "row_count": row_count,
+        }
+    if result_format == COLUMNS:
+        data = json.loads(bytes(buffer)) if buffer else {}
+        row_count = len(next(iter(data.values()))) if data else 0
+        return {"columns": list(data), "data": data, "row_count": row_count}
+    if not buffer:
+        return []
+    return json.loads(bytes(buffer)).get("data", [])
@@ -0,0 +1,361 @@
+"""Load balancing and failover over several ClickHouse replicas.
+
+``ReplicaRouter`` puts one ClickHouseClientPool in front of each replica and offers the
+same ``connection()``/``run()`` interface as a single pool, so tool calls and health
+checks spread over replicas without knowing about them. Every checkout picks a replica
+with the configured policy:
+
+* ``round_robin``: smooth weighted round robin
+* ``least_in_flight``: fewest checked-out connections per unit of weight
+* ``latency``: lowest moving average of call duration, scaled by in-flight calls
+
+Ties are broken by weighted round robin. A replica whose connection fails is ejected
+and stops receiving traffic; a background thread probes it once its ejection time is
+up, and each failed probe doubles the time. If every replica is ejected, the one due
+back first still gets traffic, so an outage of the whole cluster is not made worse by
+the router.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+from mcp_clickhouse.client_pool import (
+    ClickHouseClientPool,
+    PooledClient,
+    is_connection_error,
+    is_retryable_error,
+)
+
+logger = logging.getLogger("mcp-clickhouse")
+
+T = TypeVar("T")
+
+ROUND_ROBIN = "round_robin"
+LEAST_IN_FLIGHT = "least_in_flight"
+LATENCY = "latency"
+POLICIES = (ROUND_ROBIN, LEAST_IN_FLIGHT, LATENCY)
+
+# Weight of the newest sample in a replica's moving average of call duration
+_LATENCY_DECAY = 0.3
+# Longest ejection, in multiples of the base ejection time
+_MAX_EJECT_FACTOR = 16
+
+
+class Replica:
+    """A ClickHouse replica behind a ReplicaRouter, with its routing state.
+
+    Attributes:
+        name: "host:port" of the replica
+        pool: Client pool connected to the replica
+        weight: Share of traffic relative to the other replicas
+        in_flight: Connections currently checked out
+        latency: Moving average of call duration in seconds, None before the first call
+        failures: Consecutive connection failures, reset by a success
+        ejected_until: Monotonic time from which an ejected replica is probed, 0 if healthy
+    """
+
+    __slots__ = (
+        "name",
+        "pool",
+        "weight",
+        "in_flight",
+        "latency",
+        "failures",
+        "ejected_until",
+        "routed_total",
+        "ejected_total",
+        "_current_weight",
+    )
+
+    def __init__(self, name: str, pool: ClickHouseClientPool, weight: int = 1):
+        if weight < 1:
+            raise ValueError("Replica weight must be at least 1")
+        self.name = name
+        self.pool = pool
+        self.weight = weight
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until = 0.0
+        self.routed_total = 0
+        self.ejected_total = 0
+        self._current_weight = 0
+
+
+class ReplicaRouter:
+    """Routes pooled connections over several replicas, ejecting the ones that fail.
+
+    Args:
+        replicas: (name, pool, weight) of every replica
+        policy: "round_robin", "least_in_flight" or "latency"
+        eject_seconds: Time a failed replica is ejected before its first probe
+        clock: Monotonic time source, overridable for tests
+    """
+
+    def __init__(
+        self,
+        replicas: Sequence[Tuple[str, ClickHouseClientPool, int]],
+        policy: str = ROUND_ROBIN,
+        eject_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not replicas:
+            raise ValueError("At least one replica is required")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown load balancing policy '{policy}'")
+        self.replicas = [Replica(name, pool, weight) for name, pool, weight in replicas]
+        self.policy = policy
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    @property
+    def max_size(self) -> int:
+        """Get the number of clients that can be checked out at once, over all replicas."""
+        return sum(replica.pool.max_size for replica in self.replicas)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[PooledClient]:
+        """Check out a client from the chosen replica for the duration of a ``with`` block.
+
+        An error showing the replica could not be reached, whether connecting or
+        sending a request inside the block, ejects the replica. A connection lost after
+        a request was sent, e.g. to a read timeout, does not: a slow query says nothing
+        about the replica's health.
+
+        Args:
+            timeout: Seconds to wait for a free client, the replica pool's acquire
+                timeout if None
+
+        Raises:
+            PoolTimeoutError: If the chosen replica has no client available in time.
+        """
+        replica = self._choose()
+        started = time.perf_counter()
+        checked_out = False
+        try:
+            with replica.pool.connection(timeout) as pooled:
+                checked_out = True
+                yield pooled
+        except BaseException as err:
+            if is_retryable_error(err, checked_out):
+                self._finish(replica, None)
+            elif is_connection_error(err):
+                self._abandon(replica)
+            else:
+                self._finish(replica, time.perf_counter() - started)
+            raise
+        else:
+            self._finish(replica, time.perf_counter() - started)
+
+    def run(self, fn: Callable[[PooledClient], T], retries: int = 1) -> T:
+        """Run ``fn`` with a pooled client, failing over to another replica on connection errors.
+
+        As with ClickHouseClientPool.run, the call is only repeated if it cannot have
+        reached the server; the retry normally goes to another replica since the failed
+        one is ejected. A request that was sent and then lost its connection is not
+        repeated, as the replica may still be running it.
+        """
+        attempt = 0
+        while True:
+            started = False
+            try:
+                with self.connection() as pooled:
+                    started = True
+                    return fn(pooled)
+            except Exception as err:
+                if attempt >= retries or not is_retryable_error(err, started):
+                    raise
+                attempt += 1
+                logger.warning(
+                    "ClickHouse connection failed, retrying (attempt %s): %s", attempt, err
+                )
+
+    def run_all(self, fn: Callable[[PooledClient], T], dedicated: bool = False) -> Dict[str, T]:
+        """Run ``fn`` once on every replica, e.g. to KILL a query wherever it runs.
+
+        Args:
+            fn: Called with a client of each replica
+            dedicated: Use a new client outside each replica's pool, see
+                ClickHouseClientPool.run_dedicated
+
+        Returns:
+            Results by replica name, for the replicas where ``fn`` succeeded
+
+        Raises:
+            Exception: The first error, if ``fn`` failed on every replica.
+        """
+        results: Dict[str, T] = {}
+        first_error: Optional[Exception] = None
+        for replica in self.replicas:
+            try:
+                run = replica.pool.run_dedicated if dedicated else replica.pool.run
+                results[replica.name] = run(fn)
+            except Exception as err:
+                first_error = first_error or err
+        if not results and first_error is not None:
+            raise first_error
+        return results
+
+    def healthy_replicas(self) -> List[str]:
+        """Get the names of the replicas that are not ejected."""
+        with self._lock:
+            return [r.name for r in self.replicas if not r.ejected_until]
+
+    def probe(self) -> None:
+        """Probe ejected replicas that are due and return the reachable ones to rotation.
+
+        Called periodically by the background thread; exposed for tests and manual use.
+        """
+        now = self._clock()
+        with self._lock:
+            due = [r for r in self.replicas if r.ejected_until and r.ejected_until <= now]
+        for replica in due:
+            try:
+                with replica.pool.connection() as pooled:
+                    pooled.client.command("SELECT 1")
+            except Exception as e:
+                with self._lock:
+                    self._eject(replica)
+                logger.warning(
+                    "ClickHouse replica %s is still unreachable, next probe in %.0fs: %s",
+                    replica.name,
+                    replica.ejected_until - self._clock(),
+                    e,
+                )
+            else:
+                with self._lock:
+                    replica.failures = 0
+                    replica.ejected_until = 0.0
+                logger.info("ClickHouse replica %s is reachable again", replica.name)
+
+    def stats(self) -> Dict[str, int]:
+        """Get pool counters summed over all replicas, and the number of healthy replicas."""
+        totals: Dict[str, int] = {}
+        for replica in self.replicas:
+            for stat, value in replica.pool.stats().items():
+                totals[stat] = totals.get(stat, 0) + value
+        totals["replicas"] = len(self.replicas)
+        totals["healthy_replicas"] = len(self.healthy_replicas())
+        return totals
+
+    def session_settings(self) -> List[Dict[str, Any]]:
+        """Get the session settings of every open pooled connection, over all replicas."""
+        return [
+            settings for replica in self.replicas for settings in replica.pool.session_settings()
+        ]
+
+    def replica_stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the routing state of every replica, by replica name."""
+        with self._lock:
+            return {
+                r.name: {
+                    "healthy": 0 if r.ejected_until else 1,
+                    "weight": r.weight,
+                    "in_flight": r.in_flight,
+                    "latency_seconds": r.latency or 0.0,
+                    "routed_total": r.routed_total,
+                    "ejected_total": r.ejected_total,
+                }
+                for r in self.replicas
+            }
+
+    def close(self) -> None:
+        """Stop probing and close every replica's pool."""
+        self._stop.set()
+        for replica in self.replicas:
+            replica.pool.close()
+
+    def _choose(self) -> Replica:
+        self._ensure_probe_thread()
+        with self._lock:
+            candidates = [r for r in self.replicas if not r.ejected_until]
+            if not candidates:
+                # Every replica is down: keep trying the one due back first
+                candidates = [min(self.replicas, key=lambda r: r.ejected_until)]
+            if self.policy != ROUND_ROBIN and len(candidates) > 1:
+                scores = [self._score(r) for r in candidates]
+                best = min(scores)
+                candidates = [r for r, score in zip(candidates, scores) if score == best]
+            replica = self._weighted_round_robin(candidates)
+            replica.in_flight += 1
+            replica.routed_total += 1
+            return replica
+
+    def _score(self, replica: Replica) -> float:
+        if self.policy == LEAST_IN_FLIGHT:
+            return replica.in_flight / replica.weight
+        # Replicas without a sample yet score 0, so each gets tried
+        return (replica.latency or 0.0) * (replica.in_flight + 1) / replica.weight
+
+    def _weighted_round_robin(self, candidates: List[Replica]) -> Replica:
+        # Smooth weighted round robin (as in nginx): spreads picks evenly by weight
+        total = 0
+        chosen = candidates[0]
+        for replica in candidates:
+            replica._current_weight += replica.weight
+            total += replica.weight
+            if replica._current_weight > chosen._current_weight:
+                chosen = replica
+        chosen._current_weight -= total
+        return chosen
+
+    def _finish(self, replica: Replica, elapsed: Optional[float]) -> None:
+        """Record the end of a call; ``elapsed`` is None if it failed to connect."""
+        with self._lock:
+            replica.in_flight -= 1
+            was_ejected = bool(replica.ejected_until)
+            if elapsed is None:
+                if not was_ejected:
+                    self._eject(replica)
+                eject_for = replica.ejected_until - self._clock()
+            else:
+                replica.failures = 0
+                replica.ejected_until = 0.0
+                if replica.latency is None:
+                    replica.latency = elapsed
+                else:
+                    replica.latency += _LATENCY_DECAY * (elapsed - replica.latency)
+        if elapsed is None and not was_ejected:
+            logger.warning(
+                "Ejected ClickHouse replica %s for %.0fs after a connection error",
+                replica.name,
+                eject_for,
+            )
+        elif elapsed is not None and was_ejected:
+            logger.info("ClickHouse replica %s is reachable again", replica.name)
+
+    def _abandon(self, replica: Replica) -> None:
+        """Record the end of a call that tells nothing about the replica's health."""
+        with self._lock:
+            replica.in_flight -= 1
+
+    def _eject(self, replica: Replica) -> None:
+        # Called with self._lock held
+        replica.failures += 1
+        factor = min(2 ** (replica.failures - 1), _MAX_EJECT_FACTOR)
+        replica.ejected_until = self._clock() + self.eject_seconds * factor
+        replica.ejected_total += 1
+
+    def _ensure_probe_thread(self) -> None:
+        if self._probe_thread is not None:
+            return
+        with self._lock:
+            if self._probe_thread is None:
+                self._probe_thread = threading.Thread(
+                    target=self._probe_loop, name="clickhouse-replica-probe", daemon=True
+                )
+                self._probe_thread.start()
+
+    def _probe_loop(self) -> None:
+        interval = max(min(self.eject_seconds, 5.0), 0.01)
+        while not self._stop.wait(interval):
+            try:
+                self.probe()
+            except Exception as e:
+                logger.error("ClickHouse replica probe failed: %s", e)
@@ -0,0 +1,166 @@
+"""Lightweight SQL text helpers.
+
+These helpers work on a token-level view of the query that ignores comments, string
+literals and quoted identifiers. They are heuristics for deciding whether a query can be
+safely rewritten, not a SQL parser: anything they cannot classify is left untouched.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<comment>--[^\n]*|\#[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.|'')*')
+  | (?P<quoted>"(?:[^"\\]|\\.|"")*"|`(?:[^`\\]|\\.|``)*`)
+  | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+  | (?P<open>\()
+  | (?P<close>\))
+  | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Top-level clauses after which a trailing LIMIT cannot simply be appended
+_NO_AUTO_LIMIT_KEYWORDS = {
+    "LIMIT",
+    "OFFSET",
+    "FETCH",
+    "FORMAT",
+    "SETTINGS",
+    "INTO",
+    "UNION",
+    "EXCEPT",
+    "INTERSECT",
+}
+
+# Functions whose result changes between runs of the same query (lower-cased)
+_VOLATILE_FUNCTIONS = {
+    "now",
+    "now64",
+    "nowinblock",
+    "utc_timestamp",
+    "utctimestamp",
+    "current_timestamp",
+    "localtimestamp",
+    "uptime",
+    "generateuuidv4",
+    "generateuuidv7",
+    "generateulid",
+    "generatesnowflakeid",
+    "generaterandom",
+    "fuzzbits",
+    "sleep",
+    "sleepeachrow",
+    "rownumberinallblocks",
+    "blocknumber",
+    "rownumberinblock",
+    "queryid",
+    "initialqueryid",
+    "hostname",
+    "fqdn",
+    "serveruuid",
+}
+
+# Keywords that read the current time without parentheses
+_VOLATILE_KEYWORDS = {"current_timestamp", "localtimestamp"}
+
+# Functions and keywords reading the current date, whose result only changes at midnight
+_DATE_FUNCTIONS = {"today", "yesterday", "current_date", "curdate"}
+_DATE_KEYWORDS = {"current_date"}
+
+
+def tokenize(query: str) -> List[Tuple[str, str, int]]:
+    """Split a query into (kind, text, paren_depth) tokens, skipping whitespace and comments.
+
+    Kinds are ``string``, ``quoted``, ``word``, ``open``, ``close`` and ``other``.
+    """
+    tokens = []
+    depth = 0
+    for match in _TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        if kind in ("ws", "comment"):
+            continue
+        if kind == "close":
+            depth -= 1
+        tokens.append((kind, match.group(), depth))
+        if kind == "open":
+            depth += 1
+    return tokens
+
+
+def top_level_keywords(query: str) -> List[str]:
+    """Get the upper-cased words of a query that are not nested inside parentheses."""
+    return [text.upper() for kind, text, depth in tokenize(query) if kind == "word" and depth == 0]
+
+
+def apply_auto_limit(query: str, limit: int, offset: int = 0) -> Optional[str]:
+    """Append ``LIMIT [offset, ]limit`` to a single top-level SELECT that has no LIMIT of its own.
+
+    The offset belongs in the same clause: ClickHouse applies the ``offset`` setting
+    after the query's own LIMIT, so it cannot page through a limited query.
+
+    Returns:
+        The rewritten query, or None if the query is not a plain SELECT/WITH statement
+        or already ends in a clause a LIMIT cannot follow (LIMIT, OFFSET, OFFSET ... FETCH,
+        FORMAT, SETTINGS, INTO OUTFILE, or a top-level UNION/EXCEPT/INTERSECT).
+    """
+    stripped = query.strip().rstrip(";").rstrip()
+    tokens = tokenize(stripped)
+    if not tokens or tokens[0][0] != "word" or tokens[0][1].upper() not in ("SELECT", "WITH"):
+        return None
+    if any(kind == "other" and text == ";" for kind, text, _ in tokens):
+        return None
+    if _NO_AUTO_LIMIT_KEYWORDS.intersection(top_level_keywords(stripped)):
+        return None
+    # A trailing line comment would swallow an appended clause, so start a new line
+    clause = f"{int(offset)}, {int(limit)}" if offset else str(int(limit))
+    return f"{stripped}\nLIMIT {clause}"
+
+
+def normalize_query(query: str) -> str:
+    """Canonical text of a query for use in cache keys.
+
+    Comments and redundant whitespace are dropped and a trailing semicolon removed;
+    literals, identifiers and keyword case are kept, so only queries that are equivalent
+    token by token share a key.
+    """
+    return " ".join(text for _, text, _ in tokenize(query.strip().rstrip(";")))
+
+
+def is_deterministic(query: str) -> bool:
+    """Guess whether running ``query`` twice returns the same result.
+
+    Returns False if the query calls a time, random or per-execution function
+    (``now()``, ``rand()``, ``generateUUIDv4()``, ...) or reads a ``system`` table,
+    whose contents reflect live server state. Reading the current date (``today()``,
+    ``yesterday()``) does not count: the result holds until midnight, see
+    reads_current_date.
+    """
+    tokens = tokenize(query)
+    for index, (kind, text, _) in enumerate(tokens):
+        if kind != "word":
+            continue
+        name = text.lower()
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else ""
+        if following == "(" and (name in _VOLATILE_FUNCTIONS or name.startswith("rand")):
+            return False
+        if name in _VOLATILE_KEYWORDS:
+            return False
+        if name == "system" and following == ".":
+            return False
+    return True
+
+
+def reads_current_date(query: str) -> bool:
+    """Return True if the query calls ``today()``, ``yesterday()`` or reads CURRENT_DATE."""
+    tokens = tokenize(query)
+    for index, (kind, text, _) in enumerate(tokens):
+        if kind != "word":
+            continue
+        name = text.lower()
+        following = tokens[index + 1][1] if index + 1 < len(tokens) else ""
+        if (following == "(" and name in _DATE_FUNCTIONS) or name in _DATE_KEYWORDS:
+            return True
+    return False
@@ -0,0 +1,151 @@
+"""Optional OpenTelemetry tracing for tool calls.
+
+Each tool call is a span, with child spans for the stages recorded by
+``mcp_clickhouse.metrics`` (queue wait, connect, execute, serialize). The ``execute``
+span carries the ClickHouse query_id and the server's X-ClickHouse-Summary counters.
+
+Spans are sent to the globally configured OpenTelemetry tracer provider, so an
+application embedding the server can install its own. ``configure_tracing`` sets one
+up from CLICKHOUSE_MCP_TRACING_EXPORTER. Without the ``opentelemetry-api`` package
+(``mcp-clickhouse[tracing]``) every function here is a no-op.
+"""
+
+import contextvars
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger("mcp-clickhouse")
+
+TRACER_NAME = "mcp-clickhouse"
+
+# ClickHouse summary counters attached to spans, as clickhouse.<name>
+SUMMARY_ATTRIBUTES = (
+    "read_rows",
+    "read_bytes",
+    "written_rows",
+    "written_bytes",
+    "total_rows_to_read",
+    "result_rows",
+    "result_bytes",
+    "elapsed_ns",
+)
+
+_tracer: Any = None
+
+# The innermost span opened by ``span``; threads running tool work get it through the
+# context copied by ``_run_blocking``, like OpenTelemetry's own current span
+_current_span: contextvars.ContextVar[Any] = contextvars.ContextVar(
+    "mcp_clickhouse_span", default=None
+)
+
+
+def _get_tracer():
+    global _tracer
+    if _tracer is None:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            _tracer = False
+        else:
+            _tracer = trace.get_tracer(TRACER_NAME)
+    return _tracer
+
+
+def configure_tracing(exporter: str) -> bool:
+    """Install a tracer provider exporting spans with ``exporter``.
+
+    Args:
+        exporter: "none" leaves the global tracer provider alone; "console" prints
+            spans to stderr (stdout may carry the MCP protocol)
+
+    Returns:
+        Whether a tracer provider was installed.
+
+    Raises:
+        ValueError: If the exporter is unknown.
+    """
+    exporter = exporter.lower()
+    if exporter == "none":
+        return False
+    if exporter != "console":
+        raise ValueError(f"Unknown tracing exporter '{exporter}'; use none or console")
+    try:
+        from opentelemetry import trace
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+    except ImportError:
+        logger.warning(
+            "CLICKHOUSE_MCP_TRACING_EXPORTER=console needs opentelemetry-sdk; "
+            "install mcp-clickhouse[tracing]"
+        )
+        return False
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter(out=sys.stderr)))
+    trace.set_tracer_provider(provider)
+    return True
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """Run the block in a new span that is current for nested spans.
+
+    Yields the span, or None when tracing is unavailable. Exceptions escaping the block
+    are recorded on the span.
+    """
+    tracer = _get_tracer()
+    if not tracer:
+        yield None
+        return
+    with tracer.start_as_current_span(name, attributes=_clean(attributes)) as current:
+        token = _current_span.set(current)
+        try:
+            yield current
+        finally:
+            _current_span.reset(token)
+
+
+def record_span(
+    name: str, started: float, ended: Optional[float] = None, **attributes: Any
+) -> None:
+    """Record a finished span from ``time.perf_counter()`` timestamps.
+
+    Used for stages that are only measured after the fact, like the queue wait.
+    """
+    tracer = _get_tracer()
+    if not tracer:
+        return
+    now = time.perf_counter()
+    now_ns = time.time_ns()
+    ended = now if ended is None else ended
+    started_ns = now_ns - int((now - started) * 1e9)
+    ended_ns = now_ns - int((now - ended) * 1e9)
+    recorded = tracer.start_span(name, attributes=_clean(attributes), start_time=started_ns)
+    recorded.end(end_time=ended_ns)
+
+
+def set_attributes(**attributes: Any) -> None:
+    """Set attributes on the innermost span opened by ``span``, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(_clean(attributes))
+
+
+def set_query_attributes(query_id: Optional[str], summary: Optional[Dict[str, Any]]) -> None:
+    """Attach a ClickHouse query_id and its summary counters to the current span."""
+    attributes: Dict[str, Any] = {"clickhouse.query_id": query_id}
+    for name in SUMMARY_ATTRIBUTES:
+        value = (summary or {}).get(name)
+        if value is not None:
+            try:
+                attributes[f"clickhouse.{name}"] = int(value)
+            except (TypeError, ValueError):
+                pass
+    set_attributes(**attributes)
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    # OpenTelemetry attributes cannot be None
+    return {name: value for name, value in attributes.items() if value is not None}
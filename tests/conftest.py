@@ -0,0 +1,164 @@
+import re
+import threading
+
+import pytest
+
+from mcp_clickhouse import mcp_server
+from mcp_clickhouse.client_pool import ClickHouseClientPool
+from mcp_clickhouse.mcp_env import reload_config
+
+
+class FakeClock:
+    """Monotonic time source that only moves when a test sets ``now``."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResult:
+    def __init__(self, column_names, result_rows, summary=None):
+        self.column_names = column_names
+        self.result_rows = result_rows
+        self.summary = summary or {}
+
+
+class FakeStream:
+    """Mimics the StreamContext returned by query_row_block_stream."""
+
+    def __init__(self, column_names, blocks):
+        self.source = FakeResult(column_names, None)
+        self.blocks = blocks
+        self.blocks_read = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Like StreamContext, iteration resumes where the previous loop stopped
+        if self.blocks_read >= len(self.blocks):
+            raise StopIteration
+        self.blocks_read += 1
+        return self.blocks[self.blocks_read - 1]
+
+
+class FakeQueryClient:
+    """Records queries and can block them until a KILL QUERY arrives."""
+
+    server_version = "24.3.1"
+
+    def __init__(self, block: bool = False, rows=None, block_size: int = 100, summary=None):
+        self.block = block
+        self.rows = [(1,)] if rows is None else rows
+        self.block_size = block_size
+        self.server_settings = {}
+        self.queries = []
+        self.settings = []
+        self.commands = []
+        self.streams = []
+        self.summary = summary or {}
+        self.estimate = []
+        self.killed = threading.Event()
+
+    def query_row_block_stream(self, query, settings=None, **kwargs):
+        settings = settings or {}
+        self.queries.append(query)
+        self.settings.append(settings)
+        if self.block and not self.killed.wait(5):
+            raise AssertionError("query was never killed")
+        rows = self.rows
+        limit = re.search(r"\nLIMIT (?:(\d+), )?(\d+)$", query)
+        if limit:
+            start = int(limit.group(1) or 0)
+            rows = rows[start : start + int(limit.group(2))]
+        # Like ClickHouse, the offset setting applies after the query's own LIMIT
+        rows = rows[settings.get("offset", 0) :]
+        blocks = [rows[i : i + self.block_size] for i in range(0, len(rows), self.block_size)]
+        stream = FakeStream(["value"], blocks)
+        stream.source.summary = self.summary
+        self.streams.append(stream)
+        return stream
+
+    def query_column_block_stream(self, query, settings=None, **kwargs):
+        stream = self.query_row_block_stream(query, settings=settings)
+        stream.blocks = [list(zip(*block)) for block in stream.blocks]
+        return stream
+
+    def query_arrow_stream(self, query, settings=None, **kwargs):
+        import pyarrow as pa
+
+        stream = self.query_row_block_stream(query, settings=settings)
+        stream.blocks = [
+            pa.RecordBatch.from_pydict({"value": [row[0] for row in block]})
+            for block in stream.blocks
+        ]
+        return stream
+
+    def query(self, query, settings=None, **kwargs):
+        self.queries.append(query)
+        return FakeResult(["database", "table", "parts", "rows", "marks"], self.estimate)
+
+    def command(self, cmd, **kwargs):
+        self.commands.append(cmd)
+        if cmd.startswith("KILL QUERY"):
+            self.killed.set()
+        return ""
+
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def mcp_settings(monkeypatch):
+    """Set environment variables and reload the configuration; undone after the test."""
+
+    def apply(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        reload_config()
+
+    yield apply
+    monkeypatch.undo()
+    reload_config()
+
+
+@pytest.fixture
+def fake_client(monkeypatch):
+    """Serve a connection's pooled clients from a fake client.
+
+    ``fake_client(**kwargs)`` installs a new FakeQueryClient built from ``kwargs``;
+    ``fake_client(client)`` installs any other fake. Returns the client.
+    """
+
+    def install(client=None, connection=None, max_size=2, **client_args):
+        if client is None:
+            client = FakeQueryClient(**client_args)
+        pool = ClickHouseClientPool(
+            lambda: client,
+            max_size=max_size,
+            session_settings_factory=mcp_server.get_session_settings,
+        )
+        if connection is None:
+            monkeypatch.setattr(mcp_server, "_CLIENT_POOL", pool)
+        else:
+            monkeypatch.setitem(mcp_server._CONNECTION_POOLS, connection, pool)
+        return client
+
+    return install
@@ -0,0 +1,90 @@
+from mcp_clickhouse.cache import MetadataCache, TTLCache
+
+
+def test_ttl_cache_expires_entries(clock):
+    """Test that entries are dropped once their TTL has passed."""
+    cache = TTLCache(max_entries=4, ttl=10, clock=clock)
+    cache.set("a", 1)
+
+    clock.now = 9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    """Test that the least recently used entry is evicted when the cache is full."""
+    cache = TTLCache(max_entries=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_metadata_cache_revalidates_at_most_once_per_interval(clock):
+    """Test that fingerprint checks are rate limited per database."""
+    cache = MetadataCache(ttl=60, max_entries=8, revalidate_interval=5, clock=clock)
+    fingerprints = []
+    loads = []
+
+    def fingerprint():
+        fingerprints.append(clock.now)
+        return "v1"
+
+    def load():
+        loads.append(clock.now)
+        return ["table"]
+
+    for now in (0, 1, 2, 6):
+        clock.now = now
+        assert cache.get_or_load(("db", "tables"), load, "db", fingerprint) == ["table"]
+
+    assert loads == [0]
+    assert fingerprints == [0, 6]
+
+
+def test_metadata_cache_invalidates_database_on_fingerprint_change(clock):
+    """Test that a changed fingerprint drops every entry of that database only."""
+    cache = MetadataCache(ttl=60, max_entries=8, revalidate_interval=0, clock=clock)
+    version = {"db": "v1", "other": "v1"}
+
+    cache.get_or_load(("db", "a"), lambda: "db-a", "db", lambda: version["db"])
+    cache.get_or_load(("db", "b"), lambda: "db-b", "db", lambda: version["db"])
+    cache.get_or_load(("other", "a"), lambda: "other-a", "other", lambda: version["other"])
+
+    version["db"] = "v2"
+    assert cache.get_or_load(("db", "a"), lambda: "db-a2", "db", lambda: version["db"]) == "db-a2"
+    assert cache.get_or_load(("other", "a"), lambda: "stale", "other", lambda: "v1") == "other-a"
+    assert cache.stats()["entries"] == 2
+
+
+def test_ttl_cache_evicts_to_byte_budget():
+    """Test that least recently used entries are evicted to stay within max_bytes."""
+    cache = TTLCache(max_entries=10, ttl=60, max_bytes=100)
+    cache.set("a", "a", size=40)
+    cache.set("b", "b", size=40)
+    cache.get("a")
+    cache.set("c", "c", size=40)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.stats()["bytes"] == 80
+    assert cache.set("huge", "x", size=101) is False
+    assert cache.get("huge") is None
+
+
+def test_ttl_cache_per_entry_ttl(clock):
+    """Test that an entry's own TTL overrides the cache default."""
+    cache = TTLCache(max_entries=4, ttl=60, clock=clock)
+    cache.set("short", 1, ttl=5)
+    cache.set("long", 2)
+
+    clock.now = 5
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
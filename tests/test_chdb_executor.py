@@ -0,0 +1,153 @@
+import threading
+
+import pytest
+
+from mcp_clickhouse.chdb_executor import (
+    ChDBProcessPool,
+    ChDBQueryError,
+    ChDBQueueFullError,
+    ChDBSessionPool,
+    ChDBTimeoutError,
+)
+
+
+class FakeResult:
+    def __init__(self, output: bytes = b"", error: str = ""):
+        self.output = output
+        self.error = error
+
+    def has_error(self):
+        return bool(self.error)
+
+    def error_message(self):
+        return self.error
+
+    def size(self):
+        return len(self.output)
+
+    def get_memview(self):
+        return self
+
+    def view(self):
+        return memoryview(self.output)
+
+
+class FakeSession:
+    """Mimics chs.Session; queries block until ``release`` is set."""
+
+    def __init__(self, release: threading.Event):
+        self.release = release
+        self.queries = []
+        self.closed = False
+
+    def query(self, sql, fmt):
+        self.queries.append(sql)
+        self.release.wait(5)
+        if sql == "BAD":
+            return FakeResult(error="Syntax error")
+        return FakeResult(sql.encode())
+
+    def close(self):
+        self.closed = True
+
+
+def test_session_pool_runs_queries_on_separate_sessions():
+    """Test that concurrent queries each get their own session, up to the pool size."""
+    release = threading.Event()
+    sessions = []
+
+    def factory():
+        sessions.append(FakeSession(release))
+        return sessions[-1]
+
+    pool = ChDBSessionPool(factory, size=2, max_queued=4)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(pool.query("SELECT 1", "JSON", bytes)))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    while pool.stats()["queued"] < 1:
+        pass
+
+    assert pool.stats()["in_use"] == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b"SELECT 1"] * 3
+    assert len(sessions) == 2
+    assert pool.stats()["in_use"] == 0
+
+
+def test_session_pool_rejects_when_queue_is_full():
+    """Test that calls fail fast once every session is busy and the queue is full."""
+    release = threading.Event()
+    pool = ChDBSessionPool(lambda: FakeSession(release), size=1, max_queued=0)
+    running = threading.Thread(target=pool.query, args=("SELECT 1", "JSON", bytes))
+    running.start()
+    while pool.stats()["in_use"] < 1:
+        pass
+
+    with pytest.raises(ChDBQueueFullError):
+        pool.query("SELECT 2", "JSON", bytes)
+
+    release.set()
+    running.join()
+    assert pool.stats()["rejected_total"] == 1
+
+
+def test_session_pool_times_out_waiting_for_a_session():
+    """Test that a caller waits for a busy session no longer than its timeout."""
+    release = threading.Event()
+    pool = ChDBSessionPool(lambda: FakeSession(release), size=1, max_queued=4)
+    running = threading.Thread(target=pool.query, args=("SELECT 1", "JSON", bytes))
+    running.start()
+    while pool.stats()["in_use"] < 1:
+        pass
+
+    with pytest.raises(ChDBTimeoutError, match="waiting for a free session"):
+        pool.query("SELECT 2", "JSON", bytes, timeout=0.05)
+    assert pool.stats()["queued"] == 0
+
+    release.set()
+    running.join()
+    assert pool.query("SELECT 3", "JSON", bytes, timeout=1) == b"SELECT 3"
+    assert pool.stats()["sessions"] == 1
+
+
+def test_session_pool_raises_query_errors_and_reuses_session():
+    """Test that chDB errors are raised and the session goes back to the pool."""
+    release = threading.Event()
+    release.set()
+    session = FakeSession(release)
+    pool = ChDBSessionPool(lambda: pytest.fail("unexpected session"), size=1, sessions=[session])
+
+    with pytest.raises(ChDBQueryError, match="Syntax error"):
+        pool.query("BAD", "JSON", bytes)
+    assert pool.query("SELECT 1", "JSON", bytes) == b"SELECT 1"
+    assert session.queries == ["BAD", "SELECT 1"]
+
+    pool.close()
+    assert session.closed
+
+
+def test_process_pool_kills_worker_on_timeout():
+    """Test that a timed-out query's worker process is killed and replaced."""
+    pytest.importorskip("chdb")
+    pool = ChDBProcessPool(":memory:", size=1, max_queued=0)
+    try:
+        assert pool.query("SELECT 42 AS answer", "CSV", bytes, timeout=60) == b"42\n"
+        (worker,) = pool._idle
+
+        with pytest.raises(ChDBTimeoutError):
+            pool.query("SELECT count() FROM numbers(1000000000000)", "CSV", bytes, timeout=1)
+
+        assert not worker.process.is_alive()
+        assert pool.query("SELECT 1", "CSV", bytes, timeout=60) == b"1\n"
+        with pytest.raises(ChDBQueryError):
+            pool.query("SELECT * FROM missing_table", "CSV", bytes, timeout=60)
+        assert pool.stats()["sessions"] == 1
+    finally:
+        pool.close()
@@ -1,5 +1,8 @@
+import base64
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 
+import pyarrow as pa
 from dotenv import load_dotenv
 
 from mcp_clickhouse import create_chdb_client, run_chdb_select_query
@@ -45,6 +48,36 @@ class TestChDBTools(unittest.TestCase):
         self.assertIsInstance(result, list)
         self.assertEqual(len(result), 0)
 
+    def test_run_chdb_select_query_columns_format(self):
+        """Test that the columns format returns one list per column in chDB."""
+        query = "SELECT number, toString(number) AS s FROM numbers(3)"
+        result = run_chdb_select_query(query, format="columns")
+        self.assertEqual(result["columns"], ["number", "s"])
+        self.assertEqual(result["data"], {"number": [0, 1, 2], "s": ["0", "1", "2"]})
+        self.assertEqual(result["row_count"], 3)
+
+    def test_run_chdb_select_query_arrow_format(self):
+        """Test that the arrow format returns a base64 Arrow IPC stream in chDB."""
+        query = "SELECT number FROM numbers(5)"
+        result = run_chdb_select_query(query, format="arrow")
+        table = pa.ipc.open_stream(base64.b64decode(result["arrow"])).read_all()
+        self.assertEqual(table.column("number").to_pylist(), [0, 1, 2, 3, 4])
+        self.assertEqual(result["columns"], ["number"])
+        self.assertEqual(result["row_count"], 5)
+
+    def test_run_chdb_select_query_unknown_format(self):
+        """Test that an unknown format is reported as an error in chDB."""
+        result = run_chdb_select_query("SELECT 1", format="xml")
+        self.assertEqual(result["status"], "error")
+        self.assertIn("Unsupported result format", result["message"])
+
+    def test_run_chdb_select_query_in_parallel(self):
+        """Test that concurrent chDB queries run on pooled sessions and all succeed."""
+        queries = [f"SELECT {i} AS value" for i in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(run_chdb_select_query, queries))
+        self.assertEqual([result[0]["value"] for result in results], list(range(8)))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,189 @@
+import threading
+
+import pytest
+from clickhouse_connect.driver.exceptions import OperationalError
+
+from mcp_clickhouse.client_pool import ClickHouseClientPool, PoolTimeoutError
+
+
+class FakeClient:
+    """Minimal stand-in for a clickhouse_connect client."""
+
+    def __init__(self, alive: bool = True):
+        self.alive = alive
+        self.closed = False
+
+    def ping(self) -> bool:
+        return self.alive
+
+    def close(self):
+        self.closed = True
+
+
+class FakeClientFactory:
+    def __init__(self):
+        self.created = []
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        client = FakeClient()
+        with self.lock:
+            self.created.append(client)
+        return client
+
+
+def test_clients_are_reused():
+    """Test that a released client is handed out again instead of reconnecting."""
+    factory = FakeClientFactory()
+    pool = ClickHouseClientPool(factory, max_size=2)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+
+    assert first.client is second.client
+    assert len(factory.created) == 1
+    assert pool.stats()["idle"] == 1
+    pool.close()
+
+
+def test_pool_size_is_bounded():
+    """Test that checkouts beyond max_size time out."""
+    pool = ClickHouseClientPool(FakeClientFactory(), max_size=1, acquire_timeout=0.05)
+
+    with pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    pool.close()
+
+
+def test_connection_error_discards_client():
+    """Test that a client raising a connection error is closed and not reused."""
+    factory = FakeClientFactory()
+    pool = ClickHouseClientPool(factory, max_size=1)
+
+    with pytest.raises(OperationalError):
+        with pool.connection():
+            raise OperationalError("connection reset")
+
+    assert factory.created[0].closed
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["discarded_total"] == 1
+    pool.close()
+
+
+def test_query_error_keeps_client():
+    """Test that ordinary query errors return the client to the pool."""
+    factory = FakeClientFactory()
+    pool = ClickHouseClientPool(factory, max_size=1)
+
+    with pytest.raises(ValueError):
+        with pool.connection():
+            raise ValueError("bad query")
+
+    assert not factory.created[0].closed
+    assert pool.stats()["idle"] == 1
+    pool.close()
+
+
+def test_run_reconnects_on_failure():
+    """Test that run() retries once on a fresh client if the request was never sent."""
+    factory = FakeClientFactory()
+    pool = ClickHouseClientPool(factory, max_size=1)
+    calls = []
+
+    def work(pooled):
+        calls.append(pooled.client)
+        if len(calls) == 1:
+            raise OperationalError("server went away") from ConnectionRefusedError()
+        return "ok"
+
+    assert pool.run(work) == "ok"
+    assert len(factory.created) == 2
+    assert calls[0] is not calls[1]
+    pool.close()
+
+
+def test_run_retries_failed_connect():
+    """Test that run() retries when creating the client fails."""
+    factory = FakeClientFactory()
+    attempts = []
+
+    def connect():
+        attempts.append(True)
+        if len(attempts) == 1:
+            raise OperationalError("connection refused")
+        return factory()
+
+    pool = ClickHouseClientPool(connect, max_size=1)
+
+    assert pool.run(lambda pooled: "ok") == "ok"
+    assert len(attempts) == 2
+    pool.close()
+
+
+def test_run_does_not_repeat_sent_request():
+    """Test that run() does not retry once the request may have reached the server."""
+    pool = ClickHouseClientPool(FakeClientFactory(), max_size=1)
+    calls = []
+
+    def work(pooled):
+        calls.append(pooled.client)
+        raise OperationalError("Read timed out")
+
+    with pytest.raises(OperationalError):
+        pool.run(work)
+    assert len(calls) == 1
+    assert pool.stats()["discarded_total"] == 1
+    pool.close()
+
+
+def test_maintain_evicts_idle_and_dead_clients():
+    """Test that maintenance closes expired idle clients and ones failing the ping."""
+    factory = FakeClientFactory()
+    pool = ClickHouseClientPool(factory, max_size=2, idle_timeout=0, health_check_interval=0)
+
+    with pool.connection():
+        pass
+    pool.maintain()
+
+    assert factory.created[0].closed
+    assert pool.stats()["idle"] == 0
+    assert pool.stats()["evicted_total"] == 1
+
+    pool.idle_timeout = 300
+    with pool.connection() as pooled:
+        pooled.client.alive = False
+    pool.maintain()
+
+    assert factory.created[1].closed
+    assert pool.stats()["idle"] == 0
+    pool.close()
+
+
+def test_session_settings_computed_once_per_connection():
+    """Test that session settings are computed on connect and refreshed after a reconnect."""
+    factory = FakeClientFactory()
+    computed = []
+
+    def session_settings(client):
+        computed.append(client)
+        return {"readonly": str(len(computed))}
+
+    pool = ClickHouseClientPool(factory, max_size=1, session_settings_factory=session_settings)
+
+    for _ in range(3):
+        with pool.connection() as pooled:
+            assert pooled.session_settings == {"readonly": "1"}
+    assert computed == [factory.created[0]]
+    assert pool.session_settings() == [{"readonly": "1"}]
+
+    with pytest.raises(OperationalError):
+        with pool.connection():
+            raise OperationalError("server went away")
+    with pool.connection() as pooled:
+        assert pooled.session_settings == {"readonly": "2"}
+    assert pool.session_settings() == [{"readonly": "2"}]
+    pool.close()
@@ -0,0 +1,176 @@
+import asyncio
+from collections import Counter
+
+import pytest
+
+from mcp_clickhouse.concurrency import FairScheduler, SchedulerFull, SingleFlight, current_tenant
+
+
+def test_current_tenant_outside_request():
+    """Test that calls outside of an MCP request share the default tenant."""
+    assert current_tenant() == "default"
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_each_tenant_independently():
+    """Test that one tenant's calls queue on its own slots without blocking others."""
+    scheduler = FairScheduler(capacity=4, max_per_tenant=2)
+    release = asyncio.Event()
+    peak = {"a": 0, "b": 0}
+
+    async def call(tenant):
+        async with scheduler.slot(tenant):
+            peak[tenant] = max(peak[tenant], scheduler.tenant_stats()[tenant][0])
+            await release.wait()
+
+    tasks = [asyncio.create_task(call("a")) for _ in range(5)]
+    tasks.append(asyncio.create_task(call("b")))
+    await asyncio.sleep(0.01)
+
+    assert scheduler.tenant_stats() == {"a": (2, 3), "b": (1, 0)}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == {"a": 2, "b": 1}
+    assert scheduler.tenant_stats() == {}
+    assert scheduler.stats()["admitted_total"] == 6
+
+
+@pytest.mark.asyncio
+async def test_scheduler_admits_in_weighted_fair_order():
+    """Test that waiting tenants are admitted in proportion to their weights, interleaved."""
+    scheduler = FairScheduler(capacity=1, max_per_tenant=1, weights={"a": 2})
+    order = []
+
+    async def call(tenant):
+        async with scheduler.slot(tenant):
+            order.append(tenant)
+            await asyncio.sleep(0)
+
+    async with scheduler.slot("gate"):
+        tasks = [asyncio.create_task(call("a")) for _ in range(6)]
+        tasks += [asyncio.create_task(call("b")) for _ in range(6)]
+        await asyncio.sleep(0.01)
+    await asyncio.gather(*tasks)
+
+    assert order[:6] == ["a", "b", "a", "a", "b", "a"]
+    assert Counter(order[:9]) == {"a": 6, "b": 3}
+
+
+@pytest.mark.asyncio
+async def test_scheduler_rejects_calls_when_queue_is_full():
+    """Test that calls beyond the per-tenant and total queue limits are rejected."""
+    scheduler = FairScheduler(capacity=1, max_per_tenant=1, max_queued=3, max_queued_per_tenant=2)
+
+    async def call(tenant):
+        async with scheduler.slot(tenant):
+            pass
+
+    async with scheduler.slot("a"):
+        tasks = [asyncio.create_task(call("a")) for _ in range(2)]
+        tasks.append(asyncio.create_task(call("b")))
+        await asyncio.sleep(0.01)
+        with pytest.raises(SchedulerFull):
+            await call("a")
+        with pytest.raises(SchedulerFull):
+            await call("b")
+        assert scheduler.stats()["queued"] == 3
+    await asyncio.gather(*tasks)
+
+    assert scheduler.stats() == {
+        "capacity": 1,
+        "running": 0,
+        "queued": 0,
+        "tenants": 0,
+        "admitted_total": 4,
+        "rejected_total": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_scheduler_limits_calls_per_resource():
+    """Test that calls for a saturated resource wait while other calls are admitted."""
+    scheduler = FairScheduler(capacity=4, max_per_tenant=4)
+    release = asyncio.Event()
+
+    async def call(tenant, resource=None):
+        async with scheduler.slot(tenant, resource, 1 if resource else 0):
+            await release.wait()
+
+    tasks = [asyncio.create_task(call("a", "conn")) for _ in range(2)]
+    tasks.append(asyncio.create_task(call("a")))
+    tasks.append(asyncio.create_task(call("b", "conn")))
+    await asyncio.sleep(0.01)
+
+    # a's second call for "conn" is at the head of its queue and blocks a's other call
+    assert scheduler.tenant_stats() == {"a": (1, 2), "b": (0, 1)}
+
+    release.set()
+    await asyncio.gather(*tasks)
+    assert scheduler.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_cancelled_waiter_leaves_queue():
+    """Test that a call cancelled while waiting gives up its place without taking a slot."""
+    scheduler = FairScheduler(capacity=1, max_per_tenant=1)
+
+    async def call():
+        async with scheduler.slot("b"):
+            pass
+
+    async with scheduler.slot("a"):
+        waiter = asyncio.create_task(call())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert scheduler.stats()["queued"] == 0
+
+    assert scheduler.stats()["running"] == 0
+    assert scheduler.tenant_stats() == {}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_shares_concurrent_calls():
+    """Test that concurrent calls with the same key share one execution."""
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def work(key):
+        calls.append(key)
+        await release.wait()
+        return key
+
+    tasks = [asyncio.create_task(flights.do("a", lambda: work("a"))) for _ in range(3)]
+    tasks.append(asyncio.create_task(flights.do("b", lambda: work("b"))))
+    await asyncio.sleep(0.01)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["a", "a", "a", "b"]
+    assert calls == ["a", "b"]
+    assert flights.stats() == {"in_flight": 0, "shared": 2}
+
+
+@pytest.mark.asyncio
+async def test_single_flight_abandons_only_after_last_waiter():
+    """Test that the execution is cancelled once every waiter has timed out."""
+    flights = SingleFlight()
+    abandoned = []
+
+    async def work():
+        await asyncio.sleep(10)
+
+    leader = asyncio.create_task(
+        flights.do("a", work, timeout=0.05, on_abandon=lambda: abandoned.append(True))
+    )
+    follower = asyncio.create_task(flights.do("a", work, timeout=0.2))
+
+    with pytest.raises(asyncio.TimeoutError):
+        await leader
+    assert abandoned == []
+    with pytest.raises(asyncio.TimeoutError):
+        await follower
+    assert abandoned == [True]
+    assert flights.stats()["in_flight"] == 0
@@ -1,6 +1,9 @@
+import threading
+
 import pytest
 
-from mcp_clickhouse.mcp_env import ClickHouseConfig
+from mcp_clickhouse import main, mcp_env
+from mcp_clickhouse.mcp_env import ClickHouseConfig, MCPServerConfig, get_mcp_config, reload_config
 
 
 def test_interface_http_when_secure_false(monkeypatch: pytest.MonkeyPatch):
@@ -81,3 +84,165 @@ def test_interface_https_with_custom_port(monkeypatch: pytest.MonkeyPatch):
     assert client_config["interface"] == "https"
     assert client_config["secure"] is True
     assert client_config["port"] == 9443
+
+
+def test_pool_config_defaults(monkeypatch: pytest.MonkeyPatch):
+    """Test that the client pool config falls back to defaults and the connect timeout."""
+    monkeypatch.setenv("CLICKHOUSE_HOST", "localhost")
+    monkeypatch.setenv("CLICKHOUSE_USER", "test")
+    monkeypatch.setenv("CLICKHOUSE_PASSWORD", "test")
+    monkeypatch.setenv("CLICKHOUSE_CONNECT_TIMEOUT", "5")
+    monkeypatch.delenv("CLICKHOUSE_POOL_SIZE", raising=False)
+    monkeypatch.delenv("CLICKHOUSE_POOL_IDLE_TIMEOUT", raising=False)
+    monkeypatch.delenv("CLICKHOUSE_POOL_HEALTH_CHECK_INTERVAL", raising=False)
+
+    pool_config = ClickHouseConfig().get_pool_config()
+
+    assert pool_config == {
+        "max_size": 10,
+        "idle_timeout": 300,
+        "health_check_interval": 30,
+        "acquire_timeout": 5,
+    }
+
+
+def test_pool_config_overrides(monkeypatch: pytest.MonkeyPatch):
+    """Test that the client pool config honours its environment variables."""
+    monkeypatch.setenv("CLICKHOUSE_HOST", "localhost")
+    monkeypatch.setenv("CLICKHOUSE_USER", "test")
+    monkeypatch.setenv("CLICKHOUSE_PASSWORD", "test")
+    monkeypatch.setenv("CLICKHOUSE_POOL_SIZE", "4")
+    monkeypatch.setenv("CLICKHOUSE_POOL_IDLE_TIMEOUT", "60")
+    monkeypatch.setenv("CLICKHOUSE_POOL_HEALTH_CHECK_INTERVAL", "10")
+
+    pool_config = ClickHouseConfig().get_pool_config()
+
+    assert pool_config["max_size"] == 4
+    assert pool_config["idle_timeout"] == 60
+    assert pool_config["health_check_interval"] == 10
+
+
+def test_config_is_a_read_only_snapshot(monkeypatch: pytest.MonkeyPatch):
+    """Test that config values are read once and cannot be changed in place."""
+    monkeypatch.setenv("CLICKHOUSE_MCP_QUERY_TIMEOUT", "5")
+    config = MCPServerConfig()
+    monkeypatch.setenv("CLICKHOUSE_MCP_QUERY_TIMEOUT", "9")
+
+    assert config.query_timeout == 5
+    with pytest.raises(AttributeError, match="read-only"):
+        config.query_timeout = 9
+
+
+def test_invalid_config_fails_at_construction(monkeypatch: pytest.MonkeyPatch):
+    """Test that invalid values are reported when the snapshot is built, not on first use."""
+    monkeypatch.setenv("CLICKHOUSE_MCP_SERVER_TRANSPORT", "carrier-pigeon")
+
+    with pytest.raises(ValueError, match="Invalid transport"):
+        MCPServerConfig()
+
+
+def test_reload_config_swaps_snapshots(monkeypatch: pytest.MonkeyPatch):
+    """Test that reload applies changed settings and keeps the old config when invalid."""
+    monkeypatch.setattr(mcp_env, "_CONFIG_INSTANCE", None)
+    monkeypatch.setattr(mcp_env, "_CHDB_CONFIG_INSTANCE", None)
+    monkeypatch.setattr(mcp_env, "_MCP_CONFIG_INSTANCE", None)
+    monkeypatch.setenv("CLICKHOUSE_MCP_QUERY_TIMEOUT", "5")
+    before = get_mcp_config()
+
+    monkeypatch.setenv("CLICKHOUSE_MCP_QUERY_TIMEOUT", "9")
+    assert reload_config() == ["mcp.query_timeout"]
+    reloaded = get_mcp_config()
+    assert before.query_timeout == 5
+    assert reloaded.query_timeout == 9
+
+    monkeypatch.setenv("CLICKHOUSE_MCP_COST_PREFLIGHT", "sometimes")
+    with pytest.raises(ValueError):
+        reload_config()
+    assert get_mcp_config() is reloaded
+
+
+def test_sighup_reloads_outside_signal_handler(monkeypatch: pytest.MonkeyPatch):
+    """Test that the SIGHUP handler only flags the reload and a thread performs it."""
+    reloaded = threading.Event()
+    threads = []
+
+    def reload_server_config():
+        threads.append(threading.current_thread())
+        reloaded.set()
+
+    monkeypatch.setattr(main, "reload_server_config", reload_server_config)
+    requested = threading.Event()
+    monkeypatch.setattr(main, "_reload_requested", requested)
+
+    main._reload_on_signal(1, None)
+    assert threads == []
+
+    threading.Thread(target=main._reload_loop, args=(requested,), daemon=True).start()
+    assert reloaded.wait(5)
+    assert threads[0] is not threading.main_thread()
+
+
+def test_replicas_from_clickhouse_hosts(monkeypatch: pytest.MonkeyPatch):
+    """Test that CLICKHOUSE_HOSTS is parsed into replicas and replaces CLICKHOUSE_HOST."""
+    monkeypatch.delenv("CLICKHOUSE_HOST", raising=False)
+    monkeypatch.setenv("CLICKHOUSE_HOSTS", "ch-1:9440=2, ch-2")
+    monkeypatch.setenv("CLICKHOUSE_USER", "test")
+    monkeypatch.setenv("CLICKHOUSE_PASSWORD", "test")
+    monkeypatch.setenv("CLICKHOUSE_SECURE", "false")
+
+    config = ClickHouseConfig()
+
+    assert config.replicas == [("ch-1", 9440, 2), ("ch-2", 8123, 1)]
+    assert config.host == "ch-1"
+    assert config.get_client_config("ch-2", 8123)["host"] == "ch-2"
+
+    monkeypatch.setenv("CLICKHOUSE_HOSTS", "ch-1=0")
+    with pytest.raises(ValueError, match="CLICKHOUSE_HOSTS"):
+        ClickHouseConfig()
+
+
+def test_named_connection_config(monkeypatch: pytest.MonkeyPatch):
+    """Test that a named connection reads its own variables and inherits only tuning ones."""
+    monkeypatch.setenv("CLICKHOUSE_OPS_HOST", "ops.example.com")
+    monkeypatch.setenv("CLICKHOUSE_OPS_USER", "ops")
+    monkeypatch.setenv("CLICKHOUSE_OPS_PASSWORD", "secret")
+    monkeypatch.setenv("CLICKHOUSE_DATABASE", "analytics")
+    monkeypatch.setenv("CLICKHOUSE_CONNECT_TIMEOUT", "5")
+    monkeypatch.setenv("CLICKHOUSE_OPS_POOL_SIZE", "3")
+
+    config = ClickHouseConfig("ops")
+
+    assert config.host == "ops.example.com"
+    assert config.username == "ops"
+    assert config.database is None
+    assert config.connect_timeout == 5
+    assert config.pool_size == 3
+
+    monkeypatch.delenv("CLICKHOUSE_OPS_PASSWORD")
+    with pytest.raises(ValueError, match="CLICKHOUSE_OPS_PASSWORD"):
+        ClickHouseConfig("ops")
+
+
+def test_resolve_connection(monkeypatch: pytest.MonkeyPatch):
+    """Test that connection names resolve case-insensitively and fall back to the first one."""
+    monkeypatch.setattr(mcp_env, "_MCP_CONFIG_INSTANCE", None)
+    monkeypatch.delenv("CLICKHOUSE_HOST", raising=False)
+    monkeypatch.delenv("CLICKHOUSE_HOSTS", raising=False)
+    monkeypatch.setenv("CLICKHOUSE_CONNECTIONS", "analytics, ops")
+
+    assert mcp_env.resolve_connection(None) == "analytics"
+    assert mcp_env.resolve_connection("default") == "analytics"
+    assert mcp_env.resolve_connection("OPS") == "ops"
+    with pytest.raises(ValueError, match="available connections: analytics, ops"):
+        mcp_env.resolve_connection("billing")
+
+
+def test_client_weights(monkeypatch: pytest.MonkeyPatch):
+    """Test that CLICKHOUSE_MCP_CLIENT_WEIGHTS is parsed and rejects non-positive weights."""
+    monkeypatch.setenv("CLICKHOUSE_MCP_CLIENT_WEIGHTS", "dashboard=3, batch=0.5")
+
+    assert MCPServerConfig().client_weights == {"dashboard": 3.0, "batch": 0.5}
+
+    monkeypatch.setenv("CLICKHOUSE_MCP_CLIENT_WEIGHTS", "batch=0")
+    with pytest.raises(ValueError, match="CLICKHOUSE_MCP_CLIENT_WEIGHTS"):
+        MCPServerConfig()
@@ -0,0 +1,144 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from mcp_clickhouse import mcp_server
+from mcp_clickhouse.health import HealthMonitor
+
+
+def test_status_is_none_before_first_check(clock):
+    """Test that no status is reported before the first check ran."""
+    monitor = HealthMonitor(lambda: "up", interval=10, clock=clock)
+    assert monitor.status() is None
+    assert monitor.wait_for_first_check(0) is False
+
+
+def test_refresh_caches_outcome(clock):
+    """Test that a check's message or error is cached until the next refresh."""
+    calls = []
+    outcome = {"error": None}
+
+    def check():
+        calls.append(True)
+        if outcome["error"]:
+            raise ConnectionError(outcome["error"])
+        return "up"
+
+    monitor = HealthMonitor(check, interval=10, clock=clock)
+    monitor.refresh()
+    assert monitor.status().healthy is True
+    assert monitor.status().message == "up"
+
+    outcome["error"] = "connection refused"
+    assert monitor.status().healthy is True
+    monitor.refresh()
+    assert monitor.status().healthy is False
+    assert monitor.status().message == "connection refused"
+    assert len(calls) == 2
+
+
+def test_stale_status_is_unhealthy(clock):
+    """Test that a status not refreshed for three intervals is reported as unhealthy."""
+    monitor = HealthMonitor(lambda: "up", interval=10, clock=clock)
+    monitor.refresh()
+
+    clock.now = 30
+    assert monitor.status().healthy is True
+    clock.now = 31
+    assert monitor.status().healthy is False
+    assert "stale" in monitor.status().message
+
+
+def test_background_thread_runs_checks():
+    """Test that start runs the first check in the background and stop ends the thread."""
+    monitor = HealthMonitor(lambda: "up", interval=60)
+    monitor.start()
+    assert monitor.wait_for_first_check(5)
+    assert monitor.is_alive()
+    monitor.stop()
+    monitor._thread.join(5)
+    assert not monitor.is_alive()
+
+
+@pytest.fixture
+def health_monitor(monkeypatch):
+    calls = []
+
+    def check():
+        calls.append(True)
+        return "Connected to ClickHouse 24.3.1"
+
+    monitor = HealthMonitor(check, interval=60)
+    monkeypatch.setenv("CLICKHOUSE_ENABLED", "true")
+    monkeypatch.setattr(mcp_server, "_HEALTH_MONITOR", monitor)
+    monitor.start()
+    monitor.wait_for_first_check(5)
+    yield calls
+    monitor.stop()
+
+
+def test_health_endpoints_read_cached_status(health_monitor):
+    """Test that repeated probes are answered from the cached status."""
+
+    async def probe():
+        return [
+            await mcp_server.health_check(None),
+            await mcp_server.readiness_check(None),
+            await mcp_server.health_check(None),
+        ]
+
+    responses = asyncio.run(probe())
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    assert responses[0].body == b"OK - Connected to ClickHouse 24.3.1"
+    assert len(health_monitor) == 1
+
+
+def test_readiness_fails_with_unhealthy_status(monkeypatch):
+    """Test that readiness returns 503 while ClickHouse checks fail, and liveness 200."""
+
+    def check():
+        raise ConnectionError("connection refused")
+
+    monitor = HealthMonitor(check, interval=60)
+    monitor.refresh()
+    monkeypatch.setenv("CLICKHOUSE_ENABLED", "true")
+    monkeypatch.setattr(mcp_server, "_HEALTH_MONITOR", monitor)
+
+    ready = asyncio.run(mcp_server.readiness_check(None))
+    live = asyncio.run(mcp_server.liveness_check(None))
+    assert ready.status_code == 503
+    assert b"connection refused" in ready.body
+    assert live.status_code == 200
+
+
+def test_readiness_does_not_wait_for_first_check(monkeypatch):
+    """Test that probes answer 503 right away while the first check is still running."""
+    release = threading.Event()
+    monitor = HealthMonitor(lambda: release.wait(5) and "up", interval=60)
+    monkeypatch.setenv("CLICKHOUSE_ENABLED", "true")
+    monkeypatch.setattr(mcp_server, "_HEALTH_MONITOR", monitor)
+    monitor.start()
+
+    ready = asyncio.run(mcp_server.readiness_check(None))
+
+    assert ready.status_code == 503
+    assert b"has not completed yet" in ready.body
+    release.set()
+    monitor.stop()
+
+
+def test_check_does_not_wait_for_a_busy_pool(fake_client):
+    """Test that the check reports a busy but healthy server when every connection is in use."""
+    client = fake_client(max_size=1)
+    pool = mcp_server.get_client_pool()
+
+    assert mcp_server._check_clickhouse() == "Connected to ClickHouse 24.3.1"
+    with pool.connection():
+        started = time.monotonic()
+        message = mcp_server._check_clickhouse()
+
+    assert time.monotonic() - started < 1
+    assert "busy" in message
+    assert client.commands == ["SELECT 1"]
@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+
+def test_server_import_does_not_load_backends():
+    """Test that importing the server leaves chDB and clickhouse_connect unloaded."""
+    code = (
+        "import sys, mcp_clickhouse.mcp_server; "
+        "print(sorted(m for m in ('chdb', 'clickhouse_connect') if m in sys.modules))"
+    )
+    env = dict(os.environ, CHDB_ENABLED="true", CLICKHOUSE_ENABLED="true")
+    proc = subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True
+    )
+    assert proc.stdout.strip() == "[]"
@@ -0,0 +1,156 @@
+import pytest
+
+from mcp_clickhouse import mcp_server
+from mcp_clickhouse.cache import MetadataCache
+
+TABLE_COLUMNS = [
+    "database",
+    "name",
+    "engine",
+    "create_table_query",
+    "dependencies_database",
+    "dependencies_table",
+    "engine_full",
+    "sorting_key",
+    "primary_key",
+    "total_rows",
+    "total_bytes",
+    "total_bytes_uncompressed",
+    "parts",
+    "active_parts",
+    "total_marks",
+    "comment",
+]
+COLUMN_COLUMNS = [
+    "database",
+    "table",
+    "name",
+    "column_type",
+    "default_kind",
+    "default_expression",
+    "comment",
+]
+
+
+class FakeResult:
+    def __init__(self, column_names, result_rows):
+        self.column_names = column_names
+        self.result_rows = result_rows
+
+
+class FakeSchemaClient:
+    """Answers system.tables / system.columns queries from an in-memory schema."""
+
+    server_settings = {}
+
+    def __init__(self, database, tables):
+        self.database = database
+        self.tables = tables
+        self.version = "2024-01-01 00:00:00"
+        self.queries = []
+
+    def query(self, query, **kwargs):
+        self.queries.append(query)
+        if "max(metadata_modification_time)" in query:
+            return FakeResult(["count()", "max"], [[len(self.tables), self.version]])
+        if "FROM system.tables" in query:
+            rows = [
+                [
+                    self.database,
+                    name,
+                    "MergeTree",
+                    "",
+                    [],
+                    [],
+                    "MergeTree",
+                    "id",
+                    "id",
+                    0,
+                    0,
+                    0,
+                    1,
+                    1,
+                    1,
+                    f"{name} comment",
+                ]
+                for name in self.tables
+            ]
+            return FakeResult(TABLE_COLUMNS, rows)
+        if "FROM system.columns" in query:
+            rows = [
+                [self.database, name, column, "UInt32", "", "", ""]
+                for name, columns in self.tables.items()
+                for column in columns
+            ]
+            return FakeResult(COLUMN_COLUMNS, rows)
+        raise AssertionError(f"Unexpected query: {query}")
+
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def no_metadata_cache(monkeypatch):
+    monkeypatch.setattr(mcp_server, "get_metadata_cache", lambda: None)
+
+
+@pytest.fixture
+def metadata_cache(monkeypatch):
+    cache = MetadataCache(ttl=60, max_entries=16, revalidate_interval=0)
+    monkeypatch.setattr(mcp_server, "_METADATA_CACHE", cache)
+    return cache
+
+
+def test_list_tables_uses_at_most_two_round_trips(fake_client, no_metadata_cache):
+    """Test that column metadata for all tables is fetched in one batched query."""
+    tables = {f"newoms_table_{i}": ["id", "name", "value"] for i in range(50)}
+    client = FakeSchemaClient("analytics", tables)
+    fake_client(client)
+
+    result = mcp_server.list_tables("analytics")
+
+    assert len(client.queries) == 2
+    assert len(result) == 50
+    for table in result:
+        assert [c["name"] for c in table["columns"]] == ["id", "name", "value"]
+        assert all(c["table"] == table["name"] for c in table["columns"])
+
+
+def test_list_tables_skips_column_query_when_empty(fake_client, no_metadata_cache):
+    """Test that no system.columns query is sent when no table matches."""
+    client = FakeSchemaClient("analytics", {})
+    fake_client(client)
+
+    assert mcp_server.list_tables("analytics") == []
+    assert len(client.queries) == 1
+
+
+def test_list_tables_served_from_cache(fake_client, metadata_cache):
+    """Test that a repeat call only revalidates the schema fingerprint."""
+    client = FakeSchemaClient("analytics", {"newoms_orders": ["id"]})
+    fake_client(client)
+
+    first = mcp_server.list_tables("analytics")
+    queries_after_first = len(client.queries)
+    second = mcp_server.list_tables("analytics")
+
+    assert second == first
+    assert len(client.queries) == queries_after_first + 1
+    assert "max(metadata_modification_time)" in client.queries[-1]
+
+
+def test_list_tables_cache_invalidated_on_schema_change(fake_client, metadata_cache):
+    """Test that a changed metadata_modification_time reloads the tables."""
+    client = FakeSchemaClient("analytics", {"newoms_orders": ["id"]})
+    fake_client(client)
+    mcp_server.list_tables("analytics")
+
+    client.tables["newoms_items"] = ["id", "sku"]
+    client.version = "2024-01-02 00:00:00"
+    result = mcp_server.list_tables("analytics")
+
+    assert {table["name"] for table in result} == {"newoms_orders", "newoms_items"}
+    assert metadata_cache.stats()["invalidations"] == 1
@@ -0,0 +1,59 @@
+import json
+import logging
+import logging.handlers
+import queue
+
+from mcp_clickhouse import log
+
+
+def make_record(msg, *args, level=logging.INFO, extra=None):
+    record = logging.LogRecord("mcp-clickhouse", level, __file__, 1, msg, args, None)
+    for name, value in (extra or {}).items():
+        setattr(record, name, value)
+    return record
+
+
+def test_sampling_keeps_warnings_and_unmarked_records():
+    """Test that only records marked as sampled are dropped, and never warnings."""
+    sampling = log.SamplingFilter(0.0)
+
+    assert sampling.filter(make_record("routine", extra=log.sampled())) is False
+    assert sampling.filter(make_record("startup")) is True
+    assert sampling.filter(make_record("slow", level=logging.WARNING, extra=log.sampled())) is True
+    assert log.SamplingFilter(0.5, rand=lambda: 0.4).filter(
+        make_record("kept", extra=log.sampled())
+    )
+
+
+def test_json_formatter_includes_fields(monkeypatch):
+    """Test that JSON records carry their fields and cut long queries with a hash."""
+    monkeypatch.setattr(log, "_query_max_chars", 10)
+    query = "SELECT * FROM events WHERE id = 1"
+    record = make_record(
+        "Executing %s", log.query_text(query), extra=log.sampled(query_hash=log.query_hash(query))
+    )
+
+    entry = json.loads(log.JsonFormatter().format(record))
+
+    assert entry["level"] == "INFO"
+    assert entry["message"].startswith("Executing SELECT * F... [33 chars, query_hash=")
+    assert entry["query_hash"] in entry["message"]
+
+
+def test_queued_records_are_formatted_on_listener_thread():
+    """Test that lazy arguments are rendered by the listener, not the logging thread."""
+    rendered = []
+    lazy = log._Lazy(lambda: rendered.append(True) or "text")
+    handler = log._DeferredQueueHandler(queue.SimpleQueue())
+
+    handler.handle(make_record("value: %s", lazy))
+    assert rendered == []
+
+    output = []
+    target = logging.Handler()
+    target.emit = lambda record: output.append(record.getMessage())
+    listener = logging.handlers.QueueListener(handler.queue, target)
+    listener.start()
+    listener.stop()
+    assert output == ["value: text"]
+    assert rendered == [True]
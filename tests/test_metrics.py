@@ -0,0 +1,57 @@
+import pytest
+
+from mcp_clickhouse import mcp_server, metrics
+from mcp_clickhouse.metrics import MetricsRegistry
+
+
+def test_registry_renders_prometheus_text():
+    """Test that counters and histograms render in the Prometheus text format."""
+    registry = MetricsRegistry()
+    calls = registry.counter("calls_total", "Calls", ("tool",))
+    latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(0.1, 1))
+    calls.inc(tool='a"b')
+    latency.observe(0.05, tool="a")
+    latency.observe(0.5, tool="a")
+
+    text = registry.render()
+
+    assert "# TYPE calls_total counter" in text
+    assert 'calls_total{tool="a\\"b"} 1' in text
+    assert 'latency_seconds_bucket{tool="a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{tool="a",le="1"} 2' in text
+    assert 'latency_seconds_bucket{tool="a",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{tool="a"} 2' in text
+
+
+def test_tool_call_records_outcome():
+    """Test that tool_call counts errors and labels stages with the running tool."""
+    with pytest.raises(ValueError):
+        with metrics.tool_call("metrics_test_tool"):
+            with metrics.stage("execute"):
+                raise ValueError("boom")
+
+    assert metrics.TOOL_CALLS.value(tool="metrics_test_tool", status="error") == 1
+    assert metrics.STAGE_DURATION.count(tool="metrics_test_tool", stage="execute") == 1
+    assert metrics.current_tool() == "none"
+
+
+@pytest.mark.asyncio
+async def test_run_select_query_records_stages(fake_client):
+    """Test that a query records every stage and its result size under its tool."""
+    fake_client(rows=[(i,) for i in range(5)])
+    rows_before = metrics.RESULT_ROWS.value(tool="run_select_query")
+
+    await mcp_server.run_select_query_async("SELECT number FROM metrics_test")
+
+    for stage in metrics.STAGES:
+        assert metrics.STAGE_DURATION.count(tool="run_select_query", stage=stage) >= 1
+    assert metrics.RESULT_ROWS.value(tool="run_select_query") == rows_before + 5
+    text = await mcp_server.metrics_endpoint(None)
+    body = text.body.decode()
+    assert 'mcp_clickhouse_tool_calls_total{tool="run_select_query",status="ok"}' in body
+    assert 'mcp_clickhouse_client_pool{stat="in_use"} 0' in body
+    assert (
+        'mcp_clickhouse_session_settings{connection="default",setting="readonly",value="1"} 1'
+        in body
+    )
+    assert "mcp_clickhouse_executor_queue_depth 0" in body
@@ -0,0 +1,60 @@
+import pytest
+
+from mcp_clickhouse.preflight import CostEstimate, CostLimits, CostPreflight, QueryCostRejected
+
+
+def test_limits_report_every_exceeded_budget():
+    """Test that each exceeded budget is described and zero budgets are ignored."""
+    limits = CostLimits(max_rows=100, max_parts=0, max_marks=5)
+
+    assert limits.violations(CostEstimate(rows=50, parts=1000, marks=5)) == []
+    assert limits.violations(CostEstimate(rows=150, parts=1000, marks=6)) == [
+        "150 rows (limit 100)",
+        "6 marks (limit 5)",
+    ]
+
+
+def test_estimates_are_cached_per_key(clock):
+    """Test that a query is estimated once per key until its estimate expires."""
+    preflight = CostPreflight("warn", CostLimits(max_rows=100), cache_ttl=60, clock=clock)
+    calls = []
+
+    def estimate():
+        calls.append(True)
+        return CostEstimate(rows=500, parts=1, marks=1)
+
+    assert "500 rows" in preflight.check("q", estimate)
+    assert "500 rows" in preflight.check("q", estimate)
+    assert len(calls) == 1
+    clock.now = 61
+    preflight.check("q", estimate)
+    assert len(calls) == 2
+    assert preflight.stats()["warned"] == 3
+
+
+def test_reject_mode_raises():
+    """Test that reject mode refuses over-budget queries and passes cheap ones."""
+    preflight = CostPreflight("reject", CostLimits(max_marks=10))
+
+    assert preflight.check("cheap", lambda: CostEstimate(rows=1, parts=1, marks=1)) is None
+    with pytest.raises(QueryCostRejected, match="marks"):
+        preflight.check("scan", lambda: CostEstimate(rows=1, parts=1, marks=11))
+    assert preflight.stats()["rejected"] == 1
+
+
+def test_failed_estimate_is_rejected_unless_fail_open():
+    """Test that reject mode refuses a query it cannot estimate unless configured to fail open."""
+
+    def estimate():
+        raise RuntimeError("EXPLAIN is not supported")
+
+    preflight = CostPreflight("reject", CostLimits(max_rows=1))
+    with pytest.raises(QueryCostRejected, match="could not be estimated"):
+        preflight.check("q", estimate)
+    assert preflight.stats()["failed"] == 1
+    assert preflight.stats()["rejected"] == 1
+
+    assert (
+        CostPreflight("reject", CostLimits(max_rows=1), fail_open=True).check("q", estimate) is None
+    )
+    assert CostPreflight("warn", CostLimits(max_rows=1)).check("q", estimate) is None
@@ -0,0 +1,444 @@
+import asyncio
+import base64
+import threading
+
+import pytest
+from fastmcp.exceptions import ToolError
+
+from mcp_clickhouse import mcp_server
+from mcp_clickhouse.cache import ResultCache
+from mcp_clickhouse.concurrency import FairScheduler
+from mcp_clickhouse.mcp_env import ClickHouseConfig
+from mcp_clickhouse.preflight import CostLimits, CostPreflight
+
+
+def test_run_select_query_tags_query_and_limits_execution_time(fake_client, mcp_settings):
+    """Test that queries carry a query_id and the server-side max_execution_time."""
+    mcp_settings(CLICKHOUSE_MCP_QUERY_TIMEOUT="7")
+    client = fake_client()
+
+    result = mcp_server.run_select_query("SELECT 1")
+
+    assert result["rows"] == [(1,)]
+    assert result["truncated"] is False
+    settings = client.settings[0]
+    assert settings["max_execution_time"] == 7
+    assert settings["query_id"]
+
+
+def test_run_select_query_kills_query_on_timeout(fake_client, mcp_settings):
+    """Test that a timed-out query is killed server-side by its query_id."""
+    mcp_settings(CLICKHOUSE_MCP_QUERY_TIMEOUT="1")
+    client = fake_client(block=True)
+
+    with pytest.raises(ToolError, match="timed out"):
+        mcp_server.run_select_query("SELECT sleepEachRow(1) FROM numbers(100)")
+
+    assert client.killed.wait(5)
+    query_id = client.settings[0]["query_id"]
+    assert client.commands == [f"KILL QUERY WHERE query_id = '{query_id}' ASYNC"]
+
+
+def test_kill_query_gets_through_with_pool_full(fake_client, mcp_settings):
+    """Test that the KILL does not wait for the pooled connection the query holds."""
+    mcp_settings(CLICKHOUSE_MCP_QUERY_TIMEOUT="1")
+    client = fake_client(block=True, max_size=1)
+
+    with pytest.raises(ToolError, match="timed out"):
+        mcp_server.run_select_query("SELECT sleepEachRow(1) FROM numbers(100)")
+
+    # The query still holds the only pooled connection until it is killed
+    assert client.killed.wait(2)
+
+
+@pytest.mark.asyncio
+async def test_run_select_query_async_kills_query_on_timeout(fake_client, mcp_settings):
+    """Test that the async tool times out without blocking and kills the query."""
+    mcp_settings(CLICKHOUSE_MCP_QUERY_TIMEOUT="1")
+    client = fake_client(block=True)
+
+    with pytest.raises(ToolError, match="timed out"):
+        await mcp_server.run_select_query_async("SELECT sleepEachRow(1) FROM numbers(100)")
+
+    assert client.killed.wait(5)
+    assert client.settings[0]["query_id"] in client.commands[0]
+
+
+@pytest.mark.asyncio
+async def test_run_select_query_async_shares_identical_calls(fake_client):
+    """Test that concurrent identical queries run once and all get the result."""
+    client = fake_client(block=True)
+
+    calls = [asyncio.create_task(mcp_server.run_select_query_async("SELECT 1")) for _ in range(3)]
+    await asyncio.sleep(0.1)
+    client.killed.set()  # unblock the single running query
+    results = await asyncio.gather(*calls)
+
+    assert len(client.queries) == 1
+    assert all(result["rows"] == [(1,)] for result in results)
+
+
+@pytest.mark.asyncio
+async def test_run_blocking_holds_slot_until_worker_finishes(monkeypatch):
+    """Test that a timed-out call keeps its scheduler slot while its worker still runs."""
+    scheduler = FairScheduler(capacity=1, max_per_tenant=1)
+    monkeypatch.setattr(mcp_server, "SCHEDULER", scheduler)
+    done = threading.Event()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await mcp_server._run_blocking(done.wait, 5, timeout=0.05)
+    assert scheduler.stats()["running"] == 1
+
+    done.set()
+    for _ in range(100):
+        if not scheduler.stats()["running"]:
+            break
+        await asyncio.sleep(0.01)
+    assert scheduler.stats()["running"] == 0
+    assert await mcp_server._run_blocking(lambda: 1, timeout=1) == 1
+
+
+def test_run_select_query_stops_streaming_at_row_budget(fake_client):
+    """Test that streaming stops early and returns a cursor for the next page."""
+    client = fake_client(rows=[(i,) for i in range(1000)], block_size=100)
+
+    first = mcp_server.run_select_query("SELECT number FROM numbers(1000)", max_rows=150)
+
+    assert first["rows"] == [(i,) for i in range(150)]
+    assert first["truncated"] is True
+    assert client.streams[0].blocks_read == 2
+    assert client.streams[0].closed
+
+    second = mcp_server.run_select_query(
+        "SELECT number FROM numbers(1000)", max_rows=150, cursor=first["cursor"]
+    )
+    assert client.settings[1]["offset"] == 150
+    assert second["rows"][0] == (150,)
+
+
+def test_run_select_query_stops_streaming_at_byte_budget(fake_client, mcp_settings):
+    """Test that the byte budget truncates wide rows but always returns one row."""
+    mcp_settings(CLICKHOUSE_MCP_MAX_RESULT_BYTES="250")
+    fake_client(rows=[("x" * 100,) for _ in range(10)])
+
+    result = mcp_server.run_select_query("SELECT wide FROM t")
+
+    assert len(result["rows"]) == 2
+    assert result["truncated"] is True
+
+
+def test_run_select_query_rejects_foreign_cursor(fake_client):
+    """Test that a cursor cannot be replayed against a different query."""
+    fake_client()
+    cursor = mcp_server.encode_cursor("SELECT 1", 10)
+
+    with pytest.raises(ToolError, match="Cursor does not belong"):
+        mcp_server.run_select_query("SELECT 2", cursor=cursor)
+
+
+def test_run_select_query_passes_result_limits_to_clickhouse(fake_client, mcp_settings):
+    """Test that result size limits are enforced by ClickHouse in break mode."""
+    mcp_settings(CLICKHOUSE_MCP_MAX_RESULT_ROWS="500", CLICKHOUSE_MCP_MAX_RESULT_BYTES="1000")
+    client = fake_client()
+
+    mcp_server.run_select_query("SELECT 1")
+
+    settings = client.settings[0]
+    assert settings["max_result_rows"] == 501
+    assert settings["max_result_bytes"] == 2000
+    assert settings["result_overflow_mode"] == "break"
+
+
+def test_run_select_query_auto_limit(fake_client, mcp_settings):
+    """Test that unbounded SELECTs get a LIMIT when CLICKHOUSE_MCP_AUTO_LIMIT is on."""
+    mcp_settings(CLICKHOUSE_MCP_AUTO_LIMIT="true")
+    client = fake_client(rows=[(i,) for i in range(20)])
+
+    result = mcp_server.run_select_query("SELECT number FROM numbers(20)", max_rows=5)
+
+    assert client.queries[0] == "SELECT number FROM numbers(20)\nLIMIT 6"
+    assert result["limit_added"] is True
+    assert result["truncated"] is True
+    # The cursor is bound to the query the caller sent, not the rewritten one
+    second = mcp_server.run_select_query(
+        "SELECT number FROM numbers(20)", max_rows=5, cursor=result["cursor"]
+    )
+
+    # The next page's offset goes into the added LIMIT, not the offset setting
+    assert client.queries[1] == "SELECT number FROM numbers(20)\nLIMIT 5, 6"
+    assert "offset" not in client.settings[1]
+    assert second["rows"] == [(i,) for i in range(5, 10)]
+    assert second["truncated"] is True
+    assert mcp_server.decode_cursor("SELECT number FROM numbers(20)", second["cursor"]) == 10
+
+
+def test_run_select_query_auto_limit_keeps_query_offset(fake_client, mcp_settings):
+    """Test that a query with its own OFFSET is sent unchanged and pages via the offset setting."""
+    mcp_settings(CLICKHOUSE_MCP_AUTO_LIMIT="true")
+    client = fake_client(rows=[(i,) for i in range(20)])
+    query = "SELECT number FROM numbers(30) ORDER BY number OFFSET 10"
+
+    result = mcp_server.run_select_query(query, max_rows=5)
+    second = mcp_server.run_select_query(query, max_rows=5, cursor=result["cursor"])
+
+    assert client.queries == [query, query]
+    assert "limit_added" not in result
+    assert client.settings[1]["offset"] == 5
+    assert second["rows"] == [(i,) for i in range(5, 10)]
+
+
+class FakeSetting:
+    """Mimics the SettingDef objects in client.server_settings."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+class CountingSettings(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.lookups = 0
+
+    def get(self, key, default=None):
+        self.lookups += 1
+        return super().get(key, default)
+
+
+def test_readonly_setting_is_read_once_per_connection(fake_client):
+    """Test that the readonly setting is computed when connecting, not on every query."""
+    client = fake_client()
+    client.server_settings = CountingSettings({"readonly": FakeSetting("2")})
+
+    mcp_server.run_select_query("SELECT 1")
+    lookups = client.server_settings.lookups
+    mcp_server.run_select_query("SELECT 2")
+
+    assert client.server_settings.lookups == lookups
+    assert [s["readonly"] for s in client.settings] == ["2", "2"]
+
+
+def test_readonly_setting_reads_setting_value(fake_client):
+    """Test that a server-side readonly=0 still forces read-only queries."""
+    client = fake_client()
+    client.server_settings = {"readonly": FakeSetting("0")}
+
+    assert mcp_server.get_session_settings(client) == {"readonly": "1", "settings_locked": False}
+
+
+def test_locked_settings_are_not_sent(fake_client):
+    """Test that only readonly is sent when the server enforces readonly=1."""
+    client = fake_client()
+    client.server_settings = {"readonly": FakeSetting("1")}
+
+    mcp_server.run_select_query("SELECT 1")
+
+    assert set(client.settings[0]) == {"readonly", "query_id"}
+
+
+def test_truncated_result_has_no_cursor_when_settings_locked(fake_client, mcp_settings):
+    """Test that a truncated page explains why it has no cursor under readonly=1."""
+    client = fake_client(rows=[(i,) for i in range(20)])
+    client.server_settings = {"readonly": FakeSetting("1")}
+
+    result = mcp_server.run_select_query("SELECT number FROM t", max_rows=5)
+
+    assert result["truncated"] is True
+    assert "cursor" not in result
+    assert "readonly=1" in result["cursor_unavailable"]
+
+    # An added LIMIT carries the offset itself, so the cursor still works
+    mcp_settings(CLICKHOUSE_MCP_AUTO_LIMIT="true")
+    limited = mcp_server.run_select_query("SELECT number FROM t", max_rows=5)
+    second = mcp_server.run_select_query(
+        "SELECT number FROM t", max_rows=5, cursor=limited["cursor"]
+    )
+    assert second["rows"] == [(i,) for i in range(5, 10)]
+
+
+def test_run_select_query_columns_format(fake_client):
+    """Test that the columns format returns one list per column and pages like rows."""
+    fake_client(rows=[(i,) for i in range(250)], block_size=100)
+
+    first = mcp_server.run_select_query("SELECT number FROM t", max_rows=150, format="columns")
+
+    assert first["data"] == {"value": list(range(150))}
+    assert first["row_count"] == 150
+    assert first["truncated"] is True
+    assert "rows" not in first
+
+    second = mcp_server.run_select_query(
+        "SELECT number FROM t", max_rows=150, cursor=first["cursor"], format="columns"
+    )
+    assert second["data"] == {"value": list(range(150, 250))}
+    assert second["truncated"] is False
+
+    exact = mcp_server.run_select_query("SELECT number FROM t", max_rows=200, format="columns")
+    assert exact["row_count"] == 200
+    assert exact["truncated"] is True
+
+
+def test_run_select_query_columns_format_byte_budget(fake_client, mcp_settings):
+    """Test that the columns format keeps at least one row under a tiny byte budget."""
+    mcp_settings(CLICKHOUSE_MCP_MAX_RESULT_BYTES="250")
+    fake_client(rows=[("x" * 100,) for _ in range(10)])
+
+    result = mcp_server.run_select_query("SELECT wide FROM t", format="columns")
+
+    assert len(result["data"]["value"]) == 2
+    assert result["truncated"] is True
+
+
+def test_run_select_query_arrow_format(fake_client):
+    """Test that the arrow format returns a base64 Arrow IPC stream."""
+    pa = pytest.importorskip("pyarrow")
+    fake_client(rows=[(i,) for i in range(250)], block_size=100)
+
+    result = mcp_server.run_select_query("SELECT number FROM t", max_rows=150, format="arrow")
+
+    table = pa.ipc.open_stream(base64.b64decode(result["arrow"])).read_all()
+    assert table.column("value").to_pylist() == list(range(150))
+    assert result["columns"] == ["value"]
+    assert result["row_count"] == 150
+    assert result["truncated"] is True
+
+
+def test_run_select_query_rejects_unknown_format(fake_client):
+    """Test that an unknown result format is reported as a tool error."""
+    fake_client()
+
+    with pytest.raises(ToolError, match="Unsupported result format"):
+        mcp_server.run_select_query("SELECT 1", format="xml")
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    monkeypatch.setenv("CLICKHOUSE_HOST", "localhost")
+    monkeypatch.setenv("CLICKHOUSE_USER", "default")
+    monkeypatch.setenv("CLICKHOUSE_PASSWORD", "")
+    monkeypatch.setattr(mcp_server, "get_config", lambda connection=None: ClickHouseConfig())
+    cache = ResultCache(ttl=60, max_bytes=1024 * 1024)
+    monkeypatch.setattr(mcp_server, "_RESULT_CACHE", cache)
+    return cache
+
+
+def test_result_cache_serves_repeated_queries(fake_client, result_cache):
+    """Test that an identical query is answered from the result cache."""
+    client = fake_client()
+
+    first = mcp_server.run_select_query("SELECT sum(x) FROM t")
+    second = mcp_server.run_select_query("SELECT  sum(x)\nFROM t;")
+
+    assert len(client.queries) == 1
+    assert second["rows"] == first["rows"]
+    assert second["cached"] is True
+    assert result_cache.stats()["hits"] == 1
+    assert result_cache.stats()["misses"] == 1
+
+
+def test_result_cache_bypasses_volatile_queries(fake_client, result_cache):
+    """Test that queries calling now() are never served from the cache."""
+    client = fake_client()
+
+    mcp_server.run_select_query("SELECT now()")
+    mcp_server.run_select_query("SELECT now()")
+
+    assert len(client.queries) == 2
+    assert result_cache.stats()["bypassed"] == 2
+    assert result_cache.stats()["entries"] == 0
+
+
+def test_result_cache_serves_date_bucketed_queries_until_midnight(
+    fake_client, result_cache, monkeypatch
+):
+    """Test that a today() query hits the cache, with its TTL capped at the next midnight."""
+    client = fake_client()
+    monkeypatch.setattr(mcp_server, "seconds_until_midnight", lambda tz=None: 0)
+    query = "SELECT sum(x) FROM t WHERE toDate(ts) = today()"
+
+    mcp_server.run_select_query(query)
+    mcp_server.run_select_query(query)
+    # Stored with a TTL of 0: it is gone once midnight has passed
+    assert len(client.queries) == 2
+
+    monkeypatch.setattr(mcp_server, "seconds_until_midnight", lambda tz=None: 3600)
+    mcp_server.run_select_query(query)
+    cached = mcp_server.run_select_query(query)
+
+    assert len(client.queries) == 3
+    assert cached["cached"] is True
+    assert result_cache.stats()["bypassed"] == 0
+
+
+def test_seconds_until_midnight():
+    """Test that the TTL runs to the next midnight in the given time zone."""
+    from datetime import timezone
+
+    seconds = mcp_server.seconds_until_midnight(timezone.utc)
+    assert 0 < seconds <= 24 * 3600
+
+
+def test_result_cache_keys_on_page_parameters(fake_client, result_cache):
+    """Test that different formats and row budgets are cached separately."""
+    client = fake_client(rows=[(i,) for i in range(10)])
+
+    mcp_server.run_select_query("SELECT x FROM t", max_rows=5)
+    mcp_server.run_select_query("SELECT x FROM t", max_rows=3)
+    mcp_server.run_select_query("SELECT x FROM t", max_rows=5, format="columns")
+
+    assert len(client.queries) == 3
+
+
+def test_run_select_query_include_stats(fake_client, result_cache):
+    """Test that include_stats returns the server's read counters for executed queries."""
+    client = fake_client()
+    client.summary = {"read_rows": "1000", "read_bytes": "8000", "elapsed_ns": "2500000"}
+
+    plain = mcp_server.run_select_query("SELECT value FROM t")
+    result = mcp_server.run_select_query("SELECT value FROM t2", include_stats=True)
+    cached = mcp_server.run_select_query("SELECT value FROM t2", include_stats=True)
+
+    assert "stats" not in plain
+    assert result["stats"]["read_rows"] == 1000
+    assert result["stats"]["read_bytes"] == 8000
+    assert result["stats"]["elapsed_ms"] == 2.5
+    assert result["stats"]["rows_returned"] == 1
+    assert result["stats"]["query_id"] == client.settings[-1]["query_id"]
+    assert cached["cached"] is True
+    assert "stats" not in cached
+
+
+@pytest.mark.parametrize("mode", ["warn", "reject"])
+def test_cost_preflight(fake_client, result_cache, monkeypatch, mode):
+    """Test that over-budget queries are rejected unsent or run with a cost warning."""
+    client = fake_client()
+    client.estimate = [("db", "events", 40, 5_000_000, 700), ("db", "users", 1, 100, 1)]
+    preflight = CostPreflight(mode, CostLimits(max_rows=1_000_000))
+    monkeypatch.setattr(mcp_server, "_COST_PREFLIGHT", preflight)
+
+    for _ in range(2):
+        if mode == "reject":
+            with pytest.raises(ToolError, match="5000100 rows"):
+                mcp_server.run_select_query("SELECT * FROM events FINAL")
+        else:
+            result = mcp_server.run_select_query("SELECT * FROM events FINAL;")
+            assert "5000100 rows (limit 1000000)" in result["cost_warning"]
+
+    explains = [q for q in client.queries if q.startswith("EXPLAIN ESTIMATE")]
+    assert explains == ["EXPLAIN ESTIMATE SELECT * FROM events FINAL\n"]
+    executed = [q for q in client.queries if not q.startswith("EXPLAIN")]
+    assert len(executed) == (0 if mode == "reject" else 1)
+
+
+@pytest.mark.asyncio
+async def test_run_select_query_async_routes_to_named_connection(fake_client, mcp_settings):
+    """Test that the connection argument selects the named connection's own pool."""
+    mcp_settings(CLICKHOUSE_CONNECTIONS="ops", CLICKHOUSE_HOST="localhost")
+    default = fake_client()
+    ops = fake_client(connection="ops", rows=[(2,)])
+
+    result = await mcp_server.run_select_query_async("SELECT 2", connection="OPS")
+
+    assert result["rows"] == [(2,)]
+    assert ops.queries == ["SELECT 2"] and default.queries == []
+    with pytest.raises(ToolError, match="available connections: default, ops"):
+        await mcp_server.run_select_query_async("SELECT 2", connection="analytics")
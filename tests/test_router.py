@@ -0,0 +1,174 @@
+from collections import Counter
+
+import pytest
+from clickhouse_connect.driver.exceptions import OperationalError
+
+from mcp_clickhouse import mcp_env, mcp_server
+from mcp_clickhouse.client_pool import ClickHouseClientPool
+from mcp_clickhouse.router import ReplicaRouter
+
+
+class FakeClient:
+    """Minimal stand-in for a clickhouse_connect client of one replica."""
+
+    server_version = "24.3.1"
+
+    def __init__(self, replica):
+        self.replica = replica
+
+    def command(self, cmd):
+        if self.replica.down:
+            raise OperationalError(f"{self.replica.name} is down")
+        self.replica.commands.append(cmd)
+        return self.replica.name
+
+    def close(self):
+        pass
+
+
+class FakeReplica:
+    def __init__(self, name):
+        self.name = name
+        self.down = False
+        self.commands = []
+
+    def connect(self):
+        if self.down:
+            raise OperationalError(f"{self.name} is down")
+        return FakeClient(self)
+
+
+@pytest.fixture
+def make_router(clock):
+    def build(weights, policy="round_robin"):
+        replicas = {name: FakeReplica(name) for name in weights}
+        router = ReplicaRouter(
+            [
+                (name, ClickHouseClientPool(replica.connect, max_size=4), weights[name])
+                for name, replica in replicas.items()
+            ],
+            policy=policy,
+            eject_seconds=30,
+            clock=clock,
+        )
+        return router, replicas
+
+    return build
+
+
+def query(router):
+    return router.run(lambda pooled: pooled.client.command("SELECT 1"))
+
+
+def test_round_robin_spreads_by_weight(make_router):
+    """Test that round robin sends each replica its weighted share, interleaved."""
+    router, _ = make_router({"a": 2, "b": 1})
+
+    picks = [query(router) for _ in range(6)]
+
+    assert Counter(picks) == {"a": 4, "b": 2}
+    assert picks[:3] == ["a", "b", "a"]
+
+
+def test_least_in_flight_avoids_busy_replica(make_router):
+    """Test that least_in_flight routes to the replica with fewer checked-out connections."""
+    router, _ = make_router({"a": 1, "b": 1}, policy="least_in_flight")
+
+    with router.connection() as busy:
+        picks = {query(router) for _ in range(3)}
+
+    assert picks == {"b", "a"} - {busy.client.replica.name}
+
+
+def test_latency_prefers_faster_replica(make_router):
+    """Test that the latency policy routes to the replica with the lower average latency."""
+    router, _ = make_router({"a": 1, "b": 1}, policy="latency")
+    slow, fast = router.replicas
+    slow.latency, fast.latency = 0.5, 0.01
+
+    assert {query(router) for _ in range(3)} == {"b"}
+
+
+def test_connection_error_ejects_replica_and_fails_over(make_router, clock):
+    """Test that a failing replica is ejected, queries fail over, and a probe restores it."""
+    router, replicas = make_router({"a": 1, "b": 1})
+    replicas["a"].down = True
+
+    assert {query(router) for _ in range(4)} == {"b"}
+    assert router.healthy_replicas() == ["b"]
+
+    clock.now = 31
+    router.probe()
+    assert router.healthy_replicas() == ["b"]
+    # A failed probe doubles the ejection time
+    clock.now = 61
+    replicas["a"].down = False
+    router.probe()
+    assert router.healthy_replicas() == ["b"]
+
+    clock.now = 92
+    router.probe()
+    assert router.healthy_replicas() == ["a", "b"]
+    assert router.replica_stats()["a"]["ejected_total"] == 2
+
+
+def test_sent_request_is_not_repeated_on_another_replica(make_router):
+    """Test that a query losing its connection after being sent neither fails over nor ejects."""
+    router, replicas = make_router({"a": 1, "b": 1})
+    assert [query(router), query(router)] == ["a", "b"]
+    replicas["a"].down = True
+
+    with pytest.raises(OperationalError):
+        query(router)
+    assert len(replicas["b"].commands) == 1
+    assert router.healthy_replicas() == ["a", "b"]
+    assert router.replica_stats()["a"]["ejected_total"] == 0
+
+
+def test_all_replicas_ejected_still_routes(make_router):
+    """Test that queries keep going to a replica when every replica is ejected."""
+    router, replicas = make_router({"a": 1, "b": 1})
+    for replica in replicas.values():
+        replica.down = True
+    for _ in range(2):
+        with pytest.raises(OperationalError):
+            query(router)
+    assert router.healthy_replicas() == []
+
+    replicas["b"].down = False
+    replicas["a"].down = False
+    assert query(router) in ("a", "b")
+    assert len(router.healthy_replicas()) == 1
+
+
+def test_kill_query_reaches_every_replica(make_router, monkeypatch):
+    """Test that KILL QUERY is sent to every replica, since the query may run on any."""
+    router, replicas = make_router({"a": 1, "b": 1})
+    replicas["b"].down = True
+    monkeypatch.setattr(mcp_server, "_CLIENT_POOL", router)
+
+    mcp_server.kill_query("q-1")
+
+    assert replicas["a"].commands == ["KILL QUERY WHERE query_id = 'q-1' ASYNC"]
+    replicas["b"].down = False
+    assert mcp_server._check_clickhouse() == "Connected to ClickHouse 24.3.1 (2/2 replicas healthy)"
+
+
+def test_reload_replaces_pool_of_changed_connection(mcp_settings, monkeypatch):
+    """Test that a reload changing the hosts replaces the pool; other changes keep it."""
+    monkeypatch.setattr(mcp_server, "_CLIENT_POOL", None)
+    monkeypatch.setattr(mcp_env, "_CONFIG_INSTANCE", None)
+    mcp_settings(CLICKHOUSE_HOSTS="ch-1,ch-2", CLICKHOUSE_USER="default", CLICKHOUSE_PASSWORD="")
+    router = mcp_server.get_client_pool()
+
+    monkeypatch.setenv("CLICKHOUSE_MCP_QUERY_TIMEOUT", "9")
+    mcp_server.reset_client_pools(mcp_server.reload_config())
+    assert mcp_server.get_client_pool() is router
+
+    monkeypatch.setenv("CLICKHOUSE_HOSTS", "ch-3")
+    mcp_server.reset_client_pools(mcp_server.reload_config())
+    pool = mcp_server.get_client_pool()
+    assert pool is not router
+    assert isinstance(pool, ClickHouseClientPool)
+    assert pool._client_factory.args[0] == "ch-3"
+    assert all(replica.pool._closed for replica in router.replicas)
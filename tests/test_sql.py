@@ -0,0 +1,95 @@
+import pytest
+
+from mcp_clickhouse.sql import (
+    apply_auto_limit,
+    is_deterministic,
+    reads_current_date,
+    normalize_query,
+    top_level_keywords,
+)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM t",
+        "select a, b from t where x = 'LIMIT 5' order by a;",
+        "WITH x AS (SELECT 1 LIMIT 1) SELECT * FROM x",
+        "SELECT * FROM (SELECT * FROM a UNION ALL SELECT * FROM b)",
+        "SELECT 1 -- LIMIT 10",
+        "SELECT * FROM (SELECT * FROM t ORDER BY x OFFSET 5)",
+    ],
+)
+def test_apply_auto_limit_rewrites_unbounded_selects(query):
+    """Test that a LIMIT is appended to top-level SELECTs without one."""
+    rewritten = apply_auto_limit(query, 100)
+
+    assert rewritten is not None
+    assert rewritten.endswith("\nLIMIT 100")
+    assert ";" not in rewritten.splitlines()[-2]
+    assert apply_auto_limit(query, 100, offset=200).endswith("\nLIMIT 200, 100")
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * FROM t LIMIT 10",
+        "SELECT * FROM t ORDER BY x OFFSET 10",
+        "SELECT * FROM t ORDER BY x OFFSET 10 ROWS FETCH FIRST 5 ROWS ONLY",
+        "SELECT * FROM t FORMAT JSON",
+        "SELECT * FROM t SETTINGS max_threads = 1",
+        "SELECT * FROM a UNION ALL SELECT * FROM b",
+        "SELECT 1; SELECT 2",
+        "SHOW TABLES",
+        "DESCRIBE TABLE t",
+    ],
+)
+def test_apply_auto_limit_leaves_other_queries_alone(query):
+    """Test that queries a trailing LIMIT would break are not rewritten."""
+    assert apply_auto_limit(query, 100) is None
+    assert apply_auto_limit(query, 100, offset=200) is None
+
+
+def test_top_level_keywords_ignore_nested_and_quoted_text():
+    """Test that keywords inside subqueries, strings and identifiers are not top level."""
+    keywords = top_level_keywords(
+        "SELECT \"limit\", 'FORMAT' FROM (SELECT 1 LIMIT 1) /* SETTINGS */ WHERE 1"
+    )
+    assert keywords == ["SELECT", "FROM", "WHERE"]
+
+
+def test_normalize_query_ignores_comments_and_whitespace():
+    """Test that formatting differences do not change the normalized query."""
+    a = normalize_query("SELECT  a,\n b -- columns\nFROM t WHERE s = 'x  y';")
+    b = normalize_query("SELECT a, b /* same */ FROM t WHERE s = 'x  y'")
+
+    assert a == b
+    assert "'x  y'" in a
+    assert normalize_query("SELECT A FROM t") != normalize_query("SELECT a FROM t")
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT sum(amount) FROM sales WHERE day = '2024-01-01'", True),
+        ("SELECT 'now()' AS label", True),
+        ("SELECT count() FROM t WHERE ts > now() - INTERVAL 1 DAY", False),
+        ("SELECT rand() FROM numbers(3)", False),
+        ("SELECT randCanonical()", False),
+        ("SELECT count() FROM t WHERE toDate(ts) = today()", True),
+        ("SELECT count() FROM t WHERE d = CURRENT_DATE", True),
+        ("SELECT CURRENT_TIMESTAMP", False),
+        ("SELECT * FROM system.processes", False),
+    ],
+)
+def test_is_deterministic(query, expected):
+    """Test that time, random and system table queries are flagged as volatile."""
+    assert is_deterministic(query) is expected
+
+
+def test_reads_current_date():
+    """Test that today(), yesterday() and CURRENT_DATE are detected outside of literals."""
+    assert reads_current_date("SELECT sum(x) FROM t WHERE toDate(ts) = today()")
+    assert reads_current_date("SELECT * FROM t WHERE d >= yesterday()")
+    assert reads_current_date("SELECT * FROM t WHERE d = current_date")
+    assert not reads_current_date("SELECT 'today()' AS label, today_sales FROM t")
@@ -0,0 +1,125 @@
+from contextlib import contextmanager
+
+import pytest
+
+from mcp_clickhouse import mcp_server, tracing
+
+
+SUMMARY = {"read_rows": "100", "read_bytes": "800", "elapsed_ns": "12345"}
+
+
+class FakeSpan:
+    def __init__(self, name, attributes, parent, start_time=None):
+        self.name = name
+        self.attributes = dict(attributes)
+        self.parent = parent
+        self.start_time = start_time
+        self.end_time = None
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def end(self, end_time=None):
+        self.end_time = end_time
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+
+    @contextmanager
+    def start_as_current_span(self, name, attributes=None):
+        span = FakeSpan(name, attributes or {}, tracing._current_span.get())
+        self.spans.append(span)
+        yield span
+
+    def start_span(self, name, attributes=None, start_time=None):
+        span = FakeSpan(name, attributes or {}, tracing._current_span.get(), start_time)
+        self.spans.append(span)
+        return span
+
+    def by_name(self, name):
+        return [span for span in self.spans if span.name == name]
+
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = FakeTracer()
+    monkeypatch.setattr(tracing, "_tracer", tracer)
+    return tracer
+
+
+def test_span_is_noop_without_opentelemetry(monkeypatch):
+    """Test that spans and attributes are ignored when no tracer is available."""
+    monkeypatch.setattr(tracing, "_tracer", False)
+    with tracing.span("work") as span:
+        tracing.set_attributes(value=1)
+    tracing.record_span("queue", 0.0)
+    assert span is None
+
+
+def test_record_span_converts_timestamps(tracer):
+    """Test that after-the-fact spans keep their duration and nest under the current span."""
+    with tracing.span("tool"):
+        tracing.record_span("queue", 10.0, 10.5)
+
+    queue = tracer.by_name("queue")[0]
+    assert queue.parent is tracer.by_name("tool")[0]
+    assert queue.end_time - queue.start_time == 500_000_000
+
+
+def test_configure_tracing_rejects_unknown_exporter():
+    """Test that an unknown exporter name is a configuration error."""
+    assert tracing.configure_tracing("none") is False
+    with pytest.raises(ValueError):
+        tracing.configure_tracing("zipkin")
+
+
+@pytest.mark.asyncio
+async def test_run_select_query_traces_stages(fake_client, tracer):
+    """Test that a query is traced as a tool span with a child span per stage."""
+    fake_client(rows=[(i,) for i in range(3)], summary=SUMMARY)
+
+    await mcp_server.run_select_query_async("SELECT number FROM tracing_test")
+
+    tool = tracer.by_name("run_select_query")[0]
+    assert tool.attributes["mcp.tool.status"] == "ok"
+    for stage in ("queue", "connect", "execute", "serialize"):
+        assert tracer.by_name(stage)[0].parent is tool
+    execute = tracer.by_name("execute")[0]
+    assert execute.attributes["clickhouse.query_id"]
+    assert execute.attributes["clickhouse.read_rows"] == 100
+    assert execute.attributes["clickhouse.elapsed_ns"] == 12345
+    assert execute.attributes["clickhouse.page_rows"] == 3
+    assert execute.attributes["clickhouse.session.readonly"] == "1"
+    assert execute.attributes["clickhouse.session.settings_locked"] is False
+
+
+@pytest.mark.asyncio
+async def test_run_select_query_spans_with_opentelemetry_sdk(fake_client, monkeypatch):
+    """Test span names, nesting and attributes as exported by the OpenTelemetry SDK."""
+    sdk_trace = pytest.importorskip("opentelemetry.sdk.trace")
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = sdk_trace.TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "_tracer", provider.get_tracer(tracing.TRACER_NAME))
+    fake_client(rows=[(i,) for i in range(3)], summary=SUMMARY)
+
+    await mcp_server.run_select_query_async("SELECT number FROM otel_test")
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert set(spans) == {"run_select_query", "queue", "connect", "execute", "serialize"}
+    tool = spans["run_select_query"]
+    for stage in ("queue", "connect", "execute", "serialize"):
+        assert spans[stage].parent.span_id == tool.context.span_id
+        assert spans[stage].context.trace_id == tool.context.trace_id
+    assert tool.attributes["mcp.tool.status"] == "ok"
+    execute = spans["execute"].attributes
+    assert execute["clickhouse.query_id"]
+    assert execute["clickhouse.read_rows"] == 100
+    assert execute["clickhouse.read_bytes"] == 800
+    assert execute["clickhouse.page_rows"] == 3
+    assert execute["clickhouse.session.readonly"] == "1"